@@ -0,0 +1,346 @@
+"""
+Учёт ознакомления сотрудников с документами (SQLite)
+Кто должен ознакомиться с версией документа и кто уже расписался
+"""
+
+import os
+import sqlite3
+from datetime import datetime
+
+from config import EMPLOYEES_DB_TIMEOUT
+from workspace import resolve_workspace
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS acknowledgements (
+    kod TEXT NOT NULL,
+    version TEXT NOT NULL,
+    employee_id INTEGER NOT NULL,
+    assigned_at TEXT NOT NULL,
+    signed_at TEXT,
+    PRIMARY KEY (kod, version, employee_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_ack_unsigned_by_document
+    ON acknowledgements(kod, version, employee_id) WHERE signed_at IS NULL;
+CREATE INDEX IF NOT EXISTS idx_ack_pending_by_employee
+    ON acknowledgements(employee_id, kod, version) WHERE signed_at IS NULL;
+"""
+
+# Запись с подписью не затирается повторным назначением без подписи
+UPSERT_SQL = """
+INSERT INTO acknowledgements (kod, version, employee_id, assigned_at, signed_at)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (kod, version, employee_id)
+DO UPDATE SET signed_at = COALESCE(excluded.signed_at, acknowledgements.signed_at)
+"""
+
+
+def _now():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+class AcknowledgementStore:
+    """Учёт ознакомлений в файле SQLite: ключ (код документа, версия, ID сотрудника)"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+
+        conn = self._connect()
+        try:
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self):
+        """Открыть соединение (журнал DELETE, ожидание блокировки как у справочника сотрудников)"""
+        conn = sqlite3.connect(self.db_path, timeout=EMPLOYEES_DB_TIMEOUT)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _write(self, sql_steps):
+        """Выполнить изменения в одной транзакции с блокировкой на запись"""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            result = sql_steps(conn)
+            conn.commit()
+            return result
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def _read(self, sql, params=()):
+        conn = self._connect()
+        try:
+            return [dict(row) for row in conn.execute(sql, params)]
+        finally:
+            conn.close()
+
+    # Запись
+
+    def assign(self, kod, version, employee_ids):
+        """
+        Назначить ознакомление с версией документа (уже назначенные не меняются)
+
+        Args:
+            kod: Код документа
+            version: Версия документа
+            employee_ids: ID сотрудников
+
+        Returns:
+            int: Количество новых назначений
+        """
+        assigned_at = _now()
+
+        def steps(conn):
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO acknowledgements (kod, version, employee_id, assigned_at) VALUES (?, ?, ?, ?)",
+                [(kod, version, emp_id, assigned_at) for emp_id in employee_ids]
+            )
+            return conn.total_changes - before
+
+        return self._write(steps)
+
+    def mark_signed(self, kod, version, employee_id, signed_at=None):
+        """
+        Отметить подпись сотрудника (назначение создаётся, если его не было)
+
+        Args:
+            signed_at: Дата ознакомления (по умолчанию - сейчас)
+        """
+        self.bulk_record([(kod, version, employee_id, signed_at or _now())])
+
+    def bulk_record(self, records):
+        """
+        Пакетная запись назначений и подписей в одной транзакции
+
+        Args:
+            records: Итерируемое (kod, version, employee_id, signed_at или None)
+
+        Returns:
+            int: Количество записей
+        """
+        assigned_at = _now()
+        rows = [(kod, version, emp_id, assigned_at, signed_at) for kod, version, emp_id, signed_at in records]
+
+        def steps(conn):
+            conn.executemany(UPSERT_SQL, rows)
+            return len(rows)
+
+        return self._write(steps)
+
+    # Запросы (по частичным индексам неподписанных записей)
+
+    def unsigned_for_document(self, kod, version):
+        """
+        Кто ещё не ознакомился с версией документа
+
+        Returns:
+            list[int]: ID сотрудников
+        """
+        rows = self._read(
+            "SELECT employee_id FROM acknowledgements INDEXED BY idx_ack_unsigned_by_document "
+            "WHERE kod = ? AND version = ? AND signed_at IS NULL ORDER BY employee_id",
+            (kod, version)
+        )
+        return [row["employee_id"] for row in rows]
+
+    def pending_for_employee(self, employee_id):
+        """
+        С какими документами сотруднику ещё нужно ознакомиться
+
+        Returns:
+            list[tuple]: (код, версия)
+        """
+        rows = self._read(
+            "SELECT kod, version FROM acknowledgements INDEXED BY idx_ack_pending_by_employee "
+            "WHERE employee_id = ? AND signed_at IS NULL ORDER BY kod, version",
+            (employee_id,)
+        )
+        return [(row["kod"], row["version"]) for row in rows]
+
+    def document_status(self, kod, version):
+        """
+        Сводка по версии документа
+
+        Returns:
+            dict: {assigned, signed, unsigned}
+        """
+        row = self._read(
+            "SELECT COUNT(*) AS assigned, COUNT(signed_at) AS signed "
+            "FROM acknowledgements WHERE kod = ? AND version = ?",
+            (kod, version)
+        )[0]
+        return {
+            "assigned": row["assigned"],
+            "signed": row["signed"],
+            "unsigned": row["assigned"] - row["signed"],
+        }
+
+    def records_for_document(self, kod, version):
+        """Все записи по версии документа (list[dict])"""
+        return self._read(
+            "SELECT employee_id, assigned_at, signed_at FROM acknowledgements "
+            "WHERE kod = ? AND version = ? ORDER BY employee_id",
+            (kod, version)
+        )
+
+
+def get_acknowledgement_store(workspace=None):
+    """
+    Учёт ознакомлений рабочей папки (создаётся один раз на рабочее пространство)
+
+    Args:
+        workspace: Рабочее пространство (по умолчанию текущее)
+
+    Returns:
+        AcknowledgementStore: Хранилище
+    """
+    workspace = resolve_workspace(workspace)
+
+    store = workspace.cache.get("acknowledgement_store")
+    if store is None:
+        store = AcknowledgementStore(workspace.acknowledgements_db)
+        workspace.cache["acknowledgement_store"] = store
+
+    return store
+
+
+def record_assignments(document, employees, workspace=None):
+    """
+    Записать назначения ознакомления при создании листа
+
+    Документы без кода и версии (имя не по шаблону) не учитываются.
+
+    Args:
+        document: Объект документа (Document)
+        employees: Список сотрудников (list[dict])
+        workspace: Рабочее пространство (по умолчанию текущее)
+
+    Returns:
+        int: Количество новых назначений
+    """
+    if not document.is_valid:
+        return 0
+    return get_acknowledgement_store(workspace).assign(
+        document.kod, document.version, [emp['id'] for emp in employees]
+    )
+
+
+def _format_date(value):
+    """Дата ознакомления из ячейки в строку (пусто - None)"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    text = str(value).strip()
+    return text or None
+
+
+def read_signed_sheet(path, fio_to_id=None):
+    """
+    Прочитать заполненный лист ознакомления
+
+    Код и версия документа берутся из скрытой служебной колонки,
+    для листов старого формата - из строки "Документ: ..." шапки.
+    Сотрудник без ID в служебной колонке ищется по ФИО (fio_to_id).
+    Подписавшим считается сотрудник с заполненной датой или подписью.
+
+    Args:
+        path: Путь к файлу .xlsx
+        fio_to_id: Словарь {ФИО: ID} для листов без служебной колонки
+
+    Returns:
+        tuple: (код, версия, [(ID сотрудника, дата подписи или None)]);
+               код None, если документ определить не удалось
+    """
+    from openpyxl import load_workbook
+    from logic import parse_filename
+    from sheet_template import (
+        HEADER_ROW, HEADER_CELLS, DATE_COLUMN, SIGNATURE_COLUMN, ID_COLUMN,
+        DOC_KOD_CELL, DOC_VERSION_CELL
+    )
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb.active
+
+        kod = ws[DOC_KOD_CELL].value
+        version = ws[DOC_VERSION_CELL].value
+        if not kod:
+            title = ws[HEADER_CELLS[0]].value or ""
+            name = str(title).split(":", 1)[-1].strip()
+            parsed = parse_filename(name + ".docx")
+            if parsed["is_valid"]:
+                kod, version = parsed["kod"], parsed["version"]
+
+        entries = []
+        for row in ws.iter_rows(min_row=HEADER_ROW + 1, max_col=ID_COLUMN, values_only=True):
+            row = tuple(row) + (None,) * (ID_COLUMN - len(row))
+            number, fio = row[0], row[1]
+            # Таблица кончается на первой строке без номера (дальше "Итого")
+            if not isinstance(number, (int, float)):
+                break
+
+            emp_id = row[ID_COLUMN - 1]
+            if emp_id is None and fio_to_id:
+                emp_id = fio_to_id.get(str(fio or "").strip())
+            if emp_id is None:
+                continue
+
+            signed_at = _format_date(row[DATE_COLUMN - 1])
+            if signed_at is None and row[SIGNATURE_COLUMN - 1] not in (None, ""):
+                signed_at = _now()
+            entries.append((int(emp_id), signed_at))
+    finally:
+        wb.close()
+
+    return (str(kod) if kod else None, str(version) if version else "", entries)
+
+
+def import_signed_sheets(paths, workspace=None):
+    """
+    Загрузить заполненные листы ознакомления в учёт (одной транзакцией)
+
+    Args:
+        paths: Пути к файлам .xlsx
+        workspace: Рабочее пространство (по умолчанию текущее)
+
+    Returns:
+        dict: {sheets, signed, pending, failed: [пути]}
+    """
+    from employees import load_employees
+
+    fio_to_id = {emp['fio']: emp['id'] for emp in load_employees(workspace)}
+
+    records = []
+    result = {"sheets": 0, "signed": 0, "pending": 0, "failed": []}
+
+    for path in paths:
+        try:
+            kod, version, entries = read_signed_sheet(path, fio_to_id)
+        except Exception as e:
+            print(f"Ошибка чтения листа ознакомления {os.path.basename(path)}: {e}")
+            result["failed"].append(path)
+            continue
+
+        if not kod:
+            print(f"Не удалось определить документ в листе: {os.path.basename(path)}")
+            result["failed"].append(path)
+            continue
+
+        result["sheets"] += 1
+        for emp_id, signed_at in entries:
+            records.append((kod, version, emp_id, signed_at))
+            if signed_at:
+                result["signed"] += 1
+            else:
+                result["pending"] += 1
+
+    if records:
+        get_acknowledgement_store(workspace).bulk_record(records)
+
+    return result
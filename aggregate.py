@@ -0,0 +1,170 @@
+"""
+Сводный просмотр нескольких рабочих папок (только чтение)
+Параллельное сканирование площадок и общий список документов для аудиторов
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from config import load_settings, save_settings, AGGREGATE_SCAN_WORKERS
+from archive_pack import packed_documents, without_shadowed
+from logic import scan_folder, build_filename
+from workspace import get_workspace
+
+
+# Папки, которые попадают в сводный список: (ключ, название)
+AGGREGATE_FOLDERS = [
+    ("active", "ДЕЙСТВУЮЩИЕ"),
+    ("archive", "АРХИВ"),
+]
+
+
+class AggregatedDocument:
+    """Документ в сводном списке с привязкой к рабочей папке"""
+
+    def __init__(self, workspace, folder, document):
+        self.workspace = workspace          # Workspace
+        self.folder = folder                # "ДЕЙСТВУЮЩИЕ" или "АРХИВ"
+        self.document = document            # Document
+
+        if document.is_valid:
+            name = build_filename(document.typ, document.kod, document.version, document.year, document.title)
+        else:
+            name = document.filename
+
+        self.display_name = f"[{workspace.name} / {folder} / {document.category}] {name}"
+        self.search_text = self.display_name.casefold()
+
+    def __repr__(self):
+        return f"AggregatedDocument({self.workspace.name}, {self.folder}, {self.document.filename})"
+
+
+def get_aggregate_dirs():
+    """
+    Список рабочих папок, зарегистрированных для сводного просмотра
+
+    Returns:
+        list[str]: Пути к рабочим папкам
+    """
+    return load_settings().get('aggregate_dirs', [])
+
+
+def save_aggregate_dirs(dirs):
+    """
+    Сохранить список рабочих папок для сводного просмотра
+
+    Args:
+        dirs: Пути к рабочим папкам
+
+    Returns:
+        bool: True если успешно
+    """
+    settings = load_settings()
+    settings['aggregate_dirs'] = list(dirs)
+    return save_settings(settings)
+
+
+class AggregateView:
+    """Сводный список документов нескольких рабочих папок"""
+
+    def __init__(self, dirs=None, max_workers=AGGREGATE_SCAN_WORKERS):
+        if dirs is None:
+            dirs = get_aggregate_dirs()
+
+        self.max_workers = max_workers
+        self.workspaces = []
+        for path in dirs:
+            self.add_dir(path)
+
+        self.documents = []
+
+    def add_dir(self, path):
+        """
+        Зарегистрировать рабочую папку
+
+        Args:
+            path: Путь к рабочей папке
+
+        Returns:
+            Workspace: Рабочее пространство папки
+        """
+        workspace = get_workspace(path)
+        if workspace not in self.workspaces:
+            self.workspaces.append(workspace)
+        return workspace
+
+    def remove_dir(self, path):
+        """Убрать рабочую папку из сводного просмотра"""
+        key = os.path.abspath(path)
+        self.workspaces = [ws for ws in self.workspaces if ws.docs_dir != key]
+
+    def _scan_tasks(self):
+        """Все папки категорий всех площадок: (workspace, ключ папки, название папки, категория, путь)"""
+        tasks = []
+        for workspace in self.workspaces:
+            for key, folder_name in AGGREGATE_FOLDERS:
+                categories = workspace.active_categories if key == "active" else workspace.archive_categories
+                for category, path in categories.items():
+                    tasks.append((workspace, key, folder_name, category, path))
+        return tasks
+
+    def scan(self):
+        """
+        Просканировать все площадки параллельно
+
+        Неизменившиеся папки берутся из кэша рабочего пространства
+        (scan_folder сверяет mtime), поэтому повторное сканирование
+        обходит только изменённые папки. В АРХИВЕ к файлам категории
+        добавляются упакованные документы (archive_pack.py).
+
+        Returns:
+            list[AggregatedDocument]: Сводный список документов
+        """
+        tasks = self._scan_tasks()
+
+        def scan_one(task):
+            workspace, key, folder_name, category, path = task
+            docs = scan_folder(path, category, workspace)
+            if key == "archive":
+                # Файл, оставшийся рядом с пакетом, показывается один раз
+                docs = docs + without_shadowed(docs, packed_documents(category, workspace))
+            return [AggregatedDocument(workspace, folder_name, doc) for doc in docs]
+
+        documents = []
+        if tasks:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                for result in executor.map(scan_one, tasks):
+                    documents.extend(result)
+
+        documents.sort(key=lambda d: d.display_name)
+        self.documents = documents
+        return documents
+
+    def search(self, query, folder=None, category=None, workspace_name=None):
+        """
+        Поиск по сводному списку (без учёта регистра)
+
+        Args:
+            query: Подстрока (пустая - все документы)
+            folder: "ДЕЙСТВУЮЩИЕ" / "АРХИВ" (опционально)
+            category: Категория (опционально)
+            workspace_name: Имя рабочей папки (опционально)
+
+        Returns:
+            list[AggregatedDocument]: Найденные документы
+        """
+        needle = query.strip().casefold()
+        result = []
+
+        for item in self.documents:
+            if folder and item.folder != folder:
+                continue
+            if category and item.document.category != category:
+                continue
+            if workspace_name and item.workspace.name != workspace_name:
+                continue
+            if needle and needle not in item.search_text:
+                continue
+            result.append(item)
+
+        return result
@@ -0,0 +1,143 @@
+"""
+Клиент локального HTTP/JSON сервиса ISO2 (server.py)
+Кэширует ответы по ETag: неизменившиеся данные не передаются повторно
+"""
+
+import json
+import os
+import time
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+
+from config import load_settings, API_TIMEOUT, API_RETRY_SECONDS
+
+
+class ApiUnavailable(Exception):
+    """Сервис недоступен или вернул ошибку (вызывающий код переходит на локальное сканирование)"""
+
+
+class ApiClient:
+    """Запросы к сервису с кэшем по ETag"""
+
+    def __init__(self, base_url, timeout=API_TIMEOUT):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self._cache = {}    # {url: (etag, данные)}
+
+    def _get(self, path, fresh=False, **params):
+        """
+        GET-запрос, ответ JSON (при 304 - данные из кэша)
+
+        Args:
+            fresh: Попросить сервис проверить папки сейчас, не дожидаясь
+                   периода обновления (после изменений с этого компьютера)
+
+        Raises:
+            ApiUnavailable: Сервис недоступен или ответил ошибкой
+        """
+        params = {name: value for name, value in params.items() if value}
+        url = self.base_url + path
+        if params:
+            url += "?" + urlencode(params)
+
+        request = Request(url)
+        cached = self._cache.get(url)
+        if cached:
+            request.add_header("If-None-Match", cached[0])
+        if fresh:
+            request.add_header("Cache-Control", "no-cache")
+
+        try:
+            with urlopen(request, timeout=self.timeout) as response:
+                data = json.loads(response.read().decode("utf-8"))
+                etag = response.headers.get("ETag")
+        except HTTPError as e:
+            if e.code == 304 and cached:
+                return cached[1]
+            raise ApiUnavailable(f"{url}: HTTP {e.code}")
+        except (URLError, OSError, ValueError) as e:
+            raise ApiUnavailable(f"{url}: {e}")
+
+        if etag:
+            self._cache[url] = (etag, data)
+        return data
+
+    def health(self):
+        return self._get("/health")
+
+    def documents(self, folder="all", category=None, query=None, fresh=False):
+        """Документы папки: list[dict] (поля Document.to_dict и folder)"""
+        return self._get("/documents", fresh, folder=folder, category=category, q=query)["documents"]
+
+    def query(self, text, fresh=False):
+        """Документы по запросу на поля (query.py): list[dict] (поля Document.to_dict и folder)"""
+        return self._get("/query", fresh, q=text)["documents"]
+
+    def similar(self, filename, fresh=False):
+        """Похожие документы в ДЕЙСТВУЮЩИХ для файла из ПРОЕКТОВ: list[dict]"""
+        return self._get("/similar", fresh, file=filename)["similar"]
+
+    def registry(self, category=None):
+        """Документы актуальных реестров: {категория: [{номер, название}]}"""
+        return self._get("/registry", category=category)["registries"]
+
+    def serves(self, workspace):
+        """Обслуживает ли сервис эту рабочую папку"""
+        try:
+            docs_dir = self.health()["docs_dir"]
+        except (ApiUnavailable, KeyError):
+            return False
+        return os.path.normcase(os.path.abspath(docs_dir)) == os.path.normcase(workspace.docs_dir)
+
+
+def get_api_client(workspace):
+    """
+    Клиент сервиса для рабочей папки (адрес - "api_url" в настройках)
+
+    Args:
+        workspace: Рабочее пространство
+
+    Returns:
+        ApiClient: Клиент или None (сервис не настроен, недоступен
+                   или обслуживает другую рабочую папку)
+    """
+    base_url = load_settings().get('api_url')
+    if not base_url:
+        return None
+
+    # Проверка сервиса: {"api_client": (адрес, клиент или None, время проверки)}.
+    # Доступный сервис проверяется один раз для адреса, недоступный - снова
+    # через API_RETRY_SECONDS (мог быть перезапущен после старта программы)
+    cached = workspace.cache.get("api_client")
+    if cached and cached[0] == base_url:
+        if cached[1] is not None or time.monotonic() - cached[2] < API_RETRY_SECONDS:
+            return cached[1]
+
+    client = ApiClient(base_url)
+    if not client.serves(workspace):
+        print(f"Сервис {base_url} недоступен или обслуживает другую папку, используется локальное сканирование")
+        client = None
+
+    workspace.cache["api_client"] = (base_url, client, time.monotonic())
+    return client
+
+
+def documents_from_dicts(items):
+    """
+    Документы из ответа сервиса
+
+    Args:
+        items: list[dict] с полями path, category и bundle
+
+    Returns:
+        list[Document]: Документы
+    """
+    from logic import Document
+
+    documents = []
+    for item in items:
+        doc = Document(item["filename"], os.path.dirname(item["path"]), item["category"])
+        doc.bundle = item.get("bundle")
+        documents.append(doc)
+    return documents
@@ -0,0 +1,318 @@
+"""
+Упаковка АРХИВА в ZIP по годам
+Старые версии документов из АРХИВ/<категория> переносятся в
+АРХИВ/<категория>/_ПАКЕТЫ/<год>.zip. Рядом с каждым пакетом лежит индекс
+<год>.json - список документов без открытия ZIP. Упакованные документы
+показываются в АРХИВЕ как обычные (scan_folder_with_categories), отдельный
+документ читается из пакета без распаковки остальных.
+"""
+
+import json
+import os
+import time
+import zipfile
+from datetime import datetime
+
+import perf
+from config import ARCHIVE_PACK_MIN_AGE_DAYS
+from workspace import resolve_workspace
+
+
+# Версия формата индекса пакета
+INDEX_VERSION = 1
+
+
+def _bundle_paths(packed_dir, year):
+    """Пути пакета и его индекса"""
+    return os.path.join(packed_dir, f"{year}.zip"), os.path.join(packed_dir, f"{year}.json")
+
+
+def _read_index(storage, index_path):
+    """
+    Прочитать индекс пакета
+
+    Returns:
+        dict: {имя файла: {size, mtime_ns}} (пустой, если индекса нет)
+    """
+    try:
+        data = json.loads(storage.read_text(index_path))
+    except (OSError, ValueError):
+        return {}
+    return data.get("members", {})
+
+
+def packed_documents(category, workspace=None):
+    """
+    Упакованные документы категории АРХИВА (по индексам, без открытия ZIP)
+
+    Результат кэшируется до изменения папки пакетов.
+
+    Args:
+        category: Категория документа
+        workspace: Рабочее пространство (по умолчанию текущее)
+
+    Returns:
+        list[Document]: Документы с заполненным bundle (путь к ZIP)
+    """
+    from logic import Document
+
+    workspace = resolve_workspace(workspace)
+    storage = workspace.storage
+    packed_dir = workspace.archive_packed[category]
+
+    try:
+        mtime = storage.stat(packed_dir).mtime_ns
+    except OSError:
+        return []
+
+    cache_key = (packed_dir, category)
+    cached = workspace.scan_cache.get(cache_key)
+    if cached and cached[0] == mtime:
+        return list(cached[1])
+
+    folder_path = workspace.archive_categories[category]
+    documents = []
+    for name in sorted(storage.listdir(packed_dir)):
+        if not name.endswith(".json"):
+            continue
+        bundle = os.path.join(packed_dir, name[:-len(".json")] + ".zip")
+        for filename in _read_index(storage, os.path.join(packed_dir, name)):
+            doc = Document(filename, folder_path, category)
+            doc.bundle = bundle
+            documents.append(doc)
+
+    workspace.scan_cache[cache_key] = (mtime, documents)
+    return list(documents)
+
+
+def _document_year(doc, mtime_ns):
+    """Год пакета: год из имени документа, для имён не по шаблону - год изменения файла"""
+    if doc.is_valid:
+        return doc.year
+    return str(datetime.fromtimestamp(mtime_ns / 1e9).year)
+
+
+def _zip_info(filename, mtime_ns):
+    # ZIP хранит время с 1980 года
+    moment = datetime.fromtimestamp(max(mtime_ns / 1e9, 315532800))
+    info = zipfile.ZipInfo(filename, date_time=moment.timetuple()[:6])
+    info.compress_type = zipfile.ZIP_DEFLATED
+    return info
+
+
+def plan_packing(category, min_age_days=ARCHIVE_PACK_MIN_AGE_DAYS, workspace=None, now=None):
+    """
+    Какие документы категории АРХИВА пора упаковать
+
+    Args:
+        category: Категория документа
+        min_age_days: Минимальный возраст файла (дней с последнего изменения)
+        workspace: Рабочее пространство (по умолчанию текущее)
+        now: Текущее время (секунды, для проверок)
+
+    Returns:
+        dict: {год: [(Document, mtime_ns)]}
+    """
+    from logic import scan_folder
+
+    workspace = resolve_workspace(workspace)
+    storage = workspace.storage
+    threshold_ns = int(((now or time.time()) - min_age_days * 86400) * 1e9)
+
+    plan = {}
+    for doc in scan_folder(workspace.archive_categories[category], category, workspace):
+        try:
+            mtime_ns = storage.stat(doc.full_path).mtime_ns
+        except OSError:
+            continue
+        if mtime_ns <= threshold_ns:
+            plan.setdefault(_document_year(doc, mtime_ns), []).append((doc, mtime_ns))
+    return plan
+
+
+def _pack_bundle(storage, packed_dir, year, items):
+    """
+    Добавить документы в пакет года и переписать его индекс
+
+    Пакет не дописывается на месте: новый ZIP (прежние записи и новые
+    документы) пишется во временный файл и заменяет старый атомарно, так
+    что сбой или нехватка места не портят уже упакованные документы.
+
+    Returns:
+        tuple: (упакованные Document, пропущенные имена)
+    """
+    bundle_path, index_path = _bundle_paths(packed_dir, year)
+    members = _read_index(storage, index_path)
+    exists = storage.exists(bundle_path)
+
+    packed = []
+    skipped = []
+    tmp_bundle = bundle_path + ".tmp"
+    try:
+        with storage.open(tmp_bundle, 'wb') as out, zipfile.ZipFile(out, 'w') as bundle:
+            present = {}
+            # Содержимое записей пакета, чьи имена совпадают с упаковываемыми файлами
+            colliding = {}
+            names = {doc.filename for doc, _ in items}
+            if exists:
+                with storage.open(bundle_path, 'rb') as f, zipfile.ZipFile(f) as old:
+                    for info in old.infolist():
+                        data = old.read(info)
+                        bundle.writestr(info, data)
+                        present[info.filename] = info
+                        if info.filename in names:
+                            colliding[info.filename] = data
+
+            for doc, mtime_ns in items:
+                data = storage.read_bytes(doc.full_path)
+                if doc.filename in present:
+                    # Уже в пакете (сбой до удаления файла) - удаляем только точную копию,
+                    # другой файл с тем же именем остаётся в папке
+                    if data == colliding[doc.filename]:
+                        packed.append(doc)
+                    else:
+                        skipped.append(doc.filename)
+                    continue
+
+                bundle.writestr(_zip_info(doc.filename, mtime_ns), data)
+                members[doc.filename] = {"size": len(data), "mtime_ns": mtime_ns}
+                packed.append(doc)
+
+        # Индекс строится и по самому ZIP: после сбоя между заменой пакета
+        # и индекса ничего не теряется
+        for name, info in present.items():
+            members.setdefault(name, {
+                "size": info.file_size,
+                "mtime_ns": int(datetime(*info.date_time).timestamp() * 1e9),
+            })
+        storage.replace(tmp_bundle, bundle_path)
+    finally:
+        if storage.exists(tmp_bundle):
+            storage.remove(tmp_bundle)
+
+    # Индекс заменяется целиком: сначала пишется рядом, затем атомарно заменяет прежний
+    tmp_path = index_path + ".tmp"
+    storage.write_text(tmp_path, json.dumps(
+        {"version": INDEX_VERSION, "year": year, "members": dict(sorted(members.items()))},
+        ensure_ascii=False, indent=1
+    ))
+    storage.replace(tmp_path, index_path)
+
+    return packed, skipped
+
+
+def without_shadowed(loose, packed):
+    """
+    Упакованные документы без тех, чьё имя есть среди файлов папки категории
+
+    Файл, не упакованный из-за расхождения с записью в пакете (pack_archive
+    сообщает о нём в skipped), показывается один раз - как файл.
+
+    Args:
+        loose: Документы папки категории АРХИВА
+        packed: Упакованные документы той же категории
+
+    Returns:
+        list[Document]: Упакованные документы для показа
+    """
+    names = {doc.filename for doc in loose}
+    return [doc for doc in packed if doc.filename not in names]
+
+
+@perf.timed("archive.pack")
+def pack_archive(categories=None, min_age_days=ARCHIVE_PACK_MIN_AGE_DAYS, workspace=None, dry_run=False, now=None):
+    """
+    Упаковать старые документы АРХИВА в ZIP по годам
+
+    Файл удаляется из папки категории только после записи пакета и индекса.
+
+    Args:
+        categories: Категории (по умолчанию все)
+        min_age_days: Минимальный возраст файла (дней с последнего изменения)
+        workspace: Рабочее пространство (по умолчанию текущее)
+        dry_run: Только показать, что будет упаковано
+        now: Текущее время (секунды, для проверок)
+
+    Returns:
+        dict: {packed: количество, bundles: {категория: {год: количество}}, skipped: [имя]}
+    """
+    workspace = resolve_workspace(workspace)
+    storage = workspace.storage
+
+    result = {"packed": 0, "bundles": {}, "skipped": []}
+    for category in categories or list(workspace.archive_categories):
+        plan = plan_packing(category, min_age_days, workspace, now)
+        if not plan:
+            continue
+
+        counts = result["bundles"].setdefault(category, {})
+        if dry_run:
+            for year, items in sorted(plan.items()):
+                counts[year] = len(items)
+                result["packed"] += len(items)
+            continue
+
+        packed_dir = workspace.archive_packed[category]
+        storage.makedirs(packed_dir)
+
+        for year, items in sorted(plan.items()):
+            try:
+                packed, skipped = _pack_bundle(storage, packed_dir, year, items)
+            except (OSError, zipfile.BadZipFile) as e:
+                print(f"Ошибка упаковки {category}/{year}: {e}")
+                result["skipped"].extend(doc.filename for doc, _ in items)
+                continue
+
+            for doc in packed:
+                storage.remove(doc.full_path)
+            counts[year] = len(packed)
+            result["packed"] += len(packed)
+            result["skipped"].extend(skipped)
+
+        workspace.invalidate_folder(workspace.archive_categories[category])
+        workspace.invalidate_folder(packed_dir)
+        print(f"Упаковано в АРХИВЕ '{category}': {sum(counts.values())}")
+
+    return result
+
+
+def read_packed(doc, workspace=None):
+    """
+    Прочитать упакованный документ (только его запись в ZIP)
+
+    Args:
+        doc: Document с заполненным bundle
+
+    Returns:
+        bytes: Содержимое файла
+    """
+    storage = resolve_workspace(workspace).storage
+    with storage.open(doc.bundle, 'rb') as f:
+        with zipfile.ZipFile(f) as bundle:
+            return bundle.read(doc.filename)
+
+
+def extract_packed(doc, target_dir, workspace=None):
+    """
+    Извлечь упакованный документ в папку (например, чтобы открыть его)
+
+    Args:
+        doc: Document с заполненным bundle
+        target_dir: Папка на локальном диске
+
+    Returns:
+        str: Путь к извлечённому файлу
+    """
+    workspace = resolve_workspace(workspace)
+    data = read_packed(doc, workspace)
+
+    os.makedirs(target_dir, exist_ok=True)
+    path = os.path.join(target_dir, doc.filename)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+    members = _read_index(workspace.storage, doc.bundle[:-len(".zip")] + ".json")
+    mtime_ns = members.get(doc.filename, {}).get("mtime_ns")
+    if mtime_ns:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+    return path
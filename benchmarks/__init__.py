@@ -0,0 +1,4 @@
+"""
+Бенчмарки ISO2
+Воспроизводимые замеры производительности (запуск: python -m benchmarks.<модуль>)
+"""
@@ -0,0 +1,222 @@
+"""
+Генератор синтетической рабочей папки для замеров
+
+Создаёт ПРОЕКТЫ/ДЕЙСТВУЮЩИЕ/АРХИВ/РЕЕСТРЫ заданного размера с именами
+по шаблону и с ошибками, справочник сотрудников и реестры категорий.
+Результат детерминирован для одного seed.
+
+Запуск (из папки проекта):
+    python -m benchmarks.generator ПАПКА --size 10000
+    python -m benchmarks.generator ПАПКА --size 100000 --invalid-ratio 0.05 --employees 2000 --seed 7
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+
+from config import CATEGORIES, DOCUMENT_TYPES, ALLOWED_EXTENSIONS
+
+
+# Доли файлов по папкам
+DEFAULT_DISTRIBUTION = {"projects": 0.05, "active": 0.35, "archive": 0.60}
+
+TITLE_WORDS = [
+    "Управление", "документацией", "Контроль", "качества", "Порядок", "проведения",
+    "аудита", "Анализ", "рисков", "Методика", "испытаний", "Инструкция", "охраны",
+    "труда", "Требования", "к", "поставщикам", "Обучение", "персонала", "Калибровка",
+    "оборудования", "Записи", "о", "несоответствиях", "Положение", "об", "отделе",
+]
+
+DEPARTMENTS = ["ФБП", "НПФ", "ОТК", "ОГМ", "ОК"]
+POSITIONS = ["Инженер", "Ведущий инженер", "Специалист", "Начальник отдела", "Аудитор", "Техник"]
+SURNAMES = ["Иванов", "Петров", "Сидоров", "Ёлкин", "Смирнов", "Кузнецов", "Попов", "Фёдоров", "Морозов"]
+NAMES = ["Иван", "Пётр", "Анна", "Мария", "Сергей", "Ольга", "Алексей", "Елена"]
+
+
+def _title(rng):
+    return " ".join(rng.choice(TITLE_WORDS) for _ in range(rng.randint(2, 5))).capitalize()
+
+
+def _invalid_name(rng, number):
+    """Имя не по шаблону (черновики, сканы, опечатки в метаданных)"""
+    ext = rng.choice(ALLOWED_EXTENSIONS)
+    variant = rng.randrange(4)
+    if variant == 0:
+        return f"Черновик {number}{ext}"
+    if variant == 1:
+        return f"scan_{number:07d}{ext}"
+    if variant == 2:
+        return f"ПП.К{number}-01-1999 Год вне диапазона{ext}"
+    return f"ПП-К{number}-01-2020 Нет точки{ext}"
+
+
+def generate_names(size, invalid_ratio=0.1, distribution=None, seed=0):
+    """
+    Сгенерировать имена файлов по папкам
+
+    У одного кода документа действующей обычно бывает последняя версия,
+    в архиве - предыдущие, в проектах - следующая (как в реальной работе).
+
+    Args:
+        size: Общее количество файлов
+        invalid_ratio: Доля имён не по шаблону
+        distribution: Доли папок {"projects", "active", "archive"}
+        seed: Зерно генератора
+
+    Returns:
+        dict: {"projects": [имя], "active": {категория: [имя]}, "archive": {категория: [имя]}}
+    """
+    rng = random.Random(seed)
+    distribution = distribution or DEFAULT_DISTRIBUTION
+
+    counts = {folder: int(size * share) for folder, share in distribution.items()}
+    counts["archive"] += size - sum(counts.values())
+
+    result = {
+        "projects": [],
+        "active": {c: [] for c in CATEGORIES},
+        "archive": {c: [] for c in CATEGORIES},
+    }
+
+    # Документы: код -> (тип, категория, название, год первой версии);
+    # архив - старые версии тех же кодов
+    documents_count = max(counts["active"], 1)
+    documents = []
+    for number in range(documents_count):
+        kod = f"К{number // 100 + 1}-{rng.randint(4, 10)}.{number % 100}"
+        documents.append((rng.choice(DOCUMENT_TYPES), kod, rng.choice(CATEGORIES), _title(rng),
+                          rng.randint(2000, 2014)))
+
+    used = set()
+
+    def make_name(number, version):
+        if rng.random() < invalid_ratio:
+            return _invalid_name(rng, number)
+        typ, kod, _, title, base_year = documents[number % documents_count]
+        # Год растёт вместе с версией; сдвиг на год не делает меньшую версию позже большей
+        year = base_year + version + rng.randint(0, 1)
+        ext = rng.choice(ALLOWED_EXTENSIONS)
+        return f"{typ}.{kod}-{version:02d}-{year} {title}{ext}"
+
+    def unique(name, number):
+        # Одинаковые имена в одной папке невозможны - добавляем номер к названию
+        while name in used:
+            stem, ext = os.path.splitext(name)
+            name = f"{stem} {number}{ext}"
+            number += 1
+        used.add(name)
+        return name
+
+    for number in range(counts["active"]):
+        category = documents[number % documents_count][2]
+        result["active"][category].append(unique(make_name(number, rng.randint(2, 9)), number))
+
+    for number in range(counts["archive"]):
+        category = documents[number % documents_count][2]
+        result["archive"][category].append(unique(make_name(number, 1), number))
+
+    for number in range(counts["projects"]):
+        result["projects"].append(unique(make_name(number, 10), number))
+
+    return result
+
+
+def generate_employees(count, seed=0):
+    """
+    Синтетический справочник сотрудников
+
+    Returns:
+        list[dict]: Сотрудники (id с 1)
+    """
+    rng = random.Random(seed + 1)
+    employees = []
+    for emp_id in range(1, count + 1):
+        surname = rng.choice(SURNAMES)
+        employees.append({
+            "id": emp_id,
+            "fio": f"{surname} {rng.choice(NAMES)} {rng.choice(NAMES)}ович {emp_id}",
+            "position": rng.choice(POSITIONS),
+            "department": rng.choice(DEPARTMENTS),
+            "email": f"user{emp_id}@example.com",
+        })
+    return employees
+
+
+def generate_workspace(target_dir, size=1000, invalid_ratio=0.1, distribution=None,
+                       employees=0, seed=0, storage=None, registries=True):
+    """
+    Создать синтетическую рабочую папку
+
+    Args:
+        target_dir: Путь к рабочей папке (будет создана)
+        size: Количество файлов документов
+        invalid_ratio: Доля имён не по шаблону
+        distribution: Доли папок {"projects", "active", "archive"}
+        employees: Количество сотрудников в справочнике
+        seed: Зерно генератора
+        storage: Хранилище (storage.Storage); по умолчанию - локальный диск.
+                 Для 1M файлов удобно MemoryStorage
+        registries: Создать реестры категорий
+
+    Returns:
+        Workspace: Рабочее пространство созданной папки
+    """
+    from workspace import Workspace
+    from logic import create_registry_for_category
+    from employees import save_employees
+
+    workspace = Workspace(target_dir, storage=storage)
+    storage = workspace.storage
+
+    # Сообщения о созданных папках и реестрах здесь не нужны
+    with contextlib.redirect_stdout(io.StringIO()):
+        workspace.create_folders()
+
+        names = generate_names(size, invalid_ratio, distribution, seed)
+        for name in names["projects"]:
+            storage.write_bytes(os.path.join(workspace.projects_dir, name), b"")
+        for key, folders in (("active", workspace.active_categories), ("archive", workspace.archive_categories)):
+            for category, files in names[key].items():
+                for name in files:
+                    storage.write_bytes(os.path.join(folders[category], name), b"")
+
+        if employees:
+            os.makedirs(workspace.docs_dir, exist_ok=True)
+            save_employees(generate_employees(employees, seed), workspace)
+
+        if registries:
+            for category in CATEGORIES:
+                create_registry_for_category(category, workspace)
+
+    return workspace
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Генератор синтетической рабочей папки ISO2")
+    parser.add_argument("target", help="путь к создаваемой рабочей папке")
+    parser.add_argument("--size", type=int, default=1000, help="количество файлов документов")
+    parser.add_argument("--invalid-ratio", type=float, default=0.1, help="доля имён не по шаблону")
+    parser.add_argument("--employees", type=int, default=0, help="количество сотрудников")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-registries", action="store_true", help="не создавать реестры")
+    args = parser.parse_args(argv)
+
+    workspace = generate_workspace(
+        args.target, args.size, args.invalid_ratio,
+        employees=args.employees, seed=args.seed, registries=not args.no_registries
+    )
+    print(json.dumps({
+        "docs_dir": workspace.docs_dir,
+        "size": args.size,
+        "employees": args.employees,
+        "seed": args.seed,
+    }, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,294 @@
+"""
+Замер потребления памяти ISO2 (tracemalloc)
+
+Синтетическая рабочая папка (benchmarks.generator) загружается по подсистемам:
+сканирование (scan_folder_with_categories), справочник сотрудников
+(load_employees и общий справочник в памяти) и реестры (чтение и разбор).
+Для каждой подсистемы - пик, сколько памяти остаётся занятым вместе с
+результатом и после его освобождения (кэши), и основные места выделения.
+Если пик или удерживаемая память превышают бюджет, скрипт завершается
+с кодом 1.
+
+Запуск (из папки проекта):
+    python -m benchmarks.memory
+    python -m benchmarks.memory --archived 200000 --employees 2000 --storage memory
+    python -m benchmarks.memory --size 50000 --budget scan.peak=80 --budget registry.retained=5
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import tracemalloc
+from datetime import datetime
+
+from benchmarks.generator import DEFAULT_DISTRIBUTION, generate_workspace
+from config import CATEGORIES
+
+
+# Бюджеты по умолчанию (МБ) для рабочей папки с 200 тыс. документов в АРХИВЕ.
+# Ключ - "подсистема.показатель", показатели: peak, retained, cached
+DEFAULT_BUDGETS_MB = {
+    "scan.peak": 350,
+    "scan.retained": 350,
+    "employees.peak": 20,
+    "employees.retained": 10,
+    "employee_repository.peak": 30,
+    "employee_repository.retained": 15,
+    "registry.peak": 80,
+    "registry.retained": 75,
+}
+
+# Бюджеты выше заданы для этого количества документов; для других размеров
+# пропорционально пересчитываются бюджеты сканирования и реестров
+BUDGET_DOCUMENTS = 333_000
+
+# Сколько кадров стека хранить для каждого выделения и сколько мест показывать
+TRACE_FRAMES = 8
+TOP_SITES = 10
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _mb(size):
+    return round(size / (1024 * 1024), 3)
+
+
+def build_subsystems(workspace):
+    """
+    Подсистемы для замера
+
+    Returns:
+        list[tuple]: (имя, функция () -> результат); результат удерживается
+                     до замера "retained", затем освобождается
+    """
+    from logic import scan_folder, scan_folder_with_categories
+    from registry import read_registry_content, get_registry_documents
+    from employees import load_employees
+    from employee_repository import get_employee_repository
+
+    ws = workspace
+
+    def scan():
+        return (
+            scan_folder(ws.projects_dir, None, ws),
+            scan_folder_with_categories(ws.active_dir, ws.active_categories, ws),
+            scan_folder_with_categories(ws.archive_dir, ws.archive_categories, ws),
+        )
+
+    def repository():
+        repo = get_employee_repository(ws)
+        return repo.all(), repo.search("а")
+
+    def registries():
+        return [(read_registry_content(c, ws), get_registry_documents(c, ws)) for c in CATEGORIES]
+
+    return [
+        ("scan", scan),
+        ("employees", lambda: load_employees(ws)),
+        ("employee_repository", repository),
+        ("registry", registries),
+    ]
+
+
+def top_sites(snapshot, top=TOP_SITES):
+    """
+    Основные места выделения памяти
+
+    Выделение приписывается самому внутреннему кадру из файлов проекта
+    (os.path.join внутри Document.__init__ -> logic.py), а не строке
+    стандартной библиотеки.
+
+    Returns:
+        list[dict]: {site, size_mb, count} по убыванию размера
+    """
+    sites = {}
+    # Группировка по полному стеку идёт по сырым записям - быстрее, чем filter_traces
+    for stat in snapshot.statistics("traceback"):
+        # Кадры идут от внешнего к внутреннему
+        frame = next((f for f in reversed(stat.traceback) if f.filename.startswith(PROJECT_DIR + os.sep)),
+                     stat.traceback[-1])
+        filename = frame.filename
+        if filename.startswith(PROJECT_DIR + os.sep):
+            filename = os.path.relpath(filename, PROJECT_DIR)
+        elif filename == tracemalloc.__file__:
+            continue
+        key = f"{filename}:{frame.lineno}"
+        size, count = sites.get(key, (0, 0))
+        sites[key] = (size + stat.size, count + stat.count)
+
+    ranked = sorted(sites.items(), key=lambda item: item[1][0], reverse=True)[:top]
+    return [{"site": site, "size_mb": _mb(size), "count": count} for site, (size, count) in ranked]
+
+
+def measure(run, workspace, top=TOP_SITES):
+    """
+    Замерить одну подсистему с пустыми кэшами рабочего пространства
+
+    Args:
+        run: Функция () -> результат
+        workspace: Рабочее пространство (кэши сбрасываются перед замером)
+        top: Сколько мест выделения показывать
+
+    Returns:
+        dict: {peak_mb, retained_mb, cached_mb, top}
+    """
+    workspace.clear_caches()
+    gc.collect()
+
+    tracemalloc.start(TRACE_FRAMES)
+    try:
+        result = run()
+        _, peak = tracemalloc.get_traced_memory()
+
+        gc.collect()
+        retained, _ = tracemalloc.get_traced_memory()
+        sites = top_sites(tracemalloc.take_snapshot(), top)
+
+        # После освобождения результата остаются только кэши
+        del result
+        gc.collect()
+        cached, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "peak_mb": _mb(peak),
+        "retained_mb": _mb(retained),
+        "cached_mb": _mb(cached),
+        "top": sites,
+    }
+
+
+def scale_budgets(budgets, documents):
+    """Пересчитать бюджеты сканирования и реестров на количество документов"""
+    factor = documents / BUDGET_DOCUMENTS
+    scaled = {}
+    for key, value in budgets.items():
+        if key.split(".")[0] in ("scan", "registry"):
+            value = value * factor
+        scaled[key] = round(value, 3)
+    return scaled
+
+
+def check_budgets(results, budgets):
+    """
+    Сравнить замеры с бюджетами
+
+    Returns:
+        list[dict]: Превышения {key, value_mb, budget_mb}
+    """
+    exceeded = []
+    for key, budget in sorted(budgets.items()):
+        subsystem, metric = key.rsplit(".", 1)
+        value = results.get(subsystem, {}).get(f"{metric}_mb")
+        if value is not None and value > budget:
+            exceeded.append({"key": key, "value_mb": value, "budget_mb": budget})
+    return exceeded
+
+
+def run_memory(size=10000, employees=1000, storage="local", invalid_ratio=0.1, seed=0,
+               budgets=None, top=TOP_SITES):
+    """
+    Сгенерировать рабочую папку и замерить память подсистем
+
+    Args:
+        size: Количество файлов документов
+        employees: Количество сотрудников
+        storage: "local" или "memory"
+        invalid_ratio: Доля имён не по шаблону
+        seed: Зерно генератора
+        budgets: Бюджеты {"подсистема.показатель": МБ} (None - DEFAULT_BUDGETS_MB по размеру)
+        top: Сколько мест выделения показывать
+
+    Returns:
+        dict: {meta, results, budgets, exceeded, ok}
+    """
+    from storage import LocalStorage, MemoryStorage
+
+    if budgets is None:
+        budgets = scale_budgets(DEFAULT_BUDGETS_MB, size)
+
+    tmp = tempfile.mkdtemp(prefix="iso2_memory_")
+    try:
+        workspace = generate_workspace(
+            os.path.join(tmp, "docs"), size, invalid_ratio, employees=employees, seed=seed,
+            storage=MemoryStorage() if storage == "memory" else LocalStorage()
+        )
+
+        results = {}
+        # Сообщения модулей (print) не смешиваются с результатом
+        with contextlib.redirect_stdout(io.StringIO()):
+            for name, run in build_subsystems(workspace):
+                results[name] = measure(run, workspace, top)
+
+        exceeded = check_budgets(results, budgets)
+        return {
+            "meta": {
+                "date": datetime.now().isoformat(timespec="seconds"),
+                "size": size,
+                "archived": int(size * DEFAULT_DISTRIBUTION["archive"]),
+                "employees": employees,
+                "storage": storage,
+                "seed": seed,
+            },
+            "results": results,
+            "budgets": budgets,
+            "exceeded": exceeded,
+            "ok": not exceeded,
+        }
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _parse_budget(text):
+    key, _, value = text.partition("=")
+    if "." not in key or not value:
+        raise argparse.ArgumentTypeError(f"Ожидается подсистема.показатель=МБ: {text}")
+    return key, float(value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Замер потребления памяти ISO2")
+    parser.add_argument("--size", type=int, default=10000, help="количество файлов документов")
+    parser.add_argument("--archived", type=int,
+                        help="количество документов в АРХИВЕ (вместо --size, остальные папки - пропорционально)")
+    parser.add_argument("--employees", type=int, default=1000, help="количество сотрудников")
+    parser.add_argument("--storage", choices=("local", "memory"), default="local")
+    parser.add_argument("--invalid-ratio", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--top", type=int, default=TOP_SITES, help="сколько мест выделения показывать")
+    parser.add_argument("--budget", action="append", type=_parse_budget, default=[],
+                        metavar="ПОДСИСТЕМА.ПОКАЗАТЕЛЬ=МБ", help="бюджет (заменяет бюджет по умолчанию)")
+    parser.add_argument("--no-default-budgets", action="store_true", help="проверять только --budget")
+    parser.add_argument("--output", help="сохранить JSON в файл (иначе - в stdout)")
+    args = parser.parse_args(argv)
+
+    size = args.size
+    if args.archived:
+        size = int(args.archived / DEFAULT_DISTRIBUTION["archive"])
+
+    budgets = {} if args.no_default_budgets else scale_budgets(DEFAULT_BUDGETS_MB, size)
+    budgets.update(dict(args.budget))
+
+    report = run_memory(size, args.employees, args.storage, args.invalid_ratio, args.seed, budgets, args.top)
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
+
+    for item in report["exceeded"]:
+        print(f"ПРЕВЫШЕН БЮДЖЕТ {item['key']}: {item['value_mb']} МБ > {item['budget_mb']} МБ", file=sys.stderr)
+    return 0 if report["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
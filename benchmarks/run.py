@@ -0,0 +1,279 @@
+"""
+Набор бенчмарков основных операций ISO2
+
+Рабочая папка создаётся генератором (benchmarks.generator) во временной
+папке, затем каждая операция выполняется несколько раз. Результат - JSON
+(можно сохранить и сравнить с прошлым прогоном через --baseline).
+
+Запуск (из папки проекта):
+    python -m benchmarks.run
+    python -m benchmarks.run --size 100000 --storage memory --output result.json
+    python -m benchmarks.run --size 10000 --storage latency --latency-ms 2 --only scan
+    python -m benchmarks.run --baseline old.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.generator import generate_workspace
+from config import CATEGORIES
+
+
+# Сколько документов из ПРОЕКТОВ сравнивать с ДЕЙСТВУЮЩИМИ в find_similar_documents
+SIMILAR_SAMPLE = 20
+
+# Сколько операций добавления/изменения/удаления сотрудников в одном замере
+EMPLOYEE_CRUD_OPS = 50
+
+
+class Case:
+    """Один бенчмарк: подготовка (не замеряется) и замеряемая операция"""
+
+    def __init__(self, name, run, setup=None, items=None, needs_openpyxl=False):
+        self.name = name
+        self.run = run              # функция (данные подготовки) -> None
+        self.setup = setup          # функция () -> данные подготовки
+        self.items = items          # количество элементов (для времени на элемент)
+        self.needs_openpyxl = needs_openpyxl
+
+
+def _make_storage(kind):
+    from storage import LocalStorage, MemoryStorage
+
+    if kind == "memory":
+        return MemoryStorage()
+    return LocalStorage()
+
+
+def build_cases(workspace, out_dir):
+    """
+    Список бенчмарков для рабочей папки
+
+    Args:
+        workspace: Рабочее пространство синтетической папки
+        out_dir: Папка для файлов экспорта
+
+    Returns:
+        list[Case]: Бенчмарки
+    """
+    from logic import (
+        parse_filename, scan_folder, scan_folder_with_categories,
+        find_similar_documents, create_registry_for_category
+    )
+    from registry import (
+        get_registry_documents, export_registry_to_csv,
+        export_registry_to_excel, export_all_registries_to_excel
+    )
+    import employees
+
+    ws = workspace
+    storage = ws.storage
+
+    # Все имена файлов (для parse_filename)
+    names = list(storage.listdir(ws.projects_dir))
+    for folders in (ws.active_categories, ws.archive_categories):
+        for path in folders.values():
+            names.extend(storage.listdir(path))
+
+    def scan_all():
+        scan_folder_with_categories(ws.active_dir, ws.active_categories, ws)
+        scan_folder_with_categories(ws.archive_dir, ws.archive_categories, ws)
+
+    active_docs = scan_folder_with_categories(ws.active_dir, ws.active_categories, ws)
+    project_docs = scan_folder(ws.projects_dir, None, ws)[:SIMILAR_SAMPLE]
+    biggest = max(CATEGORIES, key=lambda c: len(storage.listdir(ws.active_categories[c])))
+
+    def crud(_):
+        added = []
+        for i in range(EMPLOYEE_CRUD_OPS):
+            employees.add_employee(f"Бенчмарк {i}", "Инженер", "ФБП", f"bench{i}@example.com", ws)
+        for emp in employees.load_employees(ws):
+            if emp['fio'].startswith("Бенчмарк "):
+                added.append(emp['id'])
+        for emp_id in added:
+            employees.update_employee(emp_id, "Бенчмарк изм.", "Техник", "НПФ", "", ws)
+        for emp_id in added:
+            employees.delete_employee(emp_id, ws)
+
+    out = lambda name: os.path.join(out_dir, name)
+
+    return [
+        Case("parse_filename", lambda _: [parse_filename(n) for n in names], items=len(names)),
+        Case("scan_folder_with_categories.cold", lambda _: scan_all(), setup=ws.scan_cache.clear, items=len(names)),
+        Case("scan_folder_with_categories.warm", lambda _: scan_all(), items=len(names)),
+        Case("find_similar_documents",
+             lambda _: [find_similar_documents(doc, active_docs) for doc in project_docs],
+             items=max(len(project_docs), 1)),
+        Case("create_registry_for_category", lambda _: create_registry_for_category(biggest, ws)),
+        Case("get_registry_documents", lambda _: [get_registry_documents(c, ws) for c in CATEGORIES]),
+        Case("export_registry_to_csv", lambda _: export_registry_to_csv(biggest, out("registry.csv"), ws)),
+        Case("export_registry_to_excel", lambda _: export_registry_to_excel(biggest, out("registry.xlsx"), ws),
+             needs_openpyxl=True),
+        Case("export_all_registries_to_excel", lambda _: export_all_registries_to_excel(out("all.xlsx"), ws),
+             needs_openpyxl=True),
+        Case("export_employees_to_excel", lambda _: employees.export_employees_to_excel(out("emp.xlsx"), ws),
+             needs_openpyxl=True),
+        Case("export_employees_to_json", lambda _: employees.export_employees_to_json(out("emp.json"), ws)),
+        Case("load_employees", lambda _: employees.load_employees(ws)),
+        Case("employees.crud", crud, items=EMPLOYEE_CRUD_OPS * 3),
+    ]
+
+
+def _has_openpyxl():
+    try:
+        import openpyxl  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def run_case(case, repeat):
+    """
+    Выполнить бенчмарк repeat раз
+
+    Returns:
+        dict: {runs_ms, median_ms, min_ms, max_ms, items, per_item_us}
+    """
+    samples = []
+    for _ in range(repeat):
+        data = case.setup() if case.setup else None
+        start = time.perf_counter()
+        case.run(data)
+        samples.append((time.perf_counter() - start) * 1000)
+
+    median = statistics.median(samples)
+    result = {
+        "runs_ms": [round(s, 3) for s in samples],
+        "median_ms": round(median, 3),
+        "min_ms": round(min(samples), 3),
+        "max_ms": round(max(samples), 3),
+    }
+    if case.items:
+        result["items"] = case.items
+        result["per_item_us"] = round(median * 1000 / case.items, 3)
+    return result
+
+
+def run_suite(size=1000, employees=500, repeat=3, storage="local", latency_ms=2.0,
+              invalid_ratio=0.1, seed=0, only=None):
+    """
+    Сгенерировать рабочую папку и выполнить набор бенчмарков
+
+    Args:
+        size: Количество файлов документов
+        employees: Количество сотрудников
+        repeat: Повторов каждого замера
+        storage: "local", "memory" или "latency"
+        latency_ms: Задержка одной операции для storage="latency"
+        invalid_ratio: Доля имён не по шаблону
+        seed: Зерно генератора
+        only: Подстроки имён бенчмарков (None - все)
+
+    Returns:
+        dict: {meta, results}
+    """
+    tmp = tempfile.mkdtemp(prefix="iso2_bench_")
+    try:
+        docs_dir = os.path.join(tmp, "docs")
+        out_dir = os.path.join(tmp, "out")
+        os.makedirs(out_dir)
+
+        started = time.perf_counter()
+        workspace = generate_workspace(
+            docs_dir, size, invalid_ratio, employees=employees, seed=seed,
+            storage=_make_storage(storage)
+        )
+        generate_ms = (time.perf_counter() - started) * 1000
+
+        # Задержка добавляется после генерации - замеряются только операции
+        if storage == "latency":
+            from storage import LatencyStorage
+            workspace.storage = LatencyStorage(workspace.storage, latency=latency_ms / 1000)
+
+        openpyxl_available = _has_openpyxl()
+        results = {}
+
+        # Сообщения модулей (print) не смешиваются с результатом
+        with contextlib.redirect_stdout(io.StringIO()):
+            for case in build_cases(workspace, out_dir):
+                if only and not any(part in case.name for part in only):
+                    continue
+                if case.needs_openpyxl and not openpyxl_available:
+                    results[case.name] = {"skipped": "openpyxl не установлен"}
+                    continue
+                results[case.name] = run_case(case, repeat)
+
+        return {
+            "meta": {
+                "date": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "size": size,
+                "employees": employees,
+                "invalid_ratio": invalid_ratio,
+                "seed": seed,
+                "repeat": repeat,
+                "storage": storage,
+                "latency_ms": latency_ms if storage == "latency" else None,
+                "generate_ms": round(generate_ms, 1),
+            },
+            "results": results,
+        }
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def compare_with_baseline(report, baseline):
+    """Добавить к результатам медиану прошлого прогона и отношение (новое / старое)"""
+    for name, result in report["results"].items():
+        old = baseline.get("results", {}).get(name, {})
+        if "median_ms" in result and old.get("median_ms"):
+            result["baseline_median_ms"] = old["median_ms"]
+            result["ratio"] = round(result["median_ms"] / old["median_ms"], 3)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарки основных операций ISO2")
+    parser.add_argument("--size", type=int, default=1000, help="количество файлов документов")
+    parser.add_argument("--employees", type=int, default=500, help="количество сотрудников")
+    parser.add_argument("--repeat", type=int, default=3, help="повторов каждого замера")
+    parser.add_argument("--storage", choices=("local", "memory", "latency"), default="local")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="задержка операции для --storage latency")
+    parser.add_argument("--invalid-ratio", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", action="append", help="только бенчмарки, содержащие подстроку")
+    parser.add_argument("--baseline", help="JSON прошлого прогона для сравнения")
+    parser.add_argument("--output", help="сохранить JSON в файл (иначе - в stdout)")
+    args = parser.parse_args(argv)
+
+    report = run_suite(
+        args.size, args.employees, args.repeat, args.storage, args.latency_ms,
+        args.invalid_ratio, args.seed, args.only
+    )
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            compare_with_baseline(report, json.load(f))
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
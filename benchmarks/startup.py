@@ -0,0 +1,139 @@
+"""
+Бенчмарк времени запуска ISO2
+
+Каждый прогон - отдельный процесс Python (холодный старт импортов).
+Замеряется путь до первой отрисовки окна (импорт main + создание Tk)
+и отложенная часть (импорт gui_main). Если медиана превышает бюджет,
+скрипт завершается с кодом 1 - это можно использовать как регрессионную проверку.
+
+Запуск:
+    python -m benchmarks.startup
+    python -m benchmarks.startup --runs 10 --budget-ms 300 --json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+
+# Бюджет на путь до первой отрисовки окна (медиана, мс)
+STARTUP_BUDGET_MS = 300
+
+# Модули, которых не должно быть в памяти до первой отрисовки
+DEFERRED_MODULES = ["gui_main", "logic", "registry", "employees", "openpyxl"]
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Код, выполняемый в дочернем процессе
+PROBE = r"""
+import json, os, sys, time
+t0 = time.perf_counter()
+import main
+t_import = time.perf_counter()
+
+first_paint = None
+if os.environ.get("DISPLAY") or sys.platform in ("win32", "darwin"):
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+        main.show_startup_window(root)
+        root.update()
+        first_paint = (time.perf_counter() - t0) * 1000
+        root.destroy()
+    except Exception:
+        first_paint = None
+
+loaded_early = [m for m in %(deferred)r if m in sys.modules]
+
+t1 = time.perf_counter()
+import gui_main
+t_deferred = time.perf_counter()
+
+print(json.dumps({
+    "import_main_ms": (t_import - t0) * 1000,
+    "first_paint_ms": first_paint,
+    "deferred_import_ms": (t_deferred - t1) * 1000,
+    "loaded_early": loaded_early,
+}))
+"""
+
+
+def run_once():
+    """
+    Один холодный запуск в отдельном процессе
+
+    Returns:
+        dict: Замеры одного прогона
+    """
+    code = PROBE % {"deferred": DEFERRED_MODULES}
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=PROJECT_DIR, capture_output=True, text=True, check=True
+    )
+    # Последняя строка - JSON (выше может быть вывод print из модулей)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def run_benchmark(runs=5, budget_ms=STARTUP_BUDGET_MS):
+    """
+    Выполнить серию запусков и сравнить с бюджетом
+
+    Args:
+        runs: Количество прогонов
+        budget_ms: Бюджет на путь до первой отрисовки (мс)
+
+    Returns:
+        dict: Сводка {runs, budget_ms, median_ms, ..., ok}
+    """
+    samples = [run_once() for _ in range(runs)]
+
+    # Если дисплея нет - бюджет проверяется по импорту main
+    if all(s["first_paint_ms"] is not None for s in samples):
+        metric = "first_paint_ms"
+    else:
+        metric = "import_main_ms"
+
+    values = [s[metric] for s in samples]
+    median = statistics.median(values)
+    loaded_early = sorted({m for s in samples for m in s["loaded_early"]})
+
+    return {
+        "runs": runs,
+        "metric": metric,
+        "budget_ms": budget_ms,
+        "median_ms": round(median, 2),
+        "min_ms": round(min(values), 2),
+        "max_ms": round(max(values), 2),
+        "deferred_import_median_ms": round(statistics.median(s["deferred_import_ms"] for s in samples), 2),
+        "loaded_early": loaded_early,
+        "ok": median <= budget_ms and not loaded_early,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк времени запуска ISO2")
+    parser.add_argument("--runs", type=int, default=5, help="количество прогонов")
+    parser.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS, help="бюджет, мс")
+    parser.add_argument("--json", action="store_true", help="вывести результат в JSON")
+    args = parser.parse_args(argv)
+
+    summary = run_benchmark(args.runs, args.budget_ms)
+
+    if args.json:
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+    else:
+        print(f"{summary['metric']}: медиана {summary['median_ms']} мс "
+              f"(мин {summary['min_ms']}, макс {summary['max_ms']}), бюджет {summary['budget_ms']} мс")
+        print(f"Отложенный импорт gui_main: {summary['deferred_import_median_ms']} мс")
+        if summary["loaded_early"]:
+            print(f"Загружены до первой отрисовки: {', '.join(summary['loaded_early'])}")
+        print("OK" if summary["ok"] else "ПРЕВЫШЕН БЮДЖЕТ")
+
+    return 0 if summary["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
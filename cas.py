@@ -0,0 +1,237 @@
+"""
+Хранилище АРХИВА по содержимому
+Каждый файл, попадающий в АРХИВ, хешируется (SHA-256) один раз. Содержимое
+хранится в АРХИВ/.objects/<2 символа>/<хеш>, а сам файл архива становится
+жёсткой ссылкой на объект: одинаковые файлы АРХИВА не занимают места
+повторно. Для пользователя архив выглядит как раньше - те же имена в тех
+же папках.
+
+Дедуплицируются только файлы внутри АРХИВА. Файл в ДЕЙСТВУЮЩИХ никогда не
+становится ссылкой: его редактируют на месте (Word, LibreOffice), и правка
+изменила бы и архивную версию. Поэтому при повторной публикации только с
+новым именем копия занимает место, пока версия действующая, - и становится
+ссылкой на тот же объект, когда сама уходит в АРХИВ.
+
+Включается настройкой "archive_cas": true в iso2_settings.json. Если
+файловая система не поддерживает жёсткие ссылки, файл перемещается
+обычным образом (без экономии места).
+"""
+
+import hashlib
+import json
+import os
+
+import perf
+from config import load_settings, CAS_OBJECTS_DIR
+from workspace import resolve_workspace
+
+
+# Размер блока при хешировании
+HASH_CHUNK = 1024 * 1024
+
+
+def is_enabled():
+    """Включено ли хранение АРХИВА по содержимому"""
+    return bool(load_settings().get('archive_cas'))
+
+
+def file_digest(storage, path):
+    """SHA-256 файла (читается блоками)"""
+    digest = hashlib.sha256()
+    with storage.open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ObjectStore:
+    """
+    Объекты АРХИВА и индекс ссылок на них
+
+    Индекс (.objects/index.json): {путь в АРХИВЕ: [размер, mtime_ns, хеш]} -
+    по нему повторная обработка не хеширует неизменившиеся файлы.
+    """
+
+    def __init__(self, workspace):
+        self.workspace = workspace
+        self.objects_dir = os.path.join(workspace.archive_dir, CAS_OBJECTS_DIR)
+        self.index_path = os.path.join(self.objects_dir, "index.json")
+        self._index = None
+        self._dirty = False
+
+    @property
+    def storage(self):
+        return self.workspace.storage
+
+    @property
+    def index(self):
+        if self._index is None:
+            try:
+                self._index = json.loads(self.storage.read_text(self.index_path))
+            except (OSError, ValueError):
+                self._index = {}
+        return self._index
+
+    def _relative(self, path):
+        return os.path.relpath(path, self.workspace.archive_dir)
+
+    def object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def _remember(self, path, digest):
+        st = self.storage.stat(path)
+        self.index[self._relative(path)] = [st.size, st.mtime_ns, digest]
+        self._dirty = True
+
+    def known_digest(self, path):
+        """Хеш из индекса, если файл с тех пор не менялся (иначе None)"""
+        entry = self.index.get(self._relative(path))
+        if not entry:
+            return None
+        try:
+            st = self.storage.stat(path)
+        except OSError:
+            return None
+        return entry[2] if [st.size, st.mtime_ns] == entry[:2] else None
+
+    def _ensure_object(self, path, digest):
+        """
+        Сделать файл архива ссылкой на объект
+
+        Returns:
+            int: Сэкономлено байт - размер файла, если такой объект уже был,
+                 None - файл стал новым объектом
+        """
+        obj = self.object_path(digest)
+        if not self.storage.exists(obj):
+            # Первый файл с таким содержимым сам становится объектом
+            self.storage.makedirs(os.path.dirname(obj))
+            self.storage.link(path, obj)
+            return None
+
+        # Такое содержимое уже есть: файл заменяется ссылкой на объект
+        size = self.storage.stat(path).size
+        tmp = path + ".cas_tmp"
+        self.storage.link(obj, tmp)
+        self.storage.replace(tmp, path)
+        return size
+
+    def archive_move(self, src, dst):
+        """
+        Переместить файл в АРХИВ с дедупликацией по содержимому
+
+        Args:
+            src: Файл в ДЕЙСТВУЮЩИХ
+            dst: Путь в АРХИВЕ
+
+        Returns:
+            int: Сэкономлено байт
+        """
+        digest = file_digest(self.storage, src)
+        self.storage.move(src, dst)
+        try:
+            saved = self._ensure_object(dst, digest)
+        except OSError as e:
+            print(f"Дедупликация АРХИВА недоступна ({e}), файл перемещён без неё")
+            return 0
+        self._remember(dst, digest)
+        return saved or 0
+
+    @perf.timed("cas.ingest")
+    def ingest(self, folders=None):
+        """
+        Перевести существующие файлы АРХИВА на хранение по содержимому
+
+        Хешируются только новые и изменившиеся файлы (по индексу).
+
+        Args:
+            folders: Папки категорий АРХИВА (по умолчанию все)
+
+        Returns:
+            dict: {files, hashed, linked, saved_bytes}
+        """
+        from config import ALLOWED_EXTENSIONS
+
+        result = {"files": 0, "hashed": 0, "linked": 0, "saved_bytes": 0}
+        for folder in folders or self.workspace.archive_categories.values():
+            try:
+                names = self.storage.listdir(folder)
+            except OSError:
+                continue
+
+            for name in names:
+                if os.path.splitext(name)[1].lower() not in ALLOWED_EXTENSIONS:
+                    continue
+                path = os.path.join(folder, name)
+                result["files"] += 1
+                if self.known_digest(path):
+                    continue
+
+                digest = file_digest(self.storage, path)
+                result["hashed"] += 1
+                try:
+                    saved = self._ensure_object(path, digest)
+                except OSError as e:
+                    print(f"Не удалось связать {name} с объектом: {e}")
+                    continue
+                if saved is not None:
+                    result["linked"] += 1
+                    result["saved_bytes"] += saved
+                self._remember(path, digest)
+
+            self.workspace.invalidate_folder(folder)
+
+        self.save()
+        return result
+
+    def collect_garbage(self):
+        """
+        Удалить объекты, на которые больше не ссылается ни один файл АРХИВА
+        (документ упакован в ZIP или удалён вручную)
+
+        Returns:
+            int: Количество удалённых объектов
+        """
+        archive_dir = self.workspace.archive_dir
+        for relative in list(self.index):
+            if not self.storage.exists(os.path.join(archive_dir, relative)):
+                del self.index[relative]
+                self._dirty = True
+
+        used = {entry[2] for entry in self.index.values()}
+        removed = 0
+        try:
+            prefixes = self.storage.listdir(self.objects_dir)
+        except OSError:
+            return 0
+        for prefix in prefixes:
+            prefix_dir = os.path.join(self.objects_dir, prefix)
+            if not self.storage.stat(prefix_dir).is_dir:
+                continue
+            for digest in self.storage.listdir(prefix_dir):
+                if digest not in used:
+                    self.storage.remove(os.path.join(prefix_dir, digest))
+                    removed += 1
+
+        self.save()
+        return removed
+
+    def save(self):
+        """Записать индекс (если менялся)"""
+        if not self._dirty:
+            return
+        self.storage.makedirs(self.objects_dir)
+        tmp = self.index_path + ".tmp"
+        self.storage.write_text(tmp, json.dumps(self.index, ensure_ascii=False))
+        self.storage.replace(tmp, self.index_path)
+        self._dirty = False
+
+
+def get_object_store(workspace=None):
+    """Хранилище объектов АРХИВА рабочей папки (одно на рабочее пространство)"""
+    workspace = resolve_workspace(workspace)
+    store = workspace.cache.get("cas_store")
+    if store is None:
+        store = ObjectStore(workspace)
+        workspace.cache["cas_store"] = store
+    return store
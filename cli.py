@@ -0,0 +1,510 @@
+"""
+Командная строка ISO2 (без графического интерфейса)
+Сканирование, публикация, реестры и экспорт для скриптов и серверов
+
+Запуск: python -m cli [--work-dir ПАПКА] КОМАНДА ...
+Результат печатается в stdout в виде JSON, сообщения модулей - в stderr.
+tkinter здесь не импортируется.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+
+import config
+from config import CATEGORIES
+
+
+class CliError(Exception):
+    """Ошибка команды (печатается как {"ok": false, "error": ...})"""
+
+
+# Папки рабочей папки для команды scan
+SCAN_FOLDERS = ("projects", "active", "archive")
+
+
+def _collect_documents(workspace, folder, category=None):
+    """Документы папки: projects / active / archive (с фильтром по категории)"""
+    from logic import scan_folder, scan_folder_with_categories
+
+    if folder == "projects":
+        docs = scan_folder(workspace.projects_dir, None, workspace)
+    elif folder == "active":
+        docs = scan_folder_with_categories(workspace.active_dir, workspace.active_categories, workspace)
+    else:
+        docs = scan_folder_with_categories(workspace.archive_dir, workspace.archive_categories, workspace)
+
+    if category:
+        docs = [doc for doc in docs if doc.category == category]
+    return docs
+
+
+def _check_category(category):
+    if category not in CATEGORIES:
+        raise CliError(f"Неизвестная категория: {category}. Допустимые: {', '.join(CATEGORIES)}")
+
+
+# Команды
+
+def cmd_scan(args, workspace):
+    folders = SCAN_FOLDERS if args.folder == "all" else (args.folder,)
+    if args.category:
+        _check_category(args.category)
+
+    documents = []
+    for folder in folders:
+        for doc in _collect_documents(workspace, folder, args.category):
+            if args.invalid_only and doc.is_valid:
+                continue
+            item = doc.to_dict()
+            item["folder"] = folder
+            documents.append(item)
+
+    documents.sort(key=lambda d: (d["folder"], d["category"] or "", d["filename"]))
+    return {"count": len(documents), "documents": documents}
+
+
+def cmd_similar(args, workspace):
+    from logic import Document, find_similar_documents
+
+    source = Document(args.file, workspace.projects_dir)
+    similar = find_similar_documents(source, _collect_documents(workspace, "active"))
+    return {"document": source.to_dict(), "similar": [doc.to_dict() for doc in similar]}
+
+
+def _check_manifest_item(item):
+    """Структура элемента манифеста (до публикации чего-либо)"""
+    if not isinstance(item, dict):
+        raise CliError(f"Элемент манифеста должен быть объектом: {json.dumps(item, ensure_ascii=False)}")
+    for name in ("file", "category", "typ", "kod", "version", "year", "title"):
+        # Версия и год могут быть записаны числом
+        allowed = (str, int) if name in ("version", "year") else str
+        if item.get(name) is not None and (not isinstance(item[name], allowed) or isinstance(item[name], bool)):
+            raise CliError(f"Поле {name} должно быть строкой: {json.dumps(item, ensure_ascii=False)}")
+    archive = item.get("archive")
+    if archive not in (None, "similar") and not (
+            isinstance(archive, list) and all(isinstance(name, str) for name in archive)):
+        raise CliError(f'Поле archive - список имён файлов или "similar": {json.dumps(item, ensure_ascii=False)}')
+
+
+def _publish_one(workspace, item, create_registry=True):
+    """
+    Опубликовать один документ из ПРОЕКТОВ
+
+    Args:
+        item: {file, category, typ?, kod?, version?, year?, title?, archive?}
+              archive - список имён файлов из ДЕЙСТВУЮЩИХ или "similar"
+
+    Returns:
+        dict: Результат публикации
+    """
+    from logic import Document, build_filename, find_similar_documents, publish_document
+
+    _check_manifest_item(item)
+    filename = item.get("file")
+    category = item.get("category")
+    if not filename:
+        raise CliError("Не указан файл документа")
+    _check_category(category)
+
+    source = Document(os.path.basename(filename), workspace.projects_dir)
+    if not workspace.storage.exists(source.full_path):
+        raise CliError(f"Файл не найден в ПРОЕКТАХ: {source.filename}")
+
+    # Поля по умолчанию берутся из имени файла
+    fields = {name: item.get(name) or getattr(source, name) for name in ("typ", "kod", "version", "year", "title")}
+    if not all(fields.values()):
+        missing = [name for name, value in fields.items() if not value]
+        raise CliError(f"{source.filename}: не заполнены поля {', '.join(missing)}")
+
+    active_docs = _collect_documents(workspace, "active")
+    archive = item.get("archive") or []
+    if archive == "similar":
+        archive_list = find_similar_documents(source, active_docs)
+    else:
+        by_name = {doc.filename: doc for doc in active_docs}
+        unknown = [name for name in archive if name not in by_name]
+        if unknown:
+            raise CliError(f"Нет в ДЕЙСТВУЮЩИХ: {', '.join(unknown)}")
+        archive_list = [by_name[name] for name in archive]
+
+    ok = publish_document(
+        source, fields["typ"], fields["kod"], fields["version"], fields["year"], fields["title"],
+        category, archive_list, workspace, create_registry=create_registry
+    )
+    if not ok:
+        raise CliError(f"Не удалось опубликовать {source.filename}")
+
+    ext = os.path.splitext(source.filename)[1]
+    return {
+        "file": source.filename,
+        "published": build_filename(**fields) + ext,
+        "category": category,
+        "archived": [doc.filename for doc in archive_list],
+    }
+
+
+def cmd_publish(args, workspace):
+    workspace.create_folders()
+    item = {
+        "file": args.file,
+        "category": args.category,
+        "typ": args.typ,
+        "kod": args.kod,
+        "version": args.version,
+        "year": args.year,
+        "title": args.title,
+        "archive": "similar" if args.archive_similar else args.archive,
+    }
+    return _publish_one(workspace, item, create_registry=not args.no_registry)
+
+
+def cmd_batch_publish(args, workspace):
+    from logic import create_registry_for_category
+
+    if args.manifest == "-":
+        items = json.load(sys.stdin)
+    else:
+        with open(args.manifest, 'r', encoding='utf-8') as f:
+            items = json.load(f)
+    if not isinstance(items, list):
+        raise CliError("Манифест должен быть JSON-списком документов")
+
+    # Ошибки структуры - до публикации первого документа
+    errors = []
+    for number, item in enumerate(items, start=1):
+        try:
+            _check_manifest_item(item)
+        except CliError as e:
+            errors.append(f"#{number}: {e}")
+    if errors:
+        raise CliError("Неверный манифест, ничего не опубликовано:\n" + "\n".join(errors))
+
+    workspace.create_folders()
+    published = []
+    failed = []
+    categories = set()
+
+    for item in items:
+        try:
+            published.append(_publish_one(workspace, item, create_registry=False))
+            categories.add(item["category"])
+        except CliError as e:
+            failed.append({"file": item.get("file"), "error": str(e)})
+            if args.stop_on_error:
+                break
+
+    # Реестр каждой затронутой категории - один раз на весь пакет
+    for category in sorted(categories):
+        create_registry_for_category(category, workspace)
+
+    return {
+        "ok": not failed,
+        "published": published,
+        "failed": failed,
+        "registries": sorted(categories),
+    }
+
+
+def cmd_registry_rebuild(args, workspace):
+    from registry import manual_update_registry
+
+    categories = [args.category] if args.category else list(CATEGORIES)
+    for category in categories:
+        _check_category(category)
+
+    workspace.create_folders()
+    failed = [category for category in categories if not manual_update_registry(category, workspace)]
+    return {"ok": not failed, "rebuilt": [c for c in categories if c not in failed], "failed": failed}
+
+
+def cmd_registry_show(args, workspace):
+    from registry import get_registry_documents
+
+    categories = [args.category] if args.category else list(CATEGORIES)
+    for category in categories:
+        _check_category(category)
+
+    return {"registries": {category: get_registry_documents(category, workspace) for category in categories}}
+
+
+def cmd_registry_export(args, workspace):
+    from registry import export_registry_to_csv, export_registry_to_excel, export_all_registries_to_excel
+
+    if args.category:
+        _check_category(args.category)
+        if args.format == "csv":
+            ok = export_registry_to_csv(args.category, args.output, workspace)
+        else:
+            ok = export_registry_to_excel(args.category, args.output, workspace)
+    else:
+        if args.format == "csv":
+            raise CliError("CSV экспортируется по одной категории (--category)")
+        ok = export_all_registries_to_excel(args.output, workspace)
+
+    if not ok:
+        raise CliError("Не удалось экспортировать реестр")
+    return {"output": os.path.abspath(args.output)}
+
+
+def cmd_archive_pack(args, workspace):
+    from archive_pack import pack_archive
+
+    if args.category:
+        _check_category(args.category)
+
+    result = pack_archive(
+        [args.category] if args.category else None, args.min_age_days, workspace, dry_run=args.dry_run
+    )
+    result["dry_run"] = args.dry_run
+    return result
+
+
+def cmd_archive_dedupe(args, workspace):
+    from cas import get_object_store
+
+    store = get_object_store(workspace)
+    result = store.ingest()
+    if args.gc:
+        result["removed_objects"] = store.collect_garbage()
+    return result
+
+
+def cmd_rename_plan(args, workspace):
+    from renamer import plan_renames, format_diff, READY
+
+    if args.category:
+        _check_category(args.category)
+
+    plan = plan_renames([args.category] if args.category else None, workspace)
+    return {
+        "count": len(plan),
+        "ready": sum(1 for item in plan if item.status == READY),
+        "renames": [item.to_dict() for item in plan],
+        "diff": format_diff(plan).splitlines(),
+    }
+
+
+def cmd_rename_apply(args, workspace):
+    from renamer import plan_renames, apply_renames
+
+    if args.category:
+        _check_category(args.category)
+
+    plan = plan_renames([args.category] if args.category else None, workspace)
+    result = apply_renames(plan, workspace, create_registry=not args.no_registry)
+    result["ok"] = not result["failed"]
+    return result
+
+
+def cmd_rename_rollback(args, workspace):
+    from renamer import list_rename_logs, rollback_renames
+
+    log_path = args.log
+    if not log_path:
+        logs = list_rename_logs(workspace)
+        if not logs:
+            raise CliError("Журналов переименований нет")
+        log_path = logs[0]
+    elif not workspace.storage.exists(log_path):
+        raise CliError(f"Журнал не найден: {log_path}")
+
+    return rollback_renames(log_path, workspace, create_registry=not args.no_registry)
+
+
+def cmd_validate(args, workspace):
+    from validation import validate_workspace
+
+    if args.category:
+        _check_category(args.category)
+
+    report = validate_workspace(workspace)
+    issues = [issue for issue in report.issues
+              if (not args.kind or issue.kind == args.kind) and (not args.category or issue.category == args.category)]
+
+    result = report.to_dict()
+    result["valid"] = report.ok
+    if args.summary:
+        del result["issues"]
+    else:
+        result["issues"] = [issue.to_dict() for issue in issues]
+    return result
+
+
+def cmd_query(args, workspace):
+    from query import query_documents, QueryError
+
+    text = " ".join(args.text)
+    try:
+        result = query_documents(text, workspace, fresh=True)
+    except QueryError as e:
+        raise CliError(f"Ошибка в запросе: {e}")
+
+    if args.count:
+        return {"query": text, "count": len(result)}
+
+    documents = []
+    for folder, doc in result:
+        item = doc.to_dict()
+        item["folder"] = folder
+        documents.append(item)
+    return {"query": text, "count": len(documents), "documents": documents}
+
+
+def cmd_employees_export(args, workspace):
+    from employees import export_employees_to_json, export_employees_to_excel
+
+    if args.format == "json":
+        ok = export_employees_to_json(args.output, workspace)
+    else:
+        ok = export_employees_to_excel(args.output, workspace)
+
+    if not ok:
+        raise CliError("Не удалось экспортировать справочник сотрудников")
+    return {"output": os.path.abspath(args.output)}
+
+
+def build_parser():
+    """Разбор аргументов командной строки"""
+    from validation import ISSUE_KINDS
+
+    parser = argparse.ArgumentParser(prog="python -m cli", description="ISO2 без графического интерфейса")
+    parser.add_argument("--work-dir", help="Рабочая папка (по умолчанию - из настроек)")
+    parser.add_argument("--compact", action="store_true", help="JSON в одну строку")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    scan = commands.add_parser("scan", help="Список документов")
+    scan.add_argument("--folder", choices=SCAN_FOLDERS + ("all",), default="all")
+    scan.add_argument("--category")
+    scan.add_argument("--invalid-only", action="store_true", help="Только имена не по шаблону")
+    scan.set_defaults(handler=cmd_scan)
+
+    similar = commands.add_parser("similar", help="Похожие документы в ДЕЙСТВУЮЩИХ для файла из ПРОЕКТОВ")
+    similar.add_argument("file")
+    similar.set_defaults(handler=cmd_similar)
+
+    publish = commands.add_parser("publish", help="Опубликовать документ из ПРОЕКТОВ")
+    publish.add_argument("file", help="Имя файла в ПРОЕКТАХ")
+    publish.add_argument("--category", required=True)
+    for field in ("typ", "kod", "version", "year", "title"):
+        publish.add_argument(f"--{field}", help="По умолчанию - из имени файла")
+    group = publish.add_mutually_exclusive_group()
+    group.add_argument("--archive", action="append", default=[], metavar="ФАЙЛ",
+                       help="Переместить в АРХИВ документ из ДЕЙСТВУЮЩИХ (можно несколько)")
+    group.add_argument("--archive-similar", action="store_true", help="Переместить в АРХИВ все похожие")
+    publish.add_argument("--no-registry", action="store_true", help="Не создавать реестр")
+    publish.set_defaults(handler=cmd_publish)
+
+    batch = commands.add_parser("batch-publish", help="Пакетная публикация по JSON-манифесту")
+    batch.add_argument("manifest", help='Файл манифеста или "-" (stdin): [{"file", "category", "archive", ...}]')
+    batch.add_argument("--stop-on-error", action="store_true")
+    batch.set_defaults(handler=cmd_batch_publish)
+
+    registry = commands.add_parser("registry", help="Реестры").add_subparsers(dest="action", required=True)
+
+    rebuild = registry.add_parser("rebuild", help="Пересоздать реестры")
+    rebuild.add_argument("--category", help="По умолчанию - все категории")
+    rebuild.set_defaults(handler=cmd_registry_rebuild)
+
+    show = registry.add_parser("show", help="Документы актуальных реестров")
+    show.add_argument("--category")
+    show.set_defaults(handler=cmd_registry_show)
+
+    export = registry.add_parser("export", help="Экспорт реестра")
+    export.add_argument("--output", required=True)
+    export.add_argument("--category", help="По умолчанию - все категории (Excel)")
+    export.add_argument("--format", choices=("excel", "csv"), default="excel")
+    export.set_defaults(handler=cmd_registry_export)
+
+    archive = commands.add_parser("archive", help="АРХИВ").add_subparsers(dest="action", required=True)
+
+    pack = archive.add_parser("pack", help="Упаковать старые документы АРХИВА в ZIP по годам")
+    pack.add_argument("--category", help="По умолчанию - все категории")
+    pack.add_argument("--min-age-days", type=int, default=config.ARCHIVE_PACK_MIN_AGE_DAYS,
+                      help="Упаковывать файлы, не изменявшиеся столько дней")
+    pack.add_argument("--dry-run", action="store_true", help="Только показать, что будет упаковано")
+    pack.set_defaults(handler=cmd_archive_pack)
+
+    dedupe = archive.add_parser("dedupe", help="Хранить одинаковые файлы АРХИВА один раз (жёсткие ссылки)")
+    dedupe.add_argument("--gc", action="store_true", help="Удалить объекты без ссылок")
+    dedupe.set_defaults(handler=cmd_archive_dedupe)
+
+    rename = commands.add_parser("rename", help="Привести имена файлов ДЕЙСТВУЮЩИХ к шаблону").add_subparsers(
+        dest="action", required=True)
+
+    rename_plan = rename.add_parser("plan", help="Показать, что будет переименовано (ничего не меняет)")
+    rename_plan.add_argument("--category", help="По умолчанию - все категории")
+    rename_plan.set_defaults(handler=cmd_rename_plan)
+
+    rename_apply = rename.add_parser("apply", help="Переименовать (с журналом для отката)")
+    rename_apply.add_argument("--category", help="По умолчанию - все категории")
+    rename_apply.add_argument("--no-registry", action="store_true", help="Не пересоздавать реестры")
+    rename_apply.set_defaults(handler=cmd_rename_apply)
+
+    rename_rollback = rename.add_parser("rollback", help="Откатить переименования по журналу")
+    rename_rollback.add_argument("log", nargs="?", help="Журнал (по умолчанию - последний)")
+    rename_rollback.add_argument("--no-registry", action="store_true", help="Не пересоздавать реестры")
+    rename_rollback.set_defaults(handler=cmd_rename_rollback)
+
+    validate = commands.add_parser("validate", help="Проверить имена, коды и версии документов")
+    validate.add_argument("--kind", choices=[kind for kind, _ in ISSUE_KINDS], help="Только проблемы этого вида")
+    validate.add_argument("--category")
+    validate.add_argument("--summary", action="store_true", help="Только количество проблем")
+    validate.set_defaults(handler=cmd_validate)
+
+    query = commands.add_parser("query", help="Документы по условиям на поля: typ=ПП year>=2020 kod~К2")
+    query.add_argument("text", nargs="+", help="Запрос (условия через пробел; > и < в кавычках)")
+    query.add_argument("--count", action="store_true", help="Только количество")
+    query.set_defaults(handler=cmd_query)
+
+    employees = commands.add_parser("employees", help="Справочник сотрудников").add_subparsers(dest="action", required=True)
+
+    emp_export = employees.add_parser("export", help="Экспорт справочника")
+    emp_export.add_argument("--output", required=True)
+    emp_export.add_argument("--format", choices=("json", "excel"), default="json")
+    emp_export.set_defaults(handler=cmd_employees_export)
+
+    return parser
+
+
+def main(argv=None):
+    """
+    Точка входа
+
+    Returns:
+        int: Код выхода (0 - успех, 1 - ошибка)
+    """
+    from workspace import activate_workspace
+
+    args = build_parser().parse_args(argv)
+
+    result = {"ok": False}
+    try:
+        work_dir = args.work_dir or config.DOCS_DIR
+        if not work_dir:
+            raise CliError("Рабочая папка не задана: укажите --work-dir")
+        if not os.path.isdir(work_dir):
+            raise CliError(f"Рабочая папка не найдена: {work_dir}")
+
+        # Сообщения модулей (print) не должны попасть в JSON
+        with contextlib.redirect_stdout(sys.stderr):
+            workspace = activate_workspace(work_dir)
+            data = args.handler(args, workspace)
+
+        result = {"ok": True}
+        result.update(data)
+    except CliError as e:
+        result["error"] = str(e)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+
+    indent = None if args.compact else 2
+    json.dump(result, sys.stdout, ensure_ascii=False, indent=indent)
+    sys.stdout.write("\n")
+    return 0 if result["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -48,17 +48,7 @@ if WORK_DIR and os.path.exists(WORK_DIR):
 else:
     DOCS_DIR = None
 
-# Пути к папкам документов (будут установлены после выбора рабочей папки)
-if DOCS_DIR:
-    PROJECTS_DIR = os.path.join(DOCS_DIR, "ПРОЕКТЫ")
-    ACTIVE_DIR = os.path.join(DOCS_DIR, "ДЕЙСТВУЮЩИЕ")
-    ARCHIVE_DIR = os.path.join(DOCS_DIR, "АРХИВ")
-    REGISTRIES_DIR = os.path.join(DOCS_DIR, "РЕЕСТРЫ")
-else:
-    PROJECTS_DIR = None
-    ACTIVE_DIR = None
-    ARCHIVE_DIR = None
-    REGISTRIES_DIR = None
+# Пути к папкам и категориям рабочей папки хранит Workspace (workspace.py)
 
 # Категории документов
 CATEGORIES = [
@@ -68,51 +58,6 @@ CATEGORIES = [
     "ТИ"
 ]
 
-# Пути к категориям (будут инициализированы после выбора рабочей папки)
-ACTIVE_CATEGORIES = {}
-ARCHIVE_CATEGORIES = {}
-REGISTRIES_CATEGORIES = {}
-REGISTRY_ACTUAL_FILES = {}
-
-def init_category_paths():
-    """Инициализация путей к категориям после установки DOCS_DIR"""
-    global ACTIVE_CATEGORIES, ARCHIVE_CATEGORIES, REGISTRIES_CATEGORIES, REGISTRY_ACTUAL_FILES
-
-    if not DOCS_DIR:
-        return
-
-    # Пути к категориям в ДЕЙСТВУЮЩИЕ
-    ACTIVE_CATEGORIES = {
-        "НД СМК": os.path.join(ACTIVE_DIR, "НД СМК"),
-        "Шаблоны отчетов": os.path.join(ACTIVE_DIR, "Шаблоны отчетов"),
-        "Формы записей": os.path.join(ACTIVE_DIR, "Формы записей"),
-        "ТИ": os.path.join(ACTIVE_DIR, "ТИ")
-    }
-
-    # Пути к категориям в АРХИВ
-    ARCHIVE_CATEGORIES = {
-        "НД СМК": os.path.join(ARCHIVE_DIR, "НД СМК"),
-        "Шаблоны отчетов": os.path.join(ARCHIVE_DIR, "Шаблоны отчетов"),
-        "Формы записей": os.path.join(ARCHIVE_DIR, "Формы записей"),
-        "ТИ": os.path.join(ARCHIVE_DIR, "ТИ")
-    }
-
-    # Пути к категориям в РЕЕСТРЫ
-    REGISTRIES_CATEGORIES = {
-        "НД СМК": os.path.join(REGISTRIES_DIR, "НД СМК"),
-        "Шаблоны отчетов": os.path.join(REGISTRIES_DIR, "Шаблоны отчетов"),
-        "Формы записей": os.path.join(REGISTRIES_DIR, "Формы записей"),
-        "ТИ": os.path.join(REGISTRIES_DIR, "ТИ")
-    }
-
-    # Имена актуальных реестров для каждой категории
-    REGISTRY_ACTUAL_FILES = {
-        "НД СМК": os.path.join(REGISTRIES_CATEGORIES["НД СМК"], "РЕЕСТР_НД_СМК_АКТУАЛЬНЫЙ.txt"),
-        "Шаблоны отчетов": os.path.join(REGISTRIES_CATEGORIES["Шаблоны отчетов"], "РЕЕСТР_Шаблоны_отчетов_АКТУАЛЬНЫЙ.txt"),
-        "Формы записей": os.path.join(REGISTRIES_CATEGORIES["Формы записей"], "РЕЕСТР_Формы_записей_АКТУАЛЬНЫЙ.txt"),
-        "ТИ": os.path.join(REGISTRIES_CATEGORIES["ТИ"], "РЕЕСТР_ТИ_АКТУАЛЬНЫЙ.txt")
-    }
-
 # Типы документов (для фильтров)
 DOCUMENT_TYPES = ["ПП", "РК", "ДИ", "ВНД", "ТР", "ТИ", "ТУ", "ГОСТ"]
 
@@ -126,10 +71,91 @@ ALLOWED_EXTENSIONS = [".docx", ".doc", ".pdf"]
 # Количество реестров для хранения
 REGISTRIES_KEEP_COUNT = 100
 
+# Сколько недавно использованных рабочих папок держать в памяти (с кэшами)
+WORKSPACE_CACHE_SIZE = 5
+
+# Количество потоков при сканировании нескольких рабочих папок (сводный просмотр)
+AGGREGATE_SCAN_WORKERS = 8
+
+# Количество потоков при проверке рабочей папки (validation.py)
+VALIDATION_WORKERS = 8
+
+# Ожидание блокировки базы сотрудников при одновременной записи (секунды)
+EMPLOYEES_DB_TIMEOUT = 30
+
+# Локальный HTTP/JSON сервис (server.py): адрес и период проверки изменений папок (секунды).
+# Адрес сервиса для GUI задаётся в iso2_settings.json: "api_url": "http://127.0.0.1:8765"
+# Недоступный сервис GUI проверяет снова не раньше чем через API_RETRY_SECONDS.
+API_HOST = "127.0.0.1"
+API_PORT = 8765
+API_REFRESH_SECONDS = 2
+API_TIMEOUT = 5
+API_RETRY_SECONDS = 30
+
+# Замеры времени (perf.py): журнал JSON Lines рядом с программой, его ротация и
+# сколько последних интервалов держать для окна "Производительность".
+# Включаются в iso2_settings.json: "perf_enabled": true
+PERF_LOG_FILE = os.path.join(BASE_DIR, "iso2_perf.jsonl")
+PERF_LOG_MAX_BYTES = 5 * 1024 * 1024
+PERF_LOG_BACKUPS = 3
+PERF_BUFFER_SIZE = 5000
+
+# Сторож главного цикла Tk (ui_watchdog.py): период отметок, порог зависания (мс),
+# сколько последних зависаний держать для окна "Диагностика" и журнал.
+# Отключается в iso2_settings.json: "watchdog_enabled": false
+WATCHDOG_INTERVAL_MS = 200
+WATCHDOG_STALL_MS = 500
+WATCHDOG_KEEP = 200
+WATCHDOG_LOG_FILE = os.path.join(BASE_DIR, "iso2_stalls.jsonl")
+
+# Упаковка АРХИВА (archive_pack.py): документы старше ARCHIVE_PACK_MIN_AGE_DAYS
+# (по времени изменения файла) переносятся в ZIP по годам в подпапку категории
+ARCHIVE_PACK_DIR = "_ПАКЕТЫ"
+ARCHIVE_PACK_MIN_AGE_DAYS = 365
+
+# Хранилище архива по содержимому (cas.py): одинаковые файлы АРХИВА - жёсткие ссылки
+# на один объект в АРХИВ/.objects. Включается в iso2_settings.json: "archive_cas": true
+CAS_OBJECTS_DIR = ".objects"
+
+# Приведение имён файлов к шаблону (renamer.py): правила - замены по регулярным
+# выражениям в имени без расширения, применяются по порядку до разбора имени.
+# Свои правила добавляются в iso2_settings.json: "rename_rules": [["шаблон", "замена"]]
+RENAME_RULES = [
+    (r"\s+", " "),                                                   # Лишние пробелы
+    (r"^([A-Za-zА-Яа-яЁё]{2,4}) (?=[A-Za-zА-Яа-яЁё]+\d)", r"\1."),   # "ПП К2-..." -> "ПП.К2-..."
+    (r"^(\S+?)_(\d{1,3})_(\d{4})(?=[\s_])", r"\1-\2-\3"),          # "..._01_2022" -> "...-01-2022"
+    (r"^(\S+-\d{4})_+", r"\1 "),                                     # "...-2022_Название" -> "...-2022 Название"
+]
+RENAME_WORKERS = 8
+RENAME_LOG_DIR = "_ПЕРЕИМЕНОВАНИЯ"
+
+# Текст документов для предпросмотра (text_extract.py): дисковый кэш рядом с программой,
+# его предельный размер, длина предпросмотра (символов) и потоки извлечения
+TEXT_CACHE_DIR = os.path.join(BASE_DIR, "iso2_text_cache")
+TEXT_CACHE_MAX_BYTES = 50 * 1024 * 1024
+TEXT_PREVIEW_CHARS = 4000
+TEXT_EXTRACT_WORKERS = 2
+
+# Сравнение текста версий (text_diff.py): предел числа изменённых строк, сколько
+# последних сравнений держать в памяти и строк контекста вокруг изменений
+TEXT_DIFF_MAX_EDITS = 4000
+TEXT_DIFF_CACHE_SIZE = 32
+TEXT_DIFF_CONTEXT = 2
+
+# Запросы по полям документов (query.py): сколько последних результатов держать
+# в памяти и как часто проверять папки на изменения при наборе запроса (секунды)
+QUERY_RESULT_CACHE_SIZE = 64
+QUERY_REFRESH_SECONDS = 2
+
+# Пользовательский шаблон листа ознакомления (кладётся в рабочую папку)
+FAMILIARIZATION_TEMPLATE_FILE = "ШАБЛОН_ЛИСТА_ОЗНАКОМЛЕНИЯ.xlsx"
+
 
 def set_work_dir(work_dir):
     """
-    Установить рабочую папку и пересоздать все пути
+    Установить рабочую папку и сохранить её в настройки
+
+    Структуру папок создаёт workspace.switch_work_dir.
 
     Args:
         work_dir: Путь к рабочей папке (где будут храниться docs)
@@ -137,7 +163,7 @@ def set_work_dir(work_dir):
     Returns:
         bool: True если успешно
     """
-    global DOCS_DIR, PROJECTS_DIR, ACTIVE_DIR, ARCHIVE_DIR, REGISTRIES_DIR
+    global DOCS_DIR
 
     # Сохраняем в настройки
     settings = load_settings()
@@ -145,54 +171,5 @@ def set_work_dir(work_dir):
     if not save_settings(settings):
         return False
 
-    # Обновляем пути
     DOCS_DIR = work_dir
-    PROJECTS_DIR = os.path.join(DOCS_DIR, "ПРОЕКТЫ")
-    ACTIVE_DIR = os.path.join(DOCS_DIR, "ДЕЙСТВУЮЩИЕ")
-    ARCHIVE_DIR = os.path.join(DOCS_DIR, "АРХИВ")
-    REGISTRIES_DIR = os.path.join(DOCS_DIR, "РЕЕСТРЫ")
-
-    # Инициализируем пути к категориям
-    init_category_paths()
-
-    # Создаём структуру папок
-    create_folders()
-
     return True
-
-
-def create_folders():
-    """Создать структуру папок, если их нет"""
-    if not DOCS_DIR:
-        return
-
-    # Основные папки
-    base_folders = [DOCS_DIR, PROJECTS_DIR, ACTIVE_DIR, ARCHIVE_DIR, REGISTRIES_DIR]
-
-    for folder in base_folders:
-        if folder and not os.path.exists(folder):
-            os.makedirs(folder)
-            print(f"Создана папка: {folder}")
-
-    # Категории в ДЕЙСТВУЮЩИЕ
-    for category, path in ACTIVE_CATEGORIES.items():
-        if not os.path.exists(path):
-            os.makedirs(path)
-            print(f"Создана папка: {path}")
-
-    # Категории в АРХИВ
-    for category, path in ARCHIVE_CATEGORIES.items():
-        if not os.path.exists(path):
-            os.makedirs(path)
-            print(f"Создана папка: {path}")
-
-    # Категории в РЕЕСТРЫ
-    for category, path in REGISTRIES_CATEGORIES.items():
-        if not os.path.exists(path):
-            os.makedirs(path)
-            print(f"Создана папка: {path}")
-
-
-# Если папка уже настроена - инициализируем пути
-if DOCS_DIR:
-    init_category_paths()
\ No newline at end of file
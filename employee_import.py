@@ -0,0 +1,184 @@
+"""
+Массовый импорт сотрудников из CSV/XLSX
+Потоковое чтение, дедупликация по ФИО + email, одна запись в базу
+"""
+
+import csv
+import os
+
+from employees import get_employee_store, notify_employees_changed
+
+
+# Заголовки колонок файла -> поле сотрудника (сравнение без учёта регистра)
+COLUMN_ALIASES = {
+    "фио": "fio",
+    "ф.и.о.": "fio",
+    "сотрудник": "fio",
+    "fio": "fio",
+    "должность": "position",
+    "position": "position",
+    "подразделение": "department",
+    "отдел": "department",
+    "department": "department",
+    "email": "email",
+    "e-mail": "email",
+    "почта": "email",
+    "эл. почта": "email",
+}
+
+
+class SemicolonDialect(csv.excel):
+    """CSV из Excel с разделителем ; (русская локаль)"""
+    delimiter = ';'
+
+
+def normalize_text(value):
+    """Нормализация для сравнения: регистр, пробелы, ё -> е"""
+    return " ".join(str(value or "").split()).casefold().replace("ё", "е")
+
+
+def employee_key(fio, email):
+    """Ключ дедупликации сотрудника: (ФИО, email) в нормализованном виде"""
+    return (normalize_text(fio), normalize_text(email))
+
+
+def _map_header(row):
+    """
+    Сопоставить строку заголовков с полями сотрудника
+
+    Returns:
+        dict: {номер колонки: поле} или None, если это не заголовок (нет колонки ФИО)
+    """
+    mapping = {}
+    for index, cell in enumerate(row):
+        field = COLUMN_ALIASES.get(normalize_text(cell))
+        if field and field not in mapping.values():
+            mapping[index] = field
+    return mapping if "fio" in mapping.values() else None
+
+
+def _rows_to_records(rows):
+    """
+    Превратить поток строк в поток записей сотрудников
+
+    Строки до заголовка (шапка выгрузки) пропускаются.
+
+    Raises:
+        ValueError: В файле нет строки заголовков с колонкой ФИО
+    """
+    mapping = None
+    for row in rows:
+        if mapping is None:
+            mapping = _map_header(row)
+            continue
+
+        record = {"fio": "", "position": "", "department": "", "email": ""}
+        for index, field in mapping.items():
+            if index < len(row) and row[index] is not None:
+                record[field] = " ".join(str(row[index]).split())
+        yield record
+
+    if mapping is None:
+        raise ValueError("Не найден заголовок с колонкой ФИО")
+
+
+def iter_csv_rows(path):
+    """Потоковое чтение CSV (разделитель ; или , определяется автоматически)"""
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        sample = f.read(4096)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=";,\t")
+        except csv.Error:
+            dialect = SemicolonDialect
+        yield from csv.reader(f, dialect)
+
+
+def iter_xlsx_rows(path):
+    """Потоковое чтение первого листа XLSX (openpyxl в режиме read-only)"""
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        for row in ws.iter_rows(values_only=True):
+            yield row
+    finally:
+        wb.close()
+
+
+def iter_employee_records(path):
+    """
+    Записи сотрудников из файла
+
+    Args:
+        path: Путь к .csv или .xlsx
+
+    Returns:
+        iterator[dict]: {fio, position, department, email}
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        rows = iter_csv_rows(path)
+    elif ext in (".xlsx", ".xlsm"):
+        rows = iter_xlsx_rows(path)
+    else:
+        raise ValueError(f"Неподдерживаемый формат файла: {ext}")
+
+    return _rows_to_records(rows)
+
+
+def import_employees(path, workspace=None, update_existing=True):
+    """
+    Импортировать сотрудников из CSV/XLSX
+
+    Сотрудник определяется по ФИО + email (без учёта регистра, пробелов и ё/е).
+    Всё записывается одной транзакцией, в ней же новые получают ID.
+
+    Args:
+        path: Путь к файлу
+        workspace: Рабочее пространство (по умолчанию текущее)
+        update_existing: Обновлять должность/подразделение уже известных сотрудников
+
+    Returns:
+        dict: {inserted, updated, skipped}
+    """
+    store = get_employee_store(workspace)
+
+    existing = {employee_key(emp['fio'], emp['email']): emp for emp in store.all()}
+
+    seen = set()
+    inserts = []
+    updates = []
+    skipped = 0
+
+    for record in iter_employee_records(path):
+        if not record["fio"]:
+            skipped += 1
+            continue
+
+        key = employee_key(record["fio"], record["email"])
+        if key in seen:
+            # Повтор внутри файла
+            skipped += 1
+            continue
+        seen.add(key)
+
+        current = existing.get(key)
+        if current is None:
+            inserts.append(record)
+        elif update_existing and (
+                (record["position"] and record["position"] != current["position"]) or
+                (record["department"] and record["department"] != current["department"])):
+            updated = dict(current)
+            updated["position"] = record["position"] or current["position"]
+            updated["department"] = record["department"] or current["department"]
+            updates.append(updated)
+        else:
+            skipped += 1
+
+    if inserts or updates:
+        store.bulk_write(inserts, updates)
+        notify_employees_changed(workspace)
+
+    return {"inserted": len(inserts), "updated": len(updates), "skipped": skipped}
@@ -0,0 +1,157 @@
+"""
+Общий кэш справочника сотрудников в памяти
+Загружается один раз, перечитывается при изменении файла базы,
+даёт поиск по ID и готовые списки по подразделениям
+"""
+
+import os
+
+from employees import load_employees
+from workspace import resolve_workspace
+
+
+class EmployeeRepository:
+    """Справочник сотрудников рабочей папки в памяти с индексами"""
+
+    def __init__(self, workspace):
+        self.workspace = workspace
+
+        self._stamp = None          # (mtime_ns, size) файла базы при последней загрузке
+        self._loaded = False
+        self._employees = []        # Сотрудники в порядке базы
+        self._by_id = {}            # {id: сотрудник}
+        self._by_department = {}    # {подразделение: [сотрудники]}
+        self._search_index = None   # EmployeeSearchIndex (строится при первом поиске)
+        self._search_version = None # Номер загрузки, для которой построен индекс
+
+        # Номер загрузки - растёт при каждом перечитывании (для зависимых кэшей)
+        self.version = 0
+
+    def _file_stamp(self):
+        """Отметка файла базы: (mtime_ns, size) или None"""
+        try:
+            st = os.stat(self.workspace.employees_db)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def refresh(self, force=False):
+        """
+        Перечитать справочник, если файл изменился
+
+        Args:
+            force: Перечитать без проверки файла
+
+        Returns:
+            bool: True если справочник был перечитан
+        """
+        stamp = self._file_stamp()
+        if self._loaded and not force and stamp == self._stamp:
+            return False
+
+        employees = load_employees(self.workspace)
+
+        by_department = {}
+        for emp in employees:
+            by_department.setdefault(emp['department'], []).append(emp)
+
+        self._employees = employees
+        self._by_id = {emp['id']: emp for emp in employees}
+        self._by_department = by_department
+        # Отметку берём после загрузки: база могла быть создана при первом обращении
+        self._stamp = self._file_stamp() if stamp is None else stamp
+        self._loaded = True
+        self.version += 1
+        return True
+
+    def invalidate(self):
+        """Пометить справочник устаревшим (после изменений из этой программы)"""
+        self._loaded = False
+
+    def all(self):
+        """
+        Все сотрудники
+
+        Returns:
+            list[dict]: Список сотрудников
+        """
+        self.refresh()
+        return list(self._employees)
+
+    def get(self, employee_id):
+        """
+        Сотрудник по ID за O(1)
+
+        Returns:
+            dict: Сотрудник или None
+        """
+        self.refresh()
+        return self._by_id.get(employee_id)
+
+    def get_many(self, employee_ids):
+        """
+        Сотрудники по списку ID (в порядке списка, неизвестные ID пропускаются)
+
+        Returns:
+            list[dict]: Список сотрудников
+        """
+        self.refresh()
+        return [self._by_id[i] for i in employee_ids if i in self._by_id]
+
+    def by_department(self, department):
+        """
+        Сотрудники подразделения (готовый список)
+
+        Returns:
+            list[dict]: Список сотрудников
+        """
+        self.refresh()
+        return list(self._by_department.get(department, []))
+
+    def departments(self):
+        """Список подразделений"""
+        self.refresh()
+        return sorted(self._by_department)
+
+    def search(self, query):
+        """
+        Поиск по ФИО, должности, подразделению и email (подстрока, без учёта регистра и ё/е)
+
+        Индекс строится при первом поиске и перестраивается после перечитывания справочника.
+
+        Args:
+            query: Строка поиска
+
+        Returns:
+            list: ID найденных сотрудников в порядке справочника
+        """
+        self.refresh()
+        if self._search_version != self.version:
+            from search_index import EmployeeSearchIndex
+            self._search_index = EmployeeSearchIndex(self._employees)
+            self._search_version = self.version
+        return self._search_index.search(query)
+
+    def __len__(self):
+        self.refresh()
+        return len(self._employees)
+
+
+def get_employee_repository(workspace=None):
+    """
+    Общий справочник сотрудников рабочей папки (один на все окна)
+
+    Args:
+        workspace: Рабочее пространство (по умолчанию текущее)
+
+    Returns:
+        EmployeeRepository: Справочник в памяти
+    """
+    workspace = resolve_workspace(workspace)
+
+    repository = workspace.cache.get("employee_repository")
+    if repository is None:
+        repository = EmployeeRepository(workspace)
+        workspace.cache["employee_repository"] = repository
+
+    return repository
@@ -1,54 +1,127 @@
 """
 Модуль работы со справочником сотрудников
-Хранение в JSON, управление, экспорт
+Хранение в SQLite (с экспортом в JSON), управление, экспорт
 """
 
-import json
-import os
-from config import DOCS_DIR
+import perf
+from workspace import resolve_workspace
 
 
-# Путь к файлу со справочником (внутри docs/)
-EMPLOYEES_FILE = os.path.join(DOCS_DIR, "employees.json")
+def get_employees_file(workspace=None):
+    """
+    Путь к JSON-файлу справочника (источник миграции и файл экспорта)
 
+    Args:
+        workspace: Рабочее пространство (по умолчанию текущее)
 
-def load_employees():
+    Returns:
+        str: Путь к employees.json
     """
-    Загрузить список сотрудников из JSON
+    return resolve_workspace(workspace).employees_file
+
+
+def get_employee_store(workspace=None):
+    """
+    Хранилище сотрудников рабочей папки
+
+    При первом обращении база создаётся и в неё однократно переносится employees.json.
+
+    Args:
+        workspace: Рабочее пространство (по умолчанию текущее)
 
     Returns:
-        list[dict]: Список сотрудников
+        EmployeeStore: Хранилище SQLite
     """
-    if not os.path.exists(EMPLOYEES_FILE):
-        return []
+    from employees_db import EmployeeStore
+
+    workspace = resolve_workspace(workspace)
+
+    store = workspace.cache.get("employee_store")
+    if store is None:
+        store = EmployeeStore(workspace.employees_db, workspace.acknowledgements_db)
+        migrated = store.migrate_from_json(workspace.employees_file)
+        if migrated:
+            print(f"Перенесено сотрудников из JSON: {migrated}")
+        workspace.cache["employee_store"] = store
+
+    return store
+
+
+def notify_employees_changed(workspace=None):
+    """
+    Сообщить общему справочнику в памяти (employee_repository), что данные изменились
 
+    mtime файла базы на сетевом диске может не успеть измениться,
+    поэтому после своих изменений справочник сбрасывается явно.
+
+    Args:
+        workspace: Рабочее пространство (по умолчанию текущее)
+    """
+    repository = resolve_workspace(workspace).cache.get("employee_repository")
+    if repository is not None:
+        repository.invalidate()
+
+
+@perf.timed("employees.load")
+def load_employees(workspace=None):
+    """
+    Загрузить список сотрудников
+
+    Args:
+        workspace: Рабочее пространство (по умолчанию текущее)
+
+    Returns:
+        list[dict]: Список сотрудников
+    """
     try:
-        with open(EMPLOYEES_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return get_employee_store(workspace).all()
     except Exception as e:
         print(f"Ошибка загрузки сотрудников: {e}")
         return []
 
 
-def save_employees(employees):
+def save_employees(employees, workspace=None):
     """
-    Сохранить список сотрудников в JSON
+    Заменить весь справочник сотрудников
 
     Args:
         employees: Список сотрудников
+        workspace: Рабочее пространство (по умолчанию текущее)
 
     Returns:
         bool: True если успешно
     """
     try:
-        with open(EMPLOYEES_FILE, 'w', encoding='utf-8') as f:
-            json.dump(employees, f, ensure_ascii=False, indent=2)
+        get_employee_store(workspace).replace_all(employees)
+        notify_employees_changed(workspace)
         return True
     except Exception as e:
         print(f"Ошибка сохранения сотрудников: {e}")
         return False
 
 
+@perf.timed("export.employees.json")
+def export_employees_to_json(output_path=None, workspace=None):
+    """
+    Экспорт справочника в JSON (формат прежнего employees.json)
+
+    Args:
+        output_path: Путь для сохранения (по умолчанию employees.json рабочей папки)
+        workspace: Рабочее пространство (по умолчанию текущее)
+
+    Returns:
+        bool: True если успешно
+    """
+    try:
+        if output_path is None:
+            output_path = get_employees_file(workspace)
+        get_employee_store(workspace).export_to_json(output_path)
+        return True
+    except Exception as e:
+        print(f"Ошибка экспорта сотрудников в JSON: {e}")
+        return False
+
+
 def get_next_id(employees):
     """
     Получить следующий ID для нового сотрудника
@@ -66,7 +139,7 @@ def get_next_id(employees):
     return max_id + 1
 
 
-def add_employee(fio, position, department, email):
+def add_employee(fio, position, department, email, workspace=None):
     """
     Добавить нового сотрудника
 
@@ -75,25 +148,21 @@ def add_employee(fio, position, department, email):
         position: Должность
         department: Подразделение (ФБП или НПФ)
         email: Email
+        workspace: Рабочее пространство (по умолчанию текущее)
 
     Returns:
         bool: True если успешно
     """
-    employees = load_employees()
-
-    new_employee = {
-        "id": get_next_id(employees),
-        "fio": fio.strip(),
-        "position": position.strip(),
-        "department": department,
-        "email": email.strip()
-    }
-
-    employees.append(new_employee)
-    return save_employees(employees)
+    try:
+        get_employee_store(workspace).add(fio.strip(), position.strip(), department, email.strip())
+        notify_employees_changed(workspace)
+        return True
+    except Exception as e:
+        print(f"Ошибка добавления сотрудника: {e}")
+        return False
 
 
-def update_employee(employee_id, fio, position, department, email):
+def update_employee(employee_id, fio, position, department, email, workspace=None):
     """
     Обновить данные сотрудника
 
@@ -103,44 +172,50 @@ def update_employee(employee_id, fio, position, department, email):
         position: Должность
         department: Подразделение
         email: Email
+        workspace: Рабочее пространство (по умолчанию текущее)
 
     Returns:
         bool: True если успешно
     """
-    employees = load_employees()
-
-    for emp in employees:
-        if emp['id'] == employee_id:
-            emp['fio'] = fio.strip()
-            emp['position'] = position.strip()
-            emp['department'] = department
-            emp['email'] = email.strip()
-            return save_employees(employees)
-
-    return False
+    try:
+        updated = get_employee_store(workspace).update(
+            employee_id, fio.strip(), position.strip(), department, email.strip()
+        )
+        notify_employees_changed(workspace)
+        return updated
+    except Exception as e:
+        print(f"Ошибка обновления сотрудника: {e}")
+        return False
 
 
-def delete_employee(employee_id):
+def delete_employee(employee_id, workspace=None):
     """
     Удалить сотрудника
 
     Args:
         employee_id: ID сотрудника
+        workspace: Рабочее пространство (по умолчанию текущее)
 
     Returns:
         bool: True если успешно
     """
-    employees = load_employees()
-    employees = [emp for emp in employees if emp['id'] != employee_id]
-    return save_employees(employees)
+    try:
+        get_employee_store(workspace).delete(employee_id)
+        notify_employees_changed(workspace)
+        return True
+    except Exception as e:
+        print(f"Ошибка удаления сотрудника: {e}")
+        return False
 
 
-def export_employees_to_excel(output_path):
+@perf.timed("export.employees.excel")
+def export_employees_to_excel(output_path, workspace=None):
     """
     Экспорт списка сотрудников в Excel
 
     Args:
         output_path: Путь для сохранения
+        workspace: Рабочее пространство (по умолчанию текущее)
 
     Returns:
         bool: True если успешно
@@ -150,7 +225,7 @@ def export_employees_to_excel(output_path):
         from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
         from datetime import datetime
 
-        employees = load_employees()
+        employees = load_employees(workspace)
 
         if not employees:
             return False
@@ -242,129 +317,77 @@ def export_employees_to_excel(output_path):
         return False
 
 
-def create_familiarization_sheet(document, selected_employees, output_path):
+def _record_assignments(documents, selected_employees, workspace=None):
+    """Записать назначения ознакомления (ошибка учёта не отменяет созданный лист)"""
+    try:
+        from acknowledgements import record_assignments
+        for document in documents:
+            record_assignments(document, selected_employees, workspace)
+    except Exception as e:
+        print(f"Ошибка записи в учёт ознакомлений: {e}")
+
+
+def create_familiarization_sheet(document, selected_employees, output_path, workspace=None):
     """
     Создать лист ознакомления с документом для выбранных сотрудников
 
+    Разметка листа берётся из шаблона (см. sheet_template), заполняются
+    только шапка документа и строки сотрудников.
+
     Args:
         document: Объект документа (Document)
         selected_employees: Список выбранных сотрудников (list[dict])
         output_path: Путь для сохранения Excel файла
+        workspace: Рабочее пространство (по умолчанию текущее)
 
     Returns:
         bool: True если успешно
     """
     try:
-        from openpyxl import Workbook
-        from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-        from datetime import datetime
-        from logic import build_filename
+        from sheet_template import fill_familiarization_sheet
 
         if not selected_employees:
             return False
 
-        # Создаём книгу
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Лист ознакомления"
-
-        # Стили
-        header_font = Font(name='Arial', size=12, bold=True, color="FFFFFF")
-        header_fill = PatternFill(start_color="4A5568", end_color="4A5568", fill_type="solid")
-        header_alignment = Alignment(horizontal='center', vertical='center')
-
-        title_font = Font(name='Arial', size=16, bold=True)
-        title_alignment = Alignment(horizontal='center', vertical='center')
-
-        subtitle_font = Font(name='Arial', size=12, bold=True)
-        normal_font = Font(name='Arial', size=11)
-        border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
+        fill_familiarization_sheet(document, selected_employees, output_path, workspace)
+        _record_assignments([document], selected_employees, workspace)
+        return True
 
-        # Заголовок
-        ws.merge_cells('A1:F1')
-        ws['A1'] = 'ЛИСТ ОЗНАКОМЛЕНИЯ С ДОКУМЕНТОМ СМК'
-        ws['A1'].font = title_font
-        ws['A1'].alignment = title_alignment
+    except ImportError:
+        print("Ошибка: библиотека openpyxl не установлена")
+        return False
+    except Exception as e:
+        print(f"Ошибка создания листа ознакомления: {e}")
+        return False
 
-        # Информация о документе
-        if document.is_valid:
-            doc_name = build_filename(document.typ, document.kod, document.version, document.year, document.title)
-        else:
-            doc_name = document.filename
-
-        ws.merge_cells('A3:F3')
-        ws['A3'] = f'Документ: {doc_name}'
-        ws['A3'].font = subtitle_font
-        ws['A3'].alignment = Alignment(horizontal='left')
-
-        if hasattr(document, 'category') and document.category:
-            ws.merge_cells('A4:F4')
-            ws['A4'] = f'Категория: {document.category}'
-            ws['A4'].font = Font(name='Arial', size=11)
-            ws['A4'].alignment = Alignment(horizontal='left')
-
-        ws.merge_cells('A5:F5')
-        ws['A5'] = f'Дата формирования листа: {datetime.now().strftime("%d.%m.%Y")}'
-        ws['A5'].font = Font(name='Arial', size=11)
-        ws['A5'].alignment = Alignment(horizontal='left')
-
-        # Заголовки таблицы
-        headers = ['№', 'ФИО', 'Должность', 'Подразделение', 'Дата ознакомления', 'Подпись']
-        for col, header in enumerate(headers, start=1):
-            cell = ws.cell(row=7, column=col)
-            cell.value = header
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = header_alignment
-            cell.border = border
 
-        # Ширина колонок
-        ws.column_dimensions['A'].width = 5
-        ws.column_dimensions['B'].width = 35
-        ws.column_dimensions['C'].width = 30
-        ws.column_dimensions['D'].width = 15
-        ws.column_dimensions['E'].width = 20
-        ws.column_dimensions['F'].width = 20
-
-        # Данные сотрудников
-        for idx, emp in enumerate(selected_employees, start=1):
-            row = idx + 7
+@perf.timed("employees.sheets")
+def create_familiarization_sheets(documents, selected_employees, output_dir, workspace=None):
+    """
+    Создать листы ознакомления сразу для нескольких документов
 
-            ws.cell(row=row, column=1).value = idx
-            ws.cell(row=row, column=2).value = emp['fio']
-            ws.cell(row=row, column=3).value = emp['position']
-            ws.cell(row=row, column=4).value = emp['department']
-            ws.cell(row=row, column=5).value = ""  # Пустая ячейка для даты
-            ws.cell(row=row, column=6).value = ""  # Пустая ячейка для подписи
+    Args:
+        documents: Список документов (list[Document])
+        selected_employees: Список выбранных сотрудников (list[dict])
+        output_dir: Папка для сохранения Excel файлов
+        workspace: Рабочее пространство (по умолчанию текущее)
 
-            for col in range(1, 7):
-                cell = ws.cell(row=row, column=col)
-                cell.font = normal_font
-                cell.border = border
-                if col == 1 or col == 4:
-                    cell.alignment = Alignment(horizontal='center', vertical='center')
-                else:
-                    cell.alignment = Alignment(horizontal='left', vertical='center')
+    Returns:
+        list[str]: Пути к созданным файлам (пустой список при ошибке)
+    """
+    try:
+        from sheet_template import fill_familiarization_sheets
 
-        # Итого
-        row = len(selected_employees) + 9
-        ws.merge_cells(f'A{row}:F{row}')
-        ws[f'A{row}'] = f'Всего для ознакомления: {len(selected_employees)} человек(а)'
-        ws[f'A{row}'].font = Font(name='Arial', size=11, bold=True)
-        ws[f'A{row}'].alignment = Alignment(horizontal='center')
+        if not selected_employees or not documents:
+            return []
 
-        # Сохраняем
-        wb.save(output_path)
-        return True
+        created = fill_familiarization_sheets(documents, selected_employees, output_dir, workspace)
+        _record_assignments(documents, selected_employees, workspace)
+        return created
 
     except ImportError:
         print("Ошибка: библиотека openpyxl не установлена")
-        return False
+        return []
     except Exception as e:
-        print(f"Ошибка создания листа ознакомления: {e}")
-        return False
+        print(f"Ошибка создания листов ознакомления: {e}")
+        return []
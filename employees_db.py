@@ -0,0 +1,401 @@
+"""
+Хранилище справочника сотрудников в SQLite
+Точечные изменения вместо перезаписи всего JSON, индексы по id, подразделению и ФИО
+"""
+
+import json
+import os
+import sqlite3
+
+from config import EMPLOYEES_DB_TIMEOUT
+
+
+# Поля сотрудника (в порядке колонок таблицы)
+EMPLOYEE_FIELDS = ("id", "fio", "position", "department", "email")
+
+def _employee_rows(employees):
+    """
+    Строки для вставки из записей справочника
+
+    Записям без числового id (в прежнем employees.json такие встречаются)
+    назначаются id после наибольшего имеющегося - заранее, чтобы они не
+    совпали с id записей, идущих в списке позже.
+    """
+    def parse_id(emp):
+        try:
+            return int(emp.get('id'))
+        except (TypeError, ValueError):
+            return None
+
+    ids = [parse_id(emp) for emp in employees]
+    next_id = max((i for i in ids if i is not None), default=0) + 1
+
+    rows = []
+    for emp, employee_id in zip(employees, ids):
+        if employee_id is None:
+            employee_id = next_id
+            next_id += 1
+        rows.append((employee_id,) + tuple(emp.get(field) or "" for field in EMPLOYEE_FIELDS[1:]))
+    return rows
+
+
+# AUTOINCREMENT: ID удалённого сотрудника не достаётся новому (по ID ведётся учёт ознакомлений)
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS employees (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    fio TEXT NOT NULL,
+    position TEXT NOT NULL DEFAULT '',
+    department TEXT NOT NULL DEFAULT '',
+    email TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_employees_department ON employees(department);
+CREATE INDEX IF NOT EXISTS idx_employees_fio ON employees(fio);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Следующий ID сотрудника (с учётом счётчика AUTOINCREMENT)
+NEXT_ID_SQL = (
+    "SELECT MAX(COALESCE((SELECT MAX(id) FROM employees), 0), "
+    "COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'employees'), 0)) + 1 AS next_id"
+)
+
+# Перестройка таблицы из баз, созданных до AUTOINCREMENT
+UPGRADE_AUTOINCREMENT_SQL = """
+CREATE TABLE employees_new (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    fio TEXT NOT NULL,
+    position TEXT NOT NULL DEFAULT '',
+    department TEXT NOT NULL DEFAULT '',
+    email TEXT NOT NULL DEFAULT ''
+);
+INSERT INTO employees_new (id, fio, position, department, email)
+    SELECT id, fio, position, department, email FROM employees;
+DROP TABLE employees;
+ALTER TABLE employees_new RENAME TO employees;
+CREATE INDEX idx_employees_department ON employees(department);
+CREATE INDEX idx_employees_fio ON employees(fio);
+"""
+
+
+class EmployeeStore:
+    """Справочник сотрудников в файле SQLite"""
+
+    def __init__(self, db_path, acknowledgements_db=None):
+        """
+        Args:
+            db_path: Путь к базе сотрудников
+            acknowledgements_db: База учёта ознакомлений (acknowledgements.py) -
+                                 при удалении сотрудника из неё убираются его
+                                 неподписанные назначения
+        """
+        self.db_path = db_path
+        self.acknowledgements_db = acknowledgements_db
+
+        conn = self._connect()
+        try:
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+        self._upgrade_autoincrement()
+
+    def _attach_acknowledgements(self, conn):
+        """
+        Подключить базу ознакомлений к соединению как "ack" (до начала транзакции)
+
+        Returns:
+            bool: True если в ней есть таблица назначений
+        """
+        if not self.acknowledgements_db or not os.path.exists(self.acknowledgements_db):
+            return False
+        conn.execute("ATTACH DATABASE ? AS ack", (self.acknowledgements_db,))
+        return conn.execute(
+            "SELECT 1 FROM ack.sqlite_master WHERE type = 'table' AND name = 'acknowledgements'"
+        ).fetchone() is not None
+
+    def _upgrade_autoincrement(self):
+        """
+        Перевести таблицу старой базы на AUTOINCREMENT
+
+        Счётчик ID начинается после наибольшего ID из справочника и из учёта
+        ознакомлений: ID уже удалённых сотрудников, на которые ссылаются
+        назначения, тоже не выдаются повторно.
+        """
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'employees'").fetchone()
+            if "AUTOINCREMENT" in row["sql"].upper():
+                return
+
+            has_acknowledgements = self._attach_acknowledgements(conn)
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'employees'").fetchone()
+                if "AUTOINCREMENT" in row["sql"].upper():
+                    # Другой компьютер успел первым
+                    conn.rollback()
+                    return
+
+                for statement in UPGRADE_AUTOINCREMENT_SQL.split(";"):
+                    if statement.strip():
+                        conn.execute(statement)
+
+                last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM employees").fetchone()[0]
+                if has_acknowledgements:
+                    last_id = max(last_id, conn.execute(
+                        "SELECT COALESCE(MAX(employee_id), 0) FROM ack.acknowledgements"
+                    ).fetchone()[0])
+                conn.execute("DELETE FROM sqlite_sequence WHERE name = 'employees'")
+                conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('employees', ?)", (last_id,))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        finally:
+            conn.close()
+
+    def _connect(self):
+        """
+        Открыть соединение
+
+        Журнал в режиме DELETE (по умолчанию): WAL не работает на сетевых дисках.
+        При одновременной записи с другого компьютера ждём до EMPLOYEES_DB_TIMEOUT секунд.
+        """
+        conn = sqlite3.connect(self.db_path, timeout=EMPLOYEES_DB_TIMEOUT)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _write(self, sql_steps):
+        """
+        Выполнить изменения в одной транзакции с блокировкой на запись
+
+        Args:
+            sql_steps: Функция conn -> результат
+
+        Returns:
+            Результат функции
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            result = sql_steps(conn)
+            conn.commit()
+            return result
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def _read(self, sql, params=()):
+        conn = self._connect()
+        try:
+            return [dict(row) for row in conn.execute(sql, params)]
+        finally:
+            conn.close()
+
+    # Чтение
+
+    def all(self):
+        """
+        Все сотрудники
+
+        Returns:
+            list[dict]: Список сотрудников (по возрастанию id)
+        """
+        return self._read("SELECT id, fio, position, department, email FROM employees ORDER BY id")
+
+    def get(self, employee_id):
+        """
+        Сотрудник по ID
+
+        Returns:
+            dict: Сотрудник или None
+        """
+        rows = self._read(
+            "SELECT id, fio, position, department, email FROM employees WHERE id = ?",
+            (employee_id,)
+        )
+        return rows[0] if rows else None
+
+    def by_department(self, department):
+        """Сотрудники подразделения (по индексу)"""
+        return self._read(
+            "SELECT id, fio, position, department, email FROM employees WHERE department = ? ORDER BY id",
+            (department,)
+        )
+
+    def find_by_fio(self, fio):
+        """Сотрудники с точным совпадением ФИО (по индексу)"""
+        return self._read(
+            "SELECT id, fio, position, department, email FROM employees WHERE fio = ? ORDER BY id",
+            (fio,)
+        )
+
+    def next_id(self):
+        """Следующий ID: после наибольшего и после когда-либо выданных (ID удалённых не повторяются)"""
+        return self._read(NEXT_ID_SQL)[0]["next_id"]
+
+    def count(self):
+        """Количество сотрудников"""
+        return self._read("SELECT COUNT(*) AS n FROM employees")[0]["n"]
+
+    # Запись
+
+    def add(self, fio, position, department, email):
+        """
+        Добавить сотрудника
+
+        Returns:
+            int: ID нового сотрудника
+        """
+        def steps(conn):
+            cursor = conn.execute(
+                "INSERT INTO employees (fio, position, department, email) VALUES (?, ?, ?, ?)",
+                (fio, position, department, email)
+            )
+            return cursor.lastrowid
+
+        return self._write(steps)
+
+    def update(self, employee_id, fio, position, department, email):
+        """
+        Обновить сотрудника
+
+        Returns:
+            bool: True если сотрудник найден
+        """
+        def steps(conn):
+            cursor = conn.execute(
+                "UPDATE employees SET fio = ?, position = ?, department = ?, email = ? WHERE id = ?",
+                (fio, position, department, email, employee_id)
+            )
+            return cursor.rowcount > 0
+
+        return self._write(steps)
+
+    def delete(self, employee_id):
+        """
+        Удалить сотрудника
+
+        В той же транзакции из учёта ознакомлений убираются его неподписанные
+        назначения. Подписанные остаются как история ознакомления: ID
+        удалённого сотрудника новым не выдаётся.
+
+        Returns:
+            bool: True если сотрудник был удалён
+        """
+        conn = self._connect()
+        try:
+            has_acknowledgements = self._attach_acknowledgements(conn)
+            conn.execute("BEGIN IMMEDIATE")
+            cursor = conn.execute("DELETE FROM employees WHERE id = ?", (employee_id,))
+            if has_acknowledgements:
+                conn.execute(
+                    "DELETE FROM ack.acknowledgements WHERE employee_id = ? AND signed_at IS NULL",
+                    (employee_id,)
+                )
+            conn.commit()
+            return cursor.rowcount > 0
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def replace_all(self, employees):
+        """
+        Заменить весь справочник (одна транзакция)
+
+        Args:
+            employees: Список сотрудников (list[dict])
+        """
+        def steps(conn):
+            conn.execute("DELETE FROM employees")
+            conn.executemany(
+                "INSERT INTO employees (id, fio, position, department, email) VALUES (?, ?, ?, ?, ?)",
+                _employee_rows(employees)
+            )
+
+        self._write(steps)
+
+    def bulk_write(self, inserts, updates):
+        """
+        Пакетная запись: вставки и обновления в одной транзакции
+
+        ID новых сотрудников назначаются под блокировкой на запись, поэтому
+        одновременный импорт с другого компьютера не получает те же ID.
+
+        Args:
+            inserts: Новые сотрудники (list[dict], поле id заполняется)
+            updates: Изменённые сотрудники (list[dict], поиск по id)
+        """
+        def steps(conn):
+            next_id = conn.execute(NEXT_ID_SQL).fetchone()["next_id"]
+            for offset, emp in enumerate(inserts):
+                emp['id'] = next_id + offset
+            conn.executemany(
+                "INSERT INTO employees (id, fio, position, department, email) VALUES (?, ?, ?, ?, ?)",
+                [tuple(emp[field] for field in EMPLOYEE_FIELDS) for emp in inserts]
+            )
+            conn.executemany(
+                "UPDATE employees SET fio = ?, position = ?, department = ?, email = ? WHERE id = ?",
+                [(emp['fio'], emp['position'], emp['department'], emp['email'], emp['id']) for emp in updates]
+            )
+
+        self._write(steps)
+
+    # Миграция и экспорт
+
+    def is_migrated(self):
+        """Была ли уже выполнена миграция из JSON"""
+        return bool(self._read("SELECT value FROM meta WHERE key = 'json_migrated'"))
+
+    def migrate_from_json(self, json_path):
+        """
+        Однократный перенос справочника из employees.json
+
+        Повторный вызов ничего не делает (отметка хранится в таблице meta),
+        даже если JSON появится позже - источником данных остаётся база.
+
+        Args:
+            json_path: Путь к employees.json
+
+        Returns:
+            int: Количество перенесённых сотрудников (0 если миграция уже была)
+        """
+        if self.is_migrated():
+            return 0
+
+        employees = []
+        if os.path.exists(json_path):
+            with open(json_path, 'r', encoding='utf-8') as f:
+                employees = json.load(f)
+
+        def steps(conn):
+            # Повторная проверка под блокировкой (другой компьютер мог успеть первым)
+            done = conn.execute("SELECT value FROM meta WHERE key = 'json_migrated'").fetchone()
+            if done:
+                return 0
+
+            conn.executemany(
+                "INSERT OR REPLACE INTO employees (id, fio, position, department, email) VALUES (?, ?, ?, ?, ?)",
+                _employee_rows(employees)
+            )
+            conn.execute("INSERT INTO meta (key, value) VALUES ('json_migrated', ?)", (json_path,))
+            return len(employees)
+
+        return self._write(steps)
+
+    def export_to_json(self, json_path):
+        """
+        Экспорт справочника в JSON (формат прежнего employees.json)
+
+        Args:
+            json_path: Путь для сохранения
+        """
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(self.all(), f, ensure_ascii=False, indent=2)
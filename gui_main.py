@@ -10,34 +10,67 @@ import sys
 import subprocess
 import platform
 from datetime import datetime
-from config import PROJECTS_DIR, ACTIVE_DIR, ARCHIVE_DIR, CATEGORIES, ACTIVE_CATEGORIES, ARCHIVE_CATEGORIES
+import perf
+from config import CATEGORIES
+from workspace import get_current_workspace, switch_work_dir
+from widgets import VirtualChecklist
 from logic import (
     scan_folder, scan_folder_with_categories, find_similar_documents, compare_documents,
     publish_document, parse_filename, build_filename
 )
-from registry import (
-    read_registry_content, export_registry_to_csv, export_registry_to_excel,
-    export_all_registries_to_excel, manual_update_registry
-)
-from employees import (
-    load_employees, add_employee, update_employee, delete_employee,
-    export_employees_to_excel, create_familiarization_sheet
-)
+
+# registry и employees (а через них openpyxl) импортируются внутри методов -
+# при старте они не нужны и не должны задерживать первую отрисовку окна
+
+
+def open_file_external(path):
+    """Открыть файл во внешней программе (кроссплатформенно)"""
+    if platform.system() == 'Darwin':  # macOS
+        subprocess.call(['open', path])
+    elif platform.system() == 'Windows':
+        os.startfile(path)
+    else:  # Linux
+        subprocess.call(['xdg-open', path])
+
+
+def open_document_external(doc, workspace):
+    """Открыть документ; упакованный в ZIP сначала извлекается во временную папку"""
+    if doc.bundle:
+        import tempfile
+        from archive_pack import extract_packed
+
+        target_dir = os.path.join(tempfile.gettempdir(), "iso2_packed", os.path.basename(doc.bundle)[:-4])
+        open_file_external(extract_packed(doc, target_dir, workspace))
+    else:
+        open_file_external(doc.full_path)
 
 
 class MainWindow:
     """Главное окно приложения"""
 
+    # Пауза после нажатия клавиши в строке запроса до его выполнения (мс)
+    QUERY_DELAY_MS = 300
+
     def __init__(self, root):
         self.root = root
         self.root.title("ISO2 - Управление документацией СМК")
         self.root.geometry("1200x700")
         self.root.configure(bg="#2C3E50")
 
+        # Рабочее пространство (пути, категории, кэши)
+        self.workspace = get_current_workspace()
+
         # Текущие документы
-        self.current_folder = PROJECTS_DIR
+        self.current_folder = self.workspace.projects_dir
         self.documents = []
         self.current_category = None  # Текущая выбранная категория (для фильтра)
+        self.query_results = None     # Результат запроса из строки поиска: [(ключ папки, Document)]
+        self.query_after_id = None    # Отложенный запуск запроса при наборе
+        self.query_future = None      # Запрос к локальному сервису в фоне
+
+        # Сервис может не отвечать до API_TIMEOUT - запросы к нему не держат главный цикл
+        from concurrent.futures import ThreadPoolExecutor
+        self.query_executor = ThreadPoolExecutor(max_workers=1)
 
         # Настройка стилей
         self.setup_styles()
@@ -45,6 +78,14 @@ class MainWindow:
         self.create_widgets()
         self.load_documents()
 
+        # Скрытое окно замеров времени
+        self.root.bind("<Control-Shift-P>", lambda event: self.open_performance_window())
+        self.root.bind("<Control-Shift-p>", lambda event: self.open_performance_window())
+
+        # Скрытое окно зависаний интерфейса
+        self.root.bind("<Control-Shift-D>", lambda event: self.open_diagnostics_window())
+        self.root.bind("<Control-Shift-d>", lambda event: self.open_diagnostics_window())
+
     def setup_styles(self):
         """Настройка стилей ttk"""
         style = ttk.Style()
@@ -109,19 +150,19 @@ class MainWindow:
         # Кнопки выбора папки
         ttk.Button(
             top_frame, text="ПРОЕКТЫ", width=15,
-            command=lambda: self.switch_folder(PROJECTS_DIR),
+            command=lambda: self.switch_folder(self.workspace.projects_dir),
             style="TButton"
         ).pack(side=tk.LEFT, padx=5)
 
         ttk.Button(
             top_frame, text="ДЕЙСТВУЮЩИЕ", width=15,
-            command=lambda: self.switch_folder(ACTIVE_DIR),
+            command=lambda: self.switch_folder(self.workspace.active_dir),
             style="TButton"
         ).pack(side=tk.LEFT, padx=5)
 
         ttk.Button(
             top_frame, text="АРХИВ", width=15,
-            command=lambda: self.switch_folder(ARCHIVE_DIR),
+            command=lambda: self.switch_folder(self.workspace.archive_dir),
             style="TButton"
         ).pack(side=tk.LEFT, padx=5)
 
@@ -139,6 +180,20 @@ class MainWindow:
             style="TButton"
         ).pack(side=tk.LEFT, padx=5)
 
+        # Кнопка сводного просмотра нескольких рабочих папок
+        ttk.Button(
+            top_frame, text="СВОДНЫЙ", width=12,
+            command=self.open_aggregate_window,
+            style="TButton"
+        ).pack(side=tk.LEFT, padx=5)
+
+        # Кнопка проверки имён, кодов и версий
+        ttk.Button(
+            top_frame, text="ПРОВЕРКА", width=12,
+            command=self.open_validation_window,
+            style="TButton"
+        ).pack(side=tk.LEFT, padx=5)
+
         # Разделитель
         tk.Frame(top_frame, width=30, bg="#37474F").pack(side=tk.LEFT)
 
@@ -184,6 +239,19 @@ class MainWindow:
         filter_frame = tk.Frame(folder_filter_frame, bg="#455A64")
         filter_frame.pack(side=tk.RIGHT, padx=10)
 
+        # Строка запроса по полям документов во всех папках (query.py)
+        tk.Label(
+            filter_frame, text="🔍", font=("Arial", 14, "bold"),
+            bg="#455A64", fg="white"
+        ).pack(side=tk.LEFT)
+
+        self.query_var = tk.StringVar()
+        self.query_entry = tk.Entry(filter_frame, textvariable=self.query_var, font=("Arial", 14), width=28)
+        self.query_entry.pack(side=tk.LEFT, padx=5)
+        self.query_entry.bind("<Return>", lambda event: self.apply_query())
+        self.query_entry.bind("<KeyRelease>", self.on_query_key)
+        self.query_entry.bind("<Escape>", lambda event: self.clear_query())
+
         self.category_label = tk.Label(
             filter_frame, text="Категория:", font=("Arial", 14, "bold"),
             bg="#455A64", fg="white"
@@ -199,9 +267,12 @@ class MainWindow:
         self.category_combo.current(0)
         self.category_combo.bind("<<ComboboxSelected>>", self.on_category_change)
 
-        # Таблица документов
-        table_frame = tk.Frame(self.root, bg="#2C3E50")
-        table_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        # Таблица документов и панель предпросмотра текста
+        paned = tk.PanedWindow(self.root, orient=tk.HORIZONTAL, bg="#2C3E50", sashwidth=6, bd=0)
+        paned.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        table_frame = tk.Frame(paned, bg="#2C3E50")
+        paned.add(table_frame, stretch="always")
 
         # Scrollbar
         scrollbar = tk.Scrollbar(table_frame, bg="#37474F")
@@ -217,7 +288,7 @@ class MainWindow:
 
         # Настройка колонки
         self.tree.heading("Название документа", text="Название документа")
-        self.tree.column("Название документа", width=1100)
+        self.tree.column("Название документа", width=750)
 
         self.tree.pack(fill=tk.BOTH, expand=True)
 
@@ -227,6 +298,24 @@ class MainWindow:
         # Клик - выбор документа (для активации кнопок)
         self.tree.bind('<<TreeviewSelect>>', self.on_document_select)
 
+        # Предпросмотр: первая страница текста выбранного документа
+        preview_frame = tk.Frame(paned, bg="#37474F")
+        paned.add(preview_frame, width=400, stretch="never")
+
+        self.preview_label = tk.Label(
+            preview_frame, text="Предпросмотр", anchor="w", font=("Arial", 12, "bold"),
+            bg="#37474F", fg="white", padx=5, pady=5
+        )
+        self.preview_label.pack(fill=tk.X)
+
+        self.preview_text = tk.Text(
+            preview_frame, font=("Arial", 12), bg="#37474F", fg="white",
+            wrap=tk.WORD, state=tk.DISABLED, relief=tk.FLAT, padx=8, pady=5
+        )
+        self.preview_text.pack(fill=tk.BOTH, expand=True)
+
+        self.preview_future = None  # Фоновое извлечение текста для выбранного документа
+
         # Статус бар
         self.status_label = tk.Label(
             self.root, text="Готов", anchor="w",
@@ -238,11 +327,14 @@ class MainWindow:
     def switch_folder(self, folder_path):
         """Переключение между папками"""
         self.current_folder = folder_path
+        self.query_results = None
+        self.query_future = None
+        self.query_var.set("")
         self.current_category = None
         self.category_combo.current(0)  # Сбрасываем фильтр на "Все категории"
 
         # Показываем/скрываем фильтр категорий
-        if folder_path in [ACTIVE_DIR, ARCHIVE_DIR]:
+        if folder_path in [self.workspace.active_dir, self.workspace.archive_dir]:
             self.category_label.pack(side=tk.LEFT, padx=5)
             self.category_combo.pack(side=tk.LEFT, padx=5)
         else:
@@ -252,13 +344,13 @@ class MainWindow:
         self.load_documents()
 
         # Активируем кнопку публикации только для ПРОЕКТОВ
-        if folder_path == PROJECTS_DIR:
+        if folder_path == self.workspace.projects_dir:
             self.publish_btn.config(state=tk.NORMAL)
         else:
             self.publish_btn.config(state=tk.DISABLED)
 
         # Активируем кнопку листа ознакомления только для ДЕЙСТВУЮЩИХ
-        if folder_path == ACTIVE_DIR:
+        if folder_path == self.workspace.active_dir:
             self.familiarization_btn.config(state=tk.DISABLED)  # Будет активна при выборе документа
         else:
             self.familiarization_btn.config(state=tk.DISABLED)
@@ -274,17 +366,144 @@ class MainWindow:
 
         self.filter_documents()
 
+    def on_query_key(self, event=None):
+        """Набор запроса: запуск через QUERY_DELAY_MS после последнего нажатия"""
+        if event is not None and event.keysym in ("Return", "Escape"):
+            return
+        if self.query_after_id is not None:
+            self.root.after_cancel(self.query_after_id)
+        self.query_after_id = self.root.after(self.QUERY_DELAY_MS, self.apply_query)
+
+    def clear_query(self):
+        """Сбросить запрос и вернуться к документам текущей папки"""
+        self.query_var.set("")
+        self.apply_query()
+
+    def apply_query(self, fresh=False):
+        """
+        Показать документы всех папок, подходящие под запрос из строки поиска
+
+        Пустой запрос возвращает к документам текущей папки. Если настроен
+        локальный сервис, запрос к нему идёт в фоне (poll_query), иначе
+        выполняется сразу по индексу в памяти.
+
+        Args:
+            fresh: Проверить папки на изменения сейчас (после публикации и т.п.)
+        """
+        from config import load_settings
+        from query import parse_query, QueryError
+
+        if self.query_after_id is not None:
+            self.root.after_cancel(self.query_after_id)
+            self.query_after_id = None
+        if self.query_future is not None:
+            self.query_future.cancel()
+            self.query_future = None
+
+        text = self.query_var.get().strip()
+        if not text:
+            if self.query_results is not None:
+                self.switch_folder(self.current_folder)
+            return
+
+        try:
+            parse_query(text)
+        except QueryError as e:
+            self.status_label.config(text=f"Ошибка в запросе: {e}")
+            return
+
+        if not load_settings().get('api_url'):
+            self.show_query_results(text, None, fresh)
+            return
+
+        self.status_label.config(text="Запрос к сервису...")
+        self.query_future = self.query_executor.submit(self.query_from_api, text, fresh)
+        self.root.after(50, self.poll_query, self.query_future, text, fresh)
+
+    def poll_query(self, future, text, fresh):
+        """Показать ответ сервиса, если запрос всё ещё актуален"""
+        if future is not self.query_future:
+            return
+        if not future.done():
+            self.root.after(50, self.poll_query, future, text, fresh)
+            return
+
+        self.query_future = None
+        try:
+            results = future.result()
+        except Exception as e:
+            print(f"Ошибка запроса к сервису: {e}")
+            results = None
+        self.status_label.config(text="Готов")
+        self.show_query_results(text, results, fresh)
+
+    @perf.timed("gui.query")
+    def show_query_results(self, text, results, fresh=False):
+        """
+        Показать результат запроса
+
+        Args:
+            results: Ответ сервиса или None - выполнить запрос по индексу в памяти
+        """
+        from query import query_documents
+
+        if results is None:
+            results = list(query_documents(text, self.workspace, fresh))
+        self.query_results = results
+        self.documents = [doc for _, doc in results]
+
+        self.folder_label.config(text=f"🔍 Запрос ({len(results)} документов)")
+
+        # Публикация и лист ознакомления - из своих папок, не из результатов запроса
+        self.publish_btn.config(state=tk.DISABLED)
+        self.familiarization_btn.config(state=tk.DISABLED)
+
+        self.filter_documents()
+
+    def query_from_api(self, text, fresh=False):
+        """
+        Результат запроса из локального сервиса (если он настроен)
+
+        Выполняется в фоновом потоке (query_executor).
+
+        Returns:
+            list[tuple]: (ключ папки, Document) или None - выполнить запрос самим
+        """
+        from api_client import get_api_client, documents_from_dicts, ApiUnavailable
+
+        client = get_api_client(self.workspace)
+        if client is None:
+            return None
+
+        try:
+            items = client.query(text, fresh=fresh)
+        except ApiUnavailable as e:
+            print(f"Сервис недоступен: {e}")
+            return None
+        return list(zip((item["folder"] for item in items), documents_from_dicts(items)))
+
+    @perf.timed("gui.load_documents")
     def load_documents(self):
         """Загрузка документов из текущей папки"""
-        if self.current_folder == PROJECTS_DIR:
+        ws = self.workspace
+
+        # Открыт результат запроса - обновляем его
+        if self.query_results is not None:
+            self.apply_query(fresh=True)
+            return
+
+        documents = self.load_documents_from_api()
+        if documents is not None:
+            self.documents = documents
+        elif self.current_folder == ws.projects_dir:
             # В ПРОЕКТАХ - обычное сканирование без категорий
-            self.documents = scan_folder(self.current_folder)
-        elif self.current_folder == ACTIVE_DIR:
+            self.documents = scan_folder(self.current_folder, workspace=ws)
+        elif self.current_folder == ws.active_dir:
             # В ДЕЙСТВУЮЩИХ - сканирование с категориями
-            self.documents = scan_folder_with_categories(ACTIVE_DIR, ACTIVE_CATEGORIES)
-        elif self.current_folder == ARCHIVE_DIR:
+            self.documents = scan_folder_with_categories(ws.active_dir, ws.active_categories, ws)
+        elif self.current_folder == ws.archive_dir:
             # В АРХИВЕ - сканирование с категориями
-            self.documents = scan_folder_with_categories(ARCHIVE_DIR, ARCHIVE_CATEGORIES)
+            self.documents = scan_folder_with_categories(ws.archive_dir, ws.archive_categories, ws)
         else:
             self.documents = []
 
@@ -295,22 +514,54 @@ class MainWindow:
         # Обновляем таблицу
         self.filter_documents()
 
+    def load_documents_from_api(self):
+        """
+        Документы текущей папки из локального сервиса (если он настроен)
+
+        Returns:
+            list[Document]: Документы или None - сканировать папку самим
+        """
+        from api_client import get_api_client, documents_from_dicts, ApiUnavailable
+
+        ws = self.workspace
+        folders = {ws.projects_dir: "projects", ws.active_dir: "active", ws.archive_dir: "archive"}
+        folder = folders.get(self.current_folder)
+
+        client = get_api_client(ws)
+        if client is None or folder is None:
+            return None
+
+        try:
+            return documents_from_dicts(client.documents(folder, fresh=True))
+        except ApiUnavailable as e:
+            print(f"Сервис недоступен: {e}")
+            return None
+
+    @perf.timed("gui.filter_documents")
     def filter_documents(self):
         """Отображение документов с учетом фильтра категорий"""
+        from validation import FOLDERS
+
         # Очищаем таблицу
         for item in self.tree.get_children():
             self.tree.delete(item)
 
+        # Документы с ключом папки (у результата запроса - своя папка у каждого)
+        if self.query_results is not None:
+            entries = self.query_results
+        else:
+            entries = [("", doc) for doc in self.documents]
+
         # Фильтруем документы по категории
         if self.current_category:
-            filtered_docs = [doc for doc in self.documents if doc.category == self.current_category]
-        else:
-            filtered_docs = self.documents
+            entries = [(folder, doc) for folder, doc in entries if doc.category == self.current_category]
+
+        folder_names = dict(FOLDERS)
 
         # Добавляем документы в таблицу
-        for doc in filtered_docs:
+        for folder, doc in entries:
             # Определяем что показывать
-            if self.current_folder == PROJECTS_DIR:
+            if folder == "projects" or (not folder and self.current_folder == self.workspace.projects_dir):
                 # В ПРОЕКТАХ - имя файла КАК ЕСТЬ
                 display_name = doc.filename
             else:
@@ -323,37 +574,53 @@ class MainWindow:
                     display_name = doc.filename
                     if doc.category:
                         display_name = f"[{doc.category}] {display_name}"
+                if doc.bundle:
+                    display_name = f"📦 {display_name}"
+            if folder:
+                display_name = f"{folder_names[folder]}: {display_name}"
 
-            self.tree.insert("", tk.END, values=(display_name,), tags=(doc.filename, doc.category if doc.category else ""))
+            self.tree.insert("", tk.END, values=(display_name,),
+                             tags=(doc.filename, doc.category if doc.category else "",
+                                   "packed" if doc.bundle else "", folder))
 
         # Обновляем статус
-        self.status_label.config(text=f"Показано документов: {len(filtered_docs)}")
+        self.status_label.config(text=f"Показано документов: {len(entries)}")
 
-    def open_document(self, event):
-        """Открыть документ (двойной клик)"""
+    def get_selected_document(self):
+        """Document выбранной строки таблицы (или None)"""
         selection = self.tree.selection()
         if not selection:
-            return
+            return None
 
         # Получаем filename и category из tags
         tags = self.tree.item(selection[0])['tags']
         if not tags:
-            return
+            return None
 
         filename = tags[0]
         category = tags[1] if len(tags) > 1 and tags[1] else None
+        packed = len(tags) > 2 and tags[2] == "packed"
+
+        # Результат запроса: одно имя может быть в разных папках
+        if self.query_results is not None:
+            folder = tags[3] if len(tags) > 3 else ""
+            entries = self.query_results
+        else:
+            folder = ""
+            entries = [("", doc) for doc in self.documents]
 
         # Находим документ
-        doc = next((d for d in self.documents if d.filename == filename and d.category == category), None)
+        return next((d for f, d in entries
+                     if f == folder and d.filename == filename and d.category == category
+                     and bool(d.bundle) == packed), None)
+
+    def open_document(self, event):
+        """Открыть документ (двойной клик)"""
+        doc = self.get_selected_document()
         if doc:
             # Открываем файл кроссплатформенно
             try:
-                if platform.system() == 'Darwin':  # macOS
-                    subprocess.call(['open', doc.full_path])
-                elif platform.system() == 'Windows':
-                    os.startfile(doc.full_path)
-                else:  # Linux
-                    subprocess.call(['xdg-open', doc.full_path])
+                open_document_external(doc, self.workspace)
             except Exception as e:
                 messagebox.showerror("Ошибка", f"Не удалось открыть файл:\n{e}")
 
@@ -362,12 +629,67 @@ class MainWindow:
         selection = self.tree.selection()
 
         # Активируем кнопку листа ознакомления только если выбран документ и открыта папка ДЕЙСТВУЮЩИЕ
-        if selection and self.current_folder == ACTIVE_DIR:
+        if self.query_results is not None:
+            self.familiarization_btn.config(state=tk.DISABLED)
+        elif selection and self.current_folder == self.workspace.active_dir:
             self.familiarization_btn.config(state=tk.NORMAL)
         else:
-            if self.current_folder == ACTIVE_DIR:
+            if self.current_folder == self.workspace.active_dir:
                 self.familiarization_btn.config(state=tk.DISABLED)
 
+        self.show_text_preview()
+
+    def set_preview(self, title, text):
+        """Заголовок и текст панели предпросмотра"""
+        self.preview_label.config(text=title)
+        self.preview_text.config(state=tk.NORMAL)
+        self.preview_text.delete(1.0, tk.END)
+        self.preview_text.insert(1.0, text)
+        self.preview_text.config(state=tk.DISABLED)
+
+    def show_text_preview(self):
+        """
+        Показать первую страницу текста выбранного документа
+
+        Текст из кэша показывается сразу, иначе извлекается в фоне;
+        незапущенное извлечение для прежнего выбора отменяется.
+        """
+        from text_extract import get_cached_text, extract_async
+
+        if self.preview_future is not None:
+            self.preview_future.cancel()
+            self.preview_future = None
+
+        doc = self.get_selected_document()
+        if doc is None:
+            self.set_preview("Предпросмотр", "")
+            return
+
+        text = get_cached_text(doc, self.workspace, first_page_only=True)
+        if text is not None:
+            self.set_preview(doc.filename, text)
+            return
+
+        self.set_preview(doc.filename, "Извлечение текста...")
+        self.preview_future = extract_async(doc, self.workspace, first_page_only=True)
+        self.root.after(50, self.poll_text_preview, self.preview_future, doc)
+
+    def poll_text_preview(self, future, doc):
+        """Показать извлечённый текст, если документ всё ещё выбран"""
+        if future is not self.preview_future:
+            return
+        if not future.done():
+            self.root.after(50, self.poll_text_preview, future, doc)
+            return
+
+        self.preview_future = None
+        try:
+            text = future.result()
+        except Exception as e:
+            # TextUnavailable - понятное сообщение (нет pypdf, формат .doc и т.п.)
+            text = str(e)
+        self.set_preview(doc.filename, text or "Текста нет")
+
     def open_publish_dialog(self):
         """Открыть диалог публикации"""
         selection = self.tree.selection()
@@ -406,25 +728,47 @@ class MainWindow:
         # Находим документ
         doc = next((d for d in self.documents if d.filename == filename and d.category == category), None)
         if doc:
-            dialog = FamiliarizationDialog(self.root, doc)
+            dialog = FamiliarizationDialog(self.root, doc, self.workspace)
             self.root.wait_window(dialog.dialog)
 
     def open_registry_window(self):
         """Открыть окно просмотра реестров"""
-        registry_window = RegistryWindow(self.root)
+        registry_window = RegistryWindow(self.root, self.workspace)
         self.root.wait_window(registry_window.window)
 
     def open_employees_window(self):
         """Открыть окно управления сотрудниками"""
-        employees_window = EmployeesWindow(self.root)
+        employees_window = EmployeesWindow(self.root, self.workspace)
         self.root.wait_window(employees_window.window)
 
+    def open_aggregate_window(self):
+        """Открыть сводный просмотр нескольких рабочих папок"""
+        aggregate_window = AggregateWindow(self.root)
+        self.root.wait_window(aggregate_window.window)
+
+    def open_validation_window(self):
+        """Открыть проверку рабочей папки"""
+        validation_window = ValidationWindow(self.root, self.workspace)
+        self.root.wait_window(validation_window.window)
+
+    def open_performance_window(self):
+        """Открыть окно замеров времени (Ctrl+Shift+P)"""
+        if getattr(self, "performance_window", None) and self.performance_window.window.winfo_exists():
+            self.performance_window.window.lift()
+            return
+        self.performance_window = PerformanceWindow(self.root)
+
+    def open_diagnostics_window(self):
+        """Открыть окно зависаний интерфейса (Ctrl+Shift+D)"""
+        if getattr(self, "diagnostics_window", None) and self.diagnostics_window.window.winfo_exists():
+            self.diagnostics_window.window.lift()
+            return
+        self.diagnostics_window = DiagnosticsWindow(self.root)
+
     def change_work_folder(self):
         """Сменить рабочую папку"""
-        import config
-
         # Показываем текущую папку
-        current = config.DOCS_DIR if config.DOCS_DIR else "не установлена"
+        current = self.workspace.docs_dir if self.workspace else "не установлена"
 
         result = messagebox.askyesno(
             "Смена рабочей папки",
@@ -444,23 +788,14 @@ class MainWindow:
         if not new_dir:
             return
 
-        # Устанавливаем новую папку
-        if config.set_work_dir(new_dir):
+        # Устанавливаем новую папку (недавние папки берутся с тёплыми кэшами)
+        workspace = switch_work_dir(new_dir)
+        if workspace:
+            self.set_workspace(workspace)
             messagebox.showinfo(
                 "Успех",
-                f"Рабочая папка изменена на:\n{new_dir}\n\n"
-                f"Приложение будет перезапущено."
+                f"Рабочая папка изменена на:\n{new_dir}"
             )
-
-            # Перезапускаем окно
-            self.root.destroy()
-
-            # Создаём новое окно
-            import tkinter as tk
-            new_root = tk.Tk()
-            from gui_main import MainWindow
-            MainWindow(new_root)
-            new_root.mainloop()
         else:
             messagebox.showerror(
                 "Ошибка",
@@ -468,6 +803,12 @@ class MainWindow:
             )
 
 
+    def set_workspace(self, workspace):
+        """Переключиться на другое рабочее пространство без перезапуска"""
+        self.workspace = workspace
+        self.switch_folder(workspace.projects_dir)
+
+
 class PublishDialog:
     """Диалоговое окно публикации документа"""
 
@@ -478,17 +819,21 @@ class PublishDialog:
         # Создаём диалоговое окно
         self.dialog = tk.Toplevel(parent)
         self.dialog.title("Публикация документа")
-        self.dialog.geometry("900x650")
+        self.dialog.geometry("900x800")
         self.dialog.configure(bg="#2C3E50")
         self.dialog.transient(parent)
         self.dialog.grab_set()
 
-        # Список похожих документов с галочками
+        # Список похожих документов (отметки - в self.similar_list)
         self.similar_docs = []
-        self.archive_vars = {}  # {doc: BooleanVar}
+
+        # История версий по коду (lineage.py)
+        from lineage import get_lineage_index
+        self.lineage = get_lineage_index(main_window.workspace)
 
         self.create_widgets()
         self.find_similar()
+        self.update_history()
 
     def create_widgets(self):
         """Создание элементов диалога"""
@@ -584,6 +929,36 @@ class PublishDialog:
         # Обновление предпросмотра при изменении полей
         for var in [self.typ_var, self.kod_var, self.version_var, self.year_var, self.title_var]:
             var.trace('w', lambda *args: self.update_preview())
+        self.kod_var.trace('w', lambda *args: self.update_history())
+
+        # История версий документа с этим кодом
+        history_frame = tk.LabelFrame(
+            self.dialog, text="История версий (по коду)",
+            padx=10, pady=5, font=("Arial", 14, "bold"),
+            bg="#37474F", fg="white"
+        )
+        history_frame.pack(fill=tk.X, padx=10, pady=5)
+
+        self.history_list = tk.Listbox(
+            history_frame, height=4, font=("Arial", 12),
+            bg="#4A5568", fg="white", selectbackground="#546E7A"
+        )
+        self.history_list.pack(fill=tk.X)
+
+        next_row = tk.Frame(history_frame, bg="#37474F")
+        next_row.pack(fill=tk.X, pady=(5, 0))
+
+        self.next_version_label = tk.Label(
+            next_row, text="", font=("Arial", 12),
+            bg="#37474F", fg="#90CAF9", anchor="w"
+        )
+        self.next_version_label.pack(side=tk.LEFT)
+
+        ttk.Button(
+            next_row, text="Подставить версию", width=18,
+            command=lambda: self.version_var.set(self.lineage.next_version(self.kod_var.get())),
+            style="TButton"
+        ).pack(side=tk.LEFT, padx=10)
 
         # Похожие документы
         self.similar_frame = tk.LabelFrame(
@@ -594,21 +969,56 @@ class PublishDialog:
         self.similar_frame.pack(fill=tk.BOTH, padx=10, pady=5)
         self.similar_frame.pack_propagate(False)  # Фиксируем высоту
 
-        # Scrollable frame для похожих документов
-        canvas = tk.Canvas(self.similar_frame, bg="#37474F", highlightthickness=0)
-        scrollbar = tk.Scrollbar(self.similar_frame, orient="vertical", command=canvas.yview, bg="#4A5568")
-        self.scrollable_frame = tk.Frame(canvas, bg="#37474F")
+        # Список похожих документов с галочками (рисуются только видимые строки)
+        self.similar_list = VirtualChecklist(
+            self.similar_frame, row_height=80, font=("Arial", 12),
+            empty_text="Похожих документов не найдено"
+        )
+        self.similar_list.pack(fill=tk.BOTH, expand=True)
+
+        # Сравнение текста с похожими документами (сворачиваемая панель)
+        diff_frame = tk.Frame(self.dialog, bg="#37474F")
+        diff_frame.pack(fill=tk.X, padx=10, pady=5)
 
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
+        self.diff_toggle_btn = ttk.Button(
+            diff_frame, text="▶ Сравнение текста", width=22,
+            command=self.toggle_text_diff, style="TButton"
         )
+        self.diff_toggle_btn.pack(anchor="w", padx=5, pady=5)
 
-        canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
+        self.diff_body = tk.Frame(diff_frame, bg="#37474F")
 
-        canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        diff_row = tk.Frame(self.diff_body, bg="#37474F")
+        diff_row.pack(fill=tk.X, padx=5)
+
+        self.diff_combo = ttk.Combobox(diff_row, state="readonly", font=("Arial", 12), width=60)
+        self.diff_combo.pack(side=tk.LEFT)
+        self.diff_combo.bind("<<ComboboxSelected>>", lambda event: self.show_text_diff())
+
+        self.diff_status_label = tk.Label(
+            diff_row, text="", font=("Arial", 12), bg="#37474F", fg="#90CAF9", anchor="w"
+        )
+        self.diff_status_label.pack(side=tk.LEFT, padx=10)
+
+        diff_text_frame = tk.Frame(self.diff_body, bg="#37474F")
+        diff_text_frame.pack(fill=tk.X, padx=5, pady=5)
+
+        diff_scrollbar = tk.Scrollbar(diff_text_frame, bg="#37474F")
+        diff_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.diff_text = tk.Text(
+            diff_text_frame, height=14, font=("Courier", 11), bg="#263238", fg="white",
+            wrap=tk.WORD, state=tk.DISABLED, yscrollcommand=diff_scrollbar.set
+        )
+        diff_scrollbar.config(command=self.diff_text.yview)
+        self.diff_text.pack(fill=tk.X)
+
+        self.diff_text.tag_config("-", foreground="#EF9A9A")
+        self.diff_text.tag_config("+", foreground="#A5D6A7")
+        self.diff_text.tag_config("@", foreground="#90CAF9")
+        self.diff_text.tag_config(" ", foreground="#B0BEC5")
+
+        self.text_diffs = {}    # {номер похожего документа: Future с TextDiff}
 
         # Предпросмотр нового имени
         frame4 = tk.LabelFrame(self.dialog, text="Новое имя файла (предпросмотр)",
@@ -643,44 +1053,27 @@ class PublishDialog:
 
     def find_similar(self):
         """Поиск и отображение похожих документов"""
-        # Загружаем действующие документы из всех категорий
-        active_docs = scan_folder_with_categories(ACTIVE_DIR, ACTIVE_CATEGORIES)
-
-        # Ищем похожие
-        self.similar_docs = find_similar_documents(self.document, active_docs)
-
-        # Очищаем фрейм
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
+        from api_client import get_api_client, documents_from_dicts, ApiUnavailable
 
-        if not self.similar_docs:
-            tk.Label(
-                self.scrollable_frame, text="Похожих документов не найдено",
-                fg="#B0BEC5", font=("Arial", 14, "italic"), bg="#37474F"
-            ).pack(pady=20)
-            return
-
-        # Отображаем похожие документы
-        for doc in self.similar_docs:
-            frame = tk.Frame(self.scrollable_frame, relief=tk.RIDGE,
-                             borderwidth=2, padx=10, pady=10, bg="#4A5568")
-            frame.pack(fill=tk.X, pady=5)
-
-            # Галочка
-            var = tk.BooleanVar(value=True)  # По умолчанию включена
-            self.archive_vars[doc] = var
-
-            chk = tk.Checkbutton(
-                frame, variable=var, text="",
-                font=("Arial", 14), bg="#4A5568", fg="white",
-                selectcolor="#37474F", activebackground="#4A5568"
-            )
-            chk.pack(side=tk.LEFT)
-
-            # Информация о документе
-            info_frame = tk.Frame(frame, bg="#4A5568")
-            info_frame.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        ws = self.main_window.workspace
+        self.similar_docs = None
 
+        # Похожие из локального сервиса (если он настроен)
+        client = get_api_client(ws)
+        if client is not None:
+            try:
+                self.similar_docs = documents_from_dicts(client.similar(self.document.filename, fresh=True))
+            except ApiUnavailable as e:
+                print(f"Сервис недоступен: {e}")
+
+        if self.similar_docs is None:
+            # Загружаем действующие документы из всех категорий и ищем похожие
+            active_docs = scan_folder_with_categories(ws.active_dir, ws.active_categories, ws)
+            self.similar_docs = find_similar_documents(self.document, active_docs)
+
+        # Строки списка: имя, совпадения, различия
+        items = []
+        for index, doc in enumerate(self.similar_docs):
             # Собранное имя документа с категорией
             if doc.is_valid:
                 doc_display = build_filename(doc.typ, doc.kod, doc.version, doc.year, doc.title)
@@ -690,27 +1083,105 @@ class PublishDialog:
             if doc.category:
                 doc_display = f"[{doc.category}] {doc_display}"
 
-            tk.Label(
-                info_frame, text=doc_display,
-                font=("Arial", 14, "bold"), bg="#4A5568", fg="white"
-            ).pack(anchor="w")
+            lines = [(doc_display, "white", ("Arial", 14, "bold"))]
 
             # Сравнение
             comparison = compare_documents(self.document, doc)
 
             if comparison['matches']:
-                matches_text = "Совпадения: " + " ".join(comparison['matches'])
-                tk.Label(
-                    info_frame, text=matches_text,
-                    fg="#81C784", font=("Arial", 12), bg="#4A5568"
-                ).pack(anchor="w")
+                lines.append(("Совпадения: " + " ".join(comparison['matches']), "#81C784", ("Arial", 12)))
 
             if comparison['differences']:
-                diff_text = "Различия: " + " ".join(comparison['differences'])
-                tk.Label(
-                    info_frame, text=diff_text,
-                    fg="#FFB74D", font=("Arial", 12), bg="#4A5568"
-                ).pack(anchor="w")
+                lines.append(("Различия: " + " ".join(comparison['differences']), "#FFB74D", ("Arial", 12)))
+
+            items.append((index, lines))
+
+        # По умолчанию все похожие документы отмечены для архивации
+        self.similar_list.set_items(items, checked=range(len(items)))
+
+    def toggle_text_diff(self):
+        """Показать или скрыть сравнение текста"""
+        if self.diff_body.winfo_ismapped():
+            self.diff_body.pack_forget()
+            self.diff_toggle_btn.config(text="▶ Сравнение текста")
+            self.dialog.geometry("900x800")
+            return
+
+        self.diff_body.pack(fill=tk.X)
+        self.diff_toggle_btn.config(text="▼ Сравнение текста")
+        self.dialog.geometry("900x1050")
+
+        names = [doc.filename for doc in self.similar_docs]
+        self.diff_combo.config(values=names)
+        if names and self.diff_combo.current() < 0:
+            self.diff_combo.current(0)
+        self.show_text_diff()
+
+    def show_text_diff(self):
+        """Сравнить текст проекта с выбранным похожим документом (в фоне, результат запоминается)"""
+        from text_diff import diff_async
+
+        index = self.diff_combo.current()
+        if index < 0:
+            self.set_diff_text([], "Похожих документов нет - сравнивать не с чем")
+            return
+
+        future = self.text_diffs.get(index)
+        if future is None:
+            future = diff_async(self.similar_docs[index], self.document, self.main_window.workspace)
+            self.text_diffs[index] = future
+
+        if not future.done():
+            self.set_diff_text([], "Сравнение...")
+        self.poll_text_diff(index, future)
+
+    def poll_text_diff(self, index, future):
+        """Показать результат сравнения, когда он готов (если документ всё ещё выбран)"""
+        if not self.dialog.winfo_exists() or self.diff_combo.current() != index:
+            return
+        if not future.done():
+            self.dialog.after(100, self.poll_text_diff, index, future)
+            return
+
+        try:
+            result = future.result()
+        except Exception as e:
+            # TextUnavailable / DiffTooLarge - понятное сообщение
+            self.set_diff_text([], str(e))
+            return
+
+        if result.identical:
+            self.set_diff_text([], "Текст не изменился")
+        else:
+            self.set_diff_text(result.lines(), f"Добавлено строк: {result.added} | Удалено: {result.removed}")
+
+    def set_diff_text(self, lines, status):
+        """Вывести строки сравнения ((тег, текст)) и строку состояния"""
+        self.diff_status_label.config(text=status)
+        self.diff_text.config(state=tk.NORMAL)
+        self.diff_text.delete(1.0, tk.END)
+        for tag, line in lines:
+            prefix = "" if tag == "@" else tag + " "
+            self.diff_text.insert(tk.END, prefix + line + "\n", tag)
+        self.diff_text.config(state=tk.DISABLED)
+
+    def update_history(self):
+        """Показать историю версий для введённого кода и следующий номер версии"""
+        from lineage import describe
+
+        kod = self.kod_var.get().strip()
+        entries = self.lineage.history(kod) if kod else []
+
+        self.history_list.delete(0, tk.END)
+        for entry in reversed(entries):  # новые сверху
+            self.history_list.insert(tk.END, describe(entry))
+        if not entries:
+            self.history_list.insert(tk.END, "Других версий нет" if kod else "Введите код документа")
+
+        if kod:
+            self.next_version_label.config(text=f"Следующая версия: {self.lineage.next_version(kod)}")
+        else:
+            self.next_version_label.config(text="")
 
     def update_preview(self):
         """Обновить предпросмотр нового имени"""
@@ -743,7 +1214,7 @@ class PublishDialog:
             return
 
         # Список документов для архивации
-        archive_list = [doc for doc, var in self.archive_vars.items() if var.get()]
+        archive_list = [self.similar_docs[index] for index in self.similar_list.get_checked()]
 
         # Подтверждение
         msg = f"Опубликовать документ?\n\n"
@@ -757,7 +1228,8 @@ class PublishDialog:
 
         # Публикация
         success = publish_document(
-            self.document, typ, kod, version, year, title, category, archive_list
+            self.document, typ, kod, version, year, title, category, archive_list,
+            self.main_window.workspace
         )
 
         if success:
@@ -771,7 +1243,9 @@ class PublishDialog:
 class RegistryWindow:
     """Окно просмотра и экспорта реестров"""
 
-    def __init__(self, parent):
+    def __init__(self, parent, workspace):
+        self.workspace = workspace
+
         # Создаём окно
         self.window = tk.Toplevel(parent)
         self.window.title("Реестры документации СМК")
@@ -898,18 +1372,23 @@ class RegistryWindow:
         self.current_category = self.category_var.get()
         self.load_registry()
 
+    @perf.timed("gui.load_registry")
     def load_registry(self):
         """Загрузить и отобразить реестр для текущей категории"""
+        from registry import read_registry_content
+
         self.text_widget.delete(1.0, tk.END)
 
-        content = read_registry_content(self.current_category)
+        content = read_registry_content(self.current_category, self.workspace)
         self.text_widget.insert(1.0, content)
 
         self.status_label.config(text=f"Загружен реестр: {self.current_category}")
 
     def update_registry(self):
         """Принудительное обновление реестра"""
-        success = manual_update_registry(self.current_category)
+        from registry import manual_update_registry
+
+        success = manual_update_registry(self.current_category, self.workspace)
 
         if success:
             messagebox.showinfo("Успех", f"Реестр для категории '{self.current_category}' обновлён!")
@@ -931,7 +1410,9 @@ class RegistryWindow:
         if not filepath:
             return
 
-        success = export_registry_to_csv(self.current_category, filepath)
+        from registry import export_registry_to_csv
+
+        success = export_registry_to_csv(self.current_category, filepath, self.workspace)
 
         if success:
             messagebox.showinfo("Успех", f"Реестр экспортирован в:\n{filepath}")
@@ -953,7 +1434,9 @@ class RegistryWindow:
         if not filepath:
             return
 
-        success = export_registry_to_excel(self.current_category, filepath)
+        from registry import export_registry_to_excel
+
+        success = export_registry_to_excel(self.current_category, filepath, self.workspace)
 
         if success:
             messagebox.showinfo("Успех", f"Реестр экспортирован в:\n{filepath}")
@@ -975,7 +1458,9 @@ class RegistryWindow:
         if not filepath:
             return
 
-        success = export_all_registries_to_excel(filepath)
+        from registry import export_all_registries_to_excel
+
+        success = export_all_registries_to_excel(filepath, self.workspace)
 
         if success:
             messagebox.showinfo("Успех", f"Все реестры экспортированы в:\n{filepath}")
@@ -987,7 +1472,9 @@ class RegistryWindow:
 class EmployeesWindow:
     """Окно управления справочником сотрудников"""
 
-    def __init__(self, parent):
+    def __init__(self, parent, workspace):
+        self.workspace = workspace
+
         # Создаём окно
         self.window = tk.Toplevel(parent)
         self.window.title("Справочник сотрудников")
@@ -1037,12 +1524,53 @@ class EmployeesWindow:
         # Разделитель
         tk.Frame(control_frame, width=30, bg="#455A64").pack(side=tk.LEFT)
 
+        ttk.Button(
+            control_frame, text="📥 Импорт", width=12,
+            command=self.import_from_file,
+            style="Publish.TButton"
+        ).pack(side=tk.LEFT, padx=5)
+
         ttk.Button(
             control_frame, text="📊 Экспорт в Excel", width=18,
             command=self.export_to_excel,
             style="Publish.TButton"
         ).pack(side=tk.LEFT, padx=5)
 
+        ttk.Button(
+            control_frame, text="💾 Экспорт в JSON", width=18,
+            command=self.export_to_json,
+            style="Publish.TButton"
+        ).pack(side=tk.LEFT, padx=5)
+
+        # Строка поиска (фильтр по мере ввода)
+        search_frame = tk.Frame(self.window, bg="#2C3E50")
+        search_frame.pack(fill=tk.X, padx=10, pady=(10, 0))
+
+        tk.Label(
+            search_frame, text="🔍 Поиск:",
+            font=("Arial", 12), bg="#2C3E50", fg="white"
+        ).pack(side=tk.LEFT)
+
+        self.search_var = tk.StringVar()
+        tk.Entry(
+            search_frame, textvariable=self.search_var,
+            font=("Arial", 12), bg="#4A5568", fg="white", insertbackground="white"
+        ).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        self.search_var.trace('w', lambda *args: self.apply_search())
+
+        # Учёт ознакомлений
+        ttk.Button(
+            search_frame, text="📋 К ознакомлению", width=18,
+            command=self.show_pending_documents,
+            style="TButton"
+        ).pack(side=tk.RIGHT, padx=5)
+
+        ttk.Button(
+            search_frame, text="📝 Загрузить листы", width=18,
+            command=self.import_signed_sheets,
+            style="Publish.TButton"
+        ).pack(side=tk.RIGHT, padx=5)
+
         # Таблица сотрудников
         table_frame = tk.Frame(self.window, bg="#2C3E50")
         table_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
@@ -1093,25 +1621,47 @@ class EmployeesWindow:
             style="TButton"
         ).pack()
 
+    @perf.timed("gui.load_employees_list")
     def load_employees_list(self):
         """Загрузить и отобразить список сотрудников"""
-        # Очищаем таблицу
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        from employee_repository import get_employee_repository
+
+        # Очищаем таблицу (вместе со строками, скрытыми фильтром)
+        self.tree.set_children("")
+        if self.employees:
+            self.tree.delete(*(str(emp['id']) for emp in self.employees))
 
-        # Загружаем сотрудников
-        self.employees = load_employees()
+        # Загружаем сотрудников (общий справочник в памяти)
+        self.repository = get_employee_repository(self.workspace)
+        self.employees = self.repository.all()
 
-        # Добавляем в таблицу
+        # Добавляем в таблицу (iid = ID сотрудника, нужен для фильтра)
         for emp in self.employees:
-            self.tree.insert("", tk.END, values=(
+            self.tree.insert("", tk.END, iid=str(emp['id']), values=(
                 emp['fio'],
                 emp['position'],
                 emp['department'],
                 emp['email']
             ), tags=(emp['id'],))
 
-        self.status_label.config(text=f"Загружено сотрудников: {len(self.employees)}")
+        if self.search_var.get().strip():
+            self.apply_search()
+        else:
+            self.status_label.config(text=f"Загружено сотрудников: {len(self.employees)}")
+
+    @perf.timed("gui.employees_search")
+    def apply_search(self):
+        """Оставить в таблице только найденных сотрудников"""
+        query = self.search_var.get()
+        found = self.repository.search(query)
+
+        # Один вызов Tk: строки, которых нет в списке, отсоединяются от таблицы
+        self.tree.set_children("", *(str(emp_id) for emp_id in found))
+
+        if query.strip():
+            self.status_label.config(text=f"Найдено: {len(found)} из {len(self.employees)}")
+        else:
+            self.status_label.config(text=f"Загружено сотрудников: {len(self.employees)}")
 
     def on_select(self, event):
         """Обработка выбора строки"""
@@ -1120,7 +1670,7 @@ class EmployeesWindow:
             tags = self.tree.item(selection[0])['tags']
             if tags:
                 emp_id = tags[0]
-                self.selected_employee = next((emp for emp in self.employees if emp['id'] == emp_id), None)
+                self.selected_employee = self.repository.get(emp_id)
 
     def add_employee_dialog(self):
         """Диалог добавления сотрудника"""
@@ -1147,7 +1697,9 @@ class EmployeesWindow:
                                     f"Удалить сотрудника:\n{self.selected_employee['fio']}?"):
             return
 
-        success = delete_employee(self.selected_employee['id'])
+        from employees import delete_employee
+
+        success = delete_employee(self.selected_employee['id'], self.workspace)
 
         if success:
             messagebox.showinfo("Успех", "Сотрудник удалён")
@@ -1174,7 +1726,9 @@ class EmployeesWindow:
         if not filepath:
             return
 
-        success = export_employees_to_excel(filepath)
+        from employees import export_employees_to_excel
+
+        success = export_employees_to_excel(filepath, self.workspace)
 
         if success:
             messagebox.showinfo("Успех", f"Список сотрудников экспортирован в:\n{filepath}")
@@ -1183,6 +1737,100 @@ class EmployeesWindow:
             messagebox.showerror("Ошибка",
                                  "Не удалось экспортировать список.\nУбедитесь что установлена библиотека openpyxl:\npip install openpyxl")
 
+    def import_from_file(self):
+        """Массовый импорт сотрудников из CSV/XLSX"""
+        from employee_import import import_employees
+
+        filepath = filedialog.askopenfilename(
+            title="Импорт сотрудников",
+            filetypes=[("Списки сотрудников", "*.csv *.xlsx"), ("Все файлы", "*.*")]
+        )
+
+        if not filepath:
+            return
+
+        try:
+            result = import_employees(filepath, self.workspace)
+        except Exception as e:
+            messagebox.showerror("Ошибка", f"Не удалось импортировать сотрудников:\n{e}")
+            return
+
+        self.load_employees_list()
+        messagebox.showinfo(
+            "Импорт завершён",
+            f"Добавлено: {result['inserted']}\n"
+            f"Обновлено: {result['updated']}\n"
+            f"Пропущено: {result['skipped']}"
+        )
+
+    def import_signed_sheets(self):
+        """Загрузить заполненные листы ознакомления в учёт"""
+        from acknowledgements import import_signed_sheets
+
+        filepaths = filedialog.askopenfilenames(
+            title="Заполненные листы ознакомления",
+            filetypes=[("Excel файлы", "*.xlsx"), ("Все файлы", "*.*")]
+        )
+
+        if not filepaths:
+            return
+
+        try:
+            result = import_signed_sheets(filepaths, self.workspace)
+        except Exception as e:
+            messagebox.showerror("Ошибка", f"Не удалось загрузить листы:\n{e}")
+            return
+
+        message = (
+            f"Листов загружено: {result['sheets']}\n"
+            f"Ознакомлены: {result['signed']}\n"
+            f"Не расписались: {result['pending']}"
+        )
+        if result['failed']:
+            message += f"\n\nНе удалось прочитать: {len(result['failed'])}"
+        messagebox.showinfo("Учёт ознакомлений", message)
+
+    def show_pending_documents(self):
+        """Показать документы, с которыми выбранный сотрудник ещё не ознакомился"""
+        from acknowledgements import get_acknowledgement_store
+
+        if not self.selected_employee:
+            messagebox.showwarning("Предупреждение", "Выберите сотрудника")
+            return
+
+        pending = get_acknowledgement_store(self.workspace).pending_for_employee(self.selected_employee['id'])
+
+        if not pending:
+            text = "Все назначенные документы прочитаны"
+        else:
+            lines = [f"{kod}-{version}" for kod, version in pending[:50]]
+            if len(pending) > 50:
+                lines.append(f"... и ещё {len(pending) - 50}")
+            text = f"Не ознакомлен(а) с документами ({len(pending)}):\n\n" + "\n".join(lines)
+
+        messagebox.showinfo(self.selected_employee['fio'], text)
+
+    def export_to_json(self):
+        """Экспорт справочника в JSON (совместимость с прежним employees.json)"""
+        from employees import export_employees_to_json
+
+        default_name = f"Сотрудники_{datetime.now().strftime('%Y-%m-%d')}.json"
+        filepath = filedialog.asksaveasfilename(
+            title="Сохранить справочник в JSON",
+            defaultextension=".json",
+            filetypes=[("JSON файлы", "*.json"), ("Все файлы", "*.*")],
+            initialfile=default_name
+        )
+
+        if not filepath:
+            return
+
+        if export_employees_to_json(filepath, self.workspace):
+            messagebox.showinfo("Успех", f"Справочник экспортирован в:\n{filepath}")
+            self.status_label.config(text=f"Экспортировано в JSON: {os.path.basename(filepath)}")
+        else:
+            messagebox.showerror("Ошибка", "Не удалось экспортировать справочник")
+
 
 class EmployeeEditDialog:
     """Диалог добавления/редактирования сотрудника"""
@@ -1303,14 +1951,17 @@ class EmployeeEditDialog:
             messagebox.showerror("Ошибка", "Введите email")
             return
 
+        from employees import add_employee, update_employee
+
         # Сохраняем
         if self.employee:
             # Редактирование
-            success = update_employee(self.employee['id'], fio, position, department, email)
+            success = update_employee(self.employee['id'], fio, position, department, email,
+                                      self.employees_window.workspace)
             msg = "Данные сотрудника обновлены"
         else:
             # Добавление
-            success = add_employee(fio, position, department, email)
+            success = add_employee(fio, position, department, email, self.employees_window.workspace)
             msg = "Сотрудник добавлен"
 
         if success:
@@ -1324,8 +1975,9 @@ class EmployeeEditDialog:
 class FamiliarizationDialog:
     """Диалог создания листа ознакомления для документа"""
 
-    def __init__(self, parent, document):
+    def __init__(self, parent, document, workspace):
         self.document = document
+        self.workspace = workspace
 
         # Создаём диалоговое окно
         self.dialog = tk.Toplevel(parent)
@@ -1335,9 +1987,10 @@ class FamiliarizationDialog:
         self.dialog.transient(parent)
         self.dialog.grab_set()
 
-        # Загружаем сотрудников
-        self.employees = load_employees()
-        self.employee_vars = {}  # {employee_id: BooleanVar}
+        # Загружаем сотрудников (общий справочник в памяти)
+        from employee_repository import get_employee_repository
+        self.repository = get_employee_repository(self.workspace)
+        self.employees = self.repository.all()
 
         self.create_widgets()
 
@@ -1409,6 +2062,13 @@ class FamiliarizationDialog:
             style="TButton"
         ).pack(side=tk.LEFT, padx=5)
 
+        if self.document.is_valid:
+            ttk.Button(
+                quick_frame, text="Не ознакомлены", width=15,
+                command=self.select_unsigned,
+                style="TButton"
+            ).pack(side=tk.LEFT, padx=5)
+
         # Список сотрудников с галочками
         emp_frame = tk.LabelFrame(
             self.dialog, text="Выберите сотрудников для ознакомления",
@@ -1417,50 +2077,17 @@ class FamiliarizationDialog:
         )
         emp_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
 
-        # Scrollable canvas
-        canvas = tk.Canvas(emp_frame, bg="#37474F", highlightthickness=0)
-        scrollbar = tk.Scrollbar(emp_frame, orient="vertical", command=canvas.yview, bg="#4A5568")
-        self.scrollable_frame = tk.Frame(canvas, bg="#37474F")
-
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
+        # Список с галочками: рисуются только видимые строки, отметки - set ID
+        self.checklist = VirtualChecklist(
+            emp_frame, row_height=30, font=("Arial", 11),
+            empty_text="Нет сотрудников в справочнике",
+            filter_func=lambda query: set(self.repository.search(query))
+        )
+        self.checklist.pack(fill=tk.BOTH, expand=True)
+        self.checklist.set_items(
+            (emp['id'], f"{emp['fio']} — {emp['position']} ({emp['department']})")
+            for emp in self.employees
         )
-
-        canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
-
-        canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-
-        # Создаём галочки для каждого сотрудника
-        if not self.employees:
-            tk.Label(
-                self.scrollable_frame, text="Нет сотрудников в справочнике",
-                fg="#B0BEC5", font=("Arial", 12, "italic"), bg="#37474F"
-            ).pack(pady=20)
-        else:
-            for emp in self.employees:
-                emp_row = tk.Frame(self.scrollable_frame, bg="#4A5568", pady=5, padx=10)
-                emp_row.pack(fill=tk.X, pady=2)
-
-                var = tk.BooleanVar(value=False)
-                self.employee_vars[emp['id']] = var
-
-                chk = tk.Checkbutton(
-                    emp_row, variable=var,
-                    font=("Arial", 11), bg="#4A5568", fg="white",
-                    selectcolor="#37474F", activebackground="#4A5568",
-                    text=""
-                )
-                chk.pack(side=tk.LEFT, padx=5)
-
-                # Информация о сотруднике
-                info_text = f"{emp['fio']} — {emp['position']} ({emp['department']})"
-                tk.Label(
-                    emp_row, text=info_text,
-                    font=("Arial", 11), bg="#4A5568", fg="white", anchor="w"
-                ).pack(side=tk.LEFT, fill=tk.X, expand=True)
 
         # Кнопки
         button_frame = tk.Frame(self.dialog, bg="#2C3E50")
@@ -1480,24 +2107,27 @@ class FamiliarizationDialog:
 
     def select_by_department(self, department):
         """Выбрать всех сотрудников из подразделения"""
-        for emp in self.employees:
-            if emp['department'] == department:
-                self.employee_vars[emp['id']].set(True)
+        self.checklist.set_checked(emp['id'] for emp in self.repository.by_department(department))
 
     def deselect_all(self):
         """Снять все галочки"""
-        for var in self.employee_vars.values():
-            var.set(False)
+        self.checklist.clear_checked()
 
     def select_all(self):
-        """Выбрать всех сотрудников"""
-        for var in self.employee_vars.values():
-            var.set(True)
+        """Выбрать всех сотрудников (с учётом фильтра)"""
+        self.checklist.check_visible()
+
+    def select_unsigned(self):
+        """Выбрать сотрудников, ещё не ознакомившихся с этой версией документа"""
+        from acknowledgements import get_acknowledgement_store
+
+        store = get_acknowledgement_store(self.workspace)
+        self.checklist.set_checked(store.unsigned_for_document(self.document.kod, self.document.version))
 
     def create_sheet(self):
         """Создать лист ознакомления"""
         # Получаем выбранных сотрудников
-        selected = [emp for emp in self.employees if self.employee_vars[emp['id']].get()]
+        selected = self.repository.get_many(self.checklist.get_checked())
 
         if not selected:
             messagebox.showwarning("Предупреждение", "Выберите хотя бы одного сотрудника")
@@ -1522,7 +2152,8 @@ class FamiliarizationDialog:
             return
 
         # Создаём лист
-        success = create_familiarization_sheet(self.document, selected, filepath)
+        from employees import create_familiarization_sheet
+        success = create_familiarization_sheet(self.document, selected, filepath, self.workspace)
 
         if success:
             messagebox.showinfo("Успех",
@@ -1535,4 +2166,685 @@ class FamiliarizationDialog:
             messagebox.showerror("Ошибка",
                 "Не удалось создать лист ознакомления.\n"
                 "Убедитесь что установлена библиотека openpyxl:\n"
-                "pip install openpyxl")
\ No newline at end of file
+                "pip install openpyxl")
+
+
+class AggregateWindow:
+    """Сводный просмотр документов нескольких рабочих папок (только чтение)"""
+
+    def __init__(self, parent):
+        from aggregate import AggregateView
+
+        # Создаём окно
+        self.window = tk.Toplevel(parent)
+        self.window.title("Сводный просмотр рабочих папок")
+        self.window.geometry("1200x700")
+        self.window.configure(bg="#2C3E50")
+        self.window.transient(parent)
+        self.window.grab_set()
+
+        self.view = AggregateView()
+        self.shown = []  # Документы, отображённые в таблице
+
+        self.create_widgets()
+        self.refresh()
+
+    def create_widgets(self):
+        """Создание элементов интерфейса"""
+
+        # Заголовок
+        tk.Label(
+            self.window, text="🏭 Сводный просмотр рабочих папок",
+            font=("Arial", 18, "bold"), bg="#37474F", fg="white", pady=15
+        ).pack(fill=tk.X)
+
+        # Панель управления
+        control_frame = tk.Frame(self.window, bg="#455A64", pady=10)
+        control_frame.pack(fill=tk.X, padx=10)
+
+        ttk.Button(
+            control_frame, text="➕ Добавить папку", width=18,
+            command=self.add_dir,
+            style="Publish.TButton"
+        ).pack(side=tk.LEFT, padx=5)
+
+        ttk.Button(
+            control_frame, text="➖ Убрать папку", width=16,
+            command=self.remove_dir,
+            style="TButton"
+        ).pack(side=tk.LEFT, padx=5)
+
+        ttk.Button(
+            control_frame, text="🔄 Обновить", width=14,
+            command=self.refresh,
+            style="TButton"
+        ).pack(side=tk.LEFT, padx=5)
+
+        tk.Label(
+            control_frame, text="Поиск:", font=("Arial", 14, "bold"),
+            bg="#455A64", fg="white"
+        ).pack(side=tk.LEFT, padx=10)
+
+        self.search_var = tk.StringVar()
+        self.search_var.trace('w', lambda *args: self.show_documents())
+        tk.Entry(
+            control_frame, textvariable=self.search_var, width=30,
+            font=("Arial", 14), bg="#4A5568", fg="white",
+            insertbackground="white"
+        ).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+
+        # Список рабочих папок
+        self.dirs_listbox = tk.Listbox(
+            self.window, height=4, font=("Arial", 12),
+            bg="#37474F", fg="white", selectbackground="#546E7A"
+        )
+        self.dirs_listbox.pack(fill=tk.X, padx=10, pady=5)
+
+        # Таблица документов
+        table_frame = tk.Frame(self.window, bg="#2C3E50")
+        table_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+
+        scrollbar = tk.Scrollbar(table_frame, bg="#37474F")
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        columns = ("Рабочая папка", "Папка", "Категория", "Документ")
+        self.tree = ttk.Treeview(
+            table_frame, columns=columns, show="headings",
+            yscrollcommand=scrollbar.set
+        )
+        scrollbar.config(command=self.tree.yview)
+
+        for column, width in zip(columns, (180, 150, 180, 650)):
+            self.tree.heading(column, text=column)
+            self.tree.column(column, width=width)
+
+        self.tree.pack(fill=tk.BOTH, expand=True)
+        self.tree.bind('<Double-1>', self.open_document)
+
+        # Статус бар
+        self.status_label = tk.Label(
+            self.window, text="Готов", anchor="w",
+            bg="#37474F", fg="white", relief=tk.SUNKEN,
+            font=("Arial", 12), height=2
+        )
+        self.status_label.pack(side=tk.BOTTOM, fill=tk.X)
+
+    def add_dir(self):
+        """Добавить рабочую папку в сводный просмотр"""
+        from aggregate import save_aggregate_dirs
+
+        path = filedialog.askdirectory(title="Выберите рабочую папку площадки", mustexist=True)
+        if not path:
+            return
+
+        self.view.add_dir(path)
+        save_aggregate_dirs(ws.docs_dir for ws in self.view.workspaces)
+        self.refresh()
+
+    def remove_dir(self):
+        """Убрать выбранную рабочую папку"""
+        from aggregate import save_aggregate_dirs
+
+        selection = self.dirs_listbox.curselection()
+        if not selection:
+            messagebox.showwarning("Предупреждение", "Выберите папку в списке")
+            return
+
+        self.view.remove_dir(self.view.workspaces[selection[0]].docs_dir)
+        save_aggregate_dirs(ws.docs_dir for ws in self.view.workspaces)
+        self.refresh()
+
+    def refresh(self):
+        """Пересканировать площадки (неизменённые папки берутся из кэша)"""
+        self.dirs_listbox.delete(0, tk.END)
+        for ws in self.view.workspaces:
+            self.dirs_listbox.insert(tk.END, ws.docs_dir)
+
+        self.view.scan()
+        self.show_documents()
+
+    @perf.timed("gui.aggregate_documents")
+    def show_documents(self):
+        """Отобразить документы с учётом строки поиска"""
+        for item in self.tree.get_children():
+            self.tree.delete(item)
+
+        self.shown = self.view.search(self.search_var.get())
+
+        for index, item in enumerate(self.shown):
+            doc = item.document
+            if doc.is_valid:
+                name = build_filename(doc.typ, doc.kod, doc.version, doc.year, doc.title)
+            else:
+                name = doc.filename
+            self.tree.insert("", tk.END, iid=str(index),
+                             values=(item.workspace.name, item.folder, doc.category, name))
+
+        self.status_label.config(
+            text=f"Рабочих папок: {len(self.view.workspaces)} | "
+                 f"Показано документов: {len(self.shown)} из {len(self.view.documents)}"
+        )
+
+    def open_document(self, event):
+        """Открыть документ (двойной клик)"""
+        selection = self.tree.selection()
+        if not selection:
+            return
+
+        item = self.shown[int(selection[0])]
+        try:
+            open_document_external(item.document, item.workspace)
+        except Exception as e:
+            messagebox.showerror("Ошибка", f"Не удалось открыть файл:\n{e}")
+
+
+class ValidationWindow:
+    """Проблемы рабочей папки (validation.py), сгруппированные по видам"""
+
+    # Период проверки готовности фоновой проверки (мс)
+    POLL_MS = 100
+
+    def __init__(self, parent, workspace):
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.workspace = workspace
+
+        # Создаём окно
+        self.window = tk.Toplevel(parent)
+        self.window.title("Проверка рабочей папки")
+        self.window.geometry("1200x700")
+        self.window.configure(bg="#2C3E50")
+        self.window.transient(parent)
+        self.window.grab_set()
+
+        # Проверка идёт в фоне, окно опрашивает её через after
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.window.bind("<Destroy>", self.on_destroy)
+        self.future = None
+        self.issues = {}    # {iid строки: ValidationIssue}
+
+        self.create_widgets()
+        self.refresh()
+
+    def create_widgets(self):
+        """Создание элементов интерфейса"""
+
+        # Заголовок
+        tk.Label(
+            self.window, text="🔍 Проверка рабочей папки",
+            font=("Arial", 18, "bold"), bg="#37474F", fg="white", pady=15
+        ).pack(fill=tk.X)
+
+        # Панель управления
+        control_frame = tk.Frame(self.window, bg="#455A64", pady=10)
+        control_frame.pack(fill=tk.X, padx=10)
+
+        self.refresh_btn = ttk.Button(
+            control_frame, text="🔄 Проверить", width=14,
+            command=self.refresh, style="TButton"
+        )
+        self.refresh_btn.pack(side=tk.LEFT, padx=5)
+
+        ttk.Button(
+            control_frame, text="✏️ Привести имена", width=18,
+            command=self.open_rename_dialog, style="TButton"
+        ).pack(side=tk.LEFT, padx=5)
+
+        # Таблица проблем: строки видов с вложенными проблемами
+        table_frame = tk.Frame(self.window, bg="#2C3E50")
+        table_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+
+        scrollbar = tk.Scrollbar(table_frame, bg="#37474F")
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        columns = ("Папка", "Категория", "Описание")
+        self.tree = ttk.Treeview(
+            table_frame, columns=columns, show="tree headings",
+            yscrollcommand=scrollbar.set
+        )
+        scrollbar.config(command=self.tree.yview)
+
+        self.tree.heading("#0", text="Документ")
+        self.tree.column("#0", width=520)
+        for column, width in zip(columns, (130, 160, 380)):
+            self.tree.heading(column, text=column)
+            self.tree.column(column, width=width)
+
+        self.tree.pack(fill=tk.BOTH, expand=True)
+        self.tree.bind('<Double-1>', self.open_document)
+
+        # Статус бар
+        self.status_label = tk.Label(
+            self.window, text="Готов", anchor="w",
+            bg="#37474F", fg="white", relief=tk.SUNKEN,
+            font=("Arial", 12), height=2
+        )
+        self.status_label.pack(side=tk.BOTTOM, fill=tk.X)
+
+    def refresh(self):
+        """Запустить проверку (неизменившаяся рабочая папка - из кэша)"""
+        from validation import validate_workspace
+
+        if self.future is not None and not self.future.done():
+            return
+
+        self.refresh_btn.config(state=tk.DISABLED)
+        self.status_label.config(text="Проверка...")
+        self.future = self.executor.submit(validate_workspace, self.workspace)
+        self.window.after(self.POLL_MS, self.poll)
+
+    def poll(self):
+        """Показать результат, когда фоновая проверка закончится"""
+        if not self.window.winfo_exists():
+            return
+        if not self.future.done():
+            self.window.after(self.POLL_MS, self.poll)
+            return
+
+        self.refresh_btn.config(state=tk.NORMAL)
+        try:
+            report = self.future.result()
+        except Exception as e:
+            self.status_label.config(text=f"Ошибка проверки: {e}")
+            return
+        self.show_report(report)
+
+    def show_report(self, report):
+        """Отобразить проблемы по видам (вид - количество - документы)"""
+        from validation import ISSUE_KINDS
+
+        self.tree.delete(*self.tree.get_children())
+        self.issues = {}
+
+        counts = report.counts()
+        for kind, title in ISSUE_KINDS:
+            issues = report.by_kind(kind)
+            if not issues:
+                continue
+
+            per_category = ", ".join(f"{category}: {count}" for category, count in counts[kind].items())
+            parent = self.tree.insert("", tk.END, text=f"{title} ({len(issues)})", values=("", "", per_category))
+            for index, issue in enumerate(issues):
+                iid = f"{kind}:{index}"
+                self.issues[iid] = issue
+                self.tree.insert(parent, tk.END, iid=iid, text=issue.documents[0].filename,
+                                 values=(issue.folder, issue.category or "", issue.message))
+
+        if report.ok:
+            self.status_label.config(text=f"Проверено файлов: {report.files} | Проблем не найдено")
+        else:
+            self.status_label.config(text=f"Проверено файлов: {report.files} | Проблем: {len(report.issues)}")
+
+    def open_rename_dialog(self):
+        """Открыть приведение имён к шаблону; после него проверка повторяется"""
+        rename_dialog = RenameDialog(self.window, self.workspace)
+        self.window.wait_window(rename_dialog.window)
+        if self.window.winfo_exists():
+            self.refresh()
+
+    def on_destroy(self, event):
+        # <Destroy> приходит и от дочерних элементов
+        if event.widget is self.window:
+            self.executor.shutdown(wait=False)
+
+    def open_document(self, event):
+        """Открыть документ проблемы (двойной клик)"""
+        selection = self.tree.selection()
+        if not selection or selection[0] not in self.issues:
+            return
+
+        try:
+            open_document_external(self.issues[selection[0]].documents[0], self.workspace)
+        except Exception as e:
+            messagebox.showerror("Ошибка", f"Не удалось открыть файл:\n{e}")
+
+
+class RenameDialog:
+    """Приведение имён файлов ДЕЙСТВУЮЩИХ к шаблону (renamer.py): план и выполнение"""
+
+    def __init__(self, parent, workspace):
+        self.workspace = workspace
+        self.plan = []
+
+        # Создаём окно
+        self.window = tk.Toplevel(parent)
+        self.window.title("Приведение имён к шаблону")
+        self.window.geometry("1000x650")
+        self.window.configure(bg="#2C3E50")
+        self.window.transient(parent)
+        self.window.grab_set()
+
+        self.create_widgets()
+        self.load_plan()
+
+    def create_widgets(self):
+        """Создание элементов интерфейса"""
+
+        control_frame = tk.Frame(self.window, bg="#455A64", pady=10)
+        control_frame.pack(fill=tk.X, padx=10, pady=(10, 0))
+
+        self.apply_btn = ttk.Button(
+            control_frame, text="✅ Переименовать", width=18,
+            command=self.apply, style="Publish.TButton"
+        )
+        self.apply_btn.pack(side=tk.LEFT, padx=5)
+
+        ttk.Button(
+            control_frame, text="↩️ Откатить последнее", width=22,
+            command=self.rollback, style="TButton"
+        ).pack(side=tk.LEFT, padx=5)
+
+        # План в виде diff: "-" старое имя, "+" новое, "!" пропускается
+        text_frame = tk.Frame(self.window, bg="#2C3E50")
+        text_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+
+        scrollbar = tk.Scrollbar(text_frame, bg="#37474F")
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.diff_text = tk.Text(
+            text_frame, font=("Courier", 12), bg="#37474F", fg="white",
+            wrap=tk.NONE, yscrollcommand=scrollbar.set
+        )
+        scrollbar.config(command=self.diff_text.yview)
+        self.diff_text.pack(fill=tk.BOTH, expand=True)
+
+        self.diff_text.tag_config("old", foreground="#EF9A9A")
+        self.diff_text.tag_config("new", foreground="#A5D6A7")
+        self.diff_text.tag_config("skip", foreground="#FFCC80")
+        self.diff_text.tag_config("category", foreground="#90CAF9", font=("Courier", 12, "bold"))
+
+        self.status_label = tk.Label(
+            self.window, text="", anchor="w",
+            bg="#37474F", fg="white", relief=tk.SUNKEN,
+            font=("Arial", 12), height=2
+        )
+        self.status_label.pack(side=tk.BOTTOM, fill=tk.X)
+
+    def load_plan(self):
+        """Построить план и показать его"""
+        from renamer import plan_renames, format_diff, READY
+
+        self.plan = plan_renames(workspace=self.workspace)
+        tags = {"-": "old", "+": "new", "!": "skip", "=": "category"}
+
+        self.diff_text.config(state=tk.NORMAL)
+        self.diff_text.delete(1.0, tk.END)
+        for line in format_diff(self.plan).splitlines():
+            self.diff_text.insert(tk.END, line + "\n", tags.get(line[:1]))
+        self.diff_text.config(state=tk.DISABLED)
+
+        ready = sum(1 for item in self.plan if item.status == READY)
+        self.apply_btn.config(state=tk.NORMAL if ready else tk.DISABLED)
+        if self.plan:
+            self.status_label.config(
+                text=f"Будет переименовано: {ready} | Пропущено из-за конфликтов: {len(self.plan) - ready}"
+            )
+        else:
+            self.status_label.config(text="Все имена, которые можно привести к шаблону, уже в порядке")
+
+    def apply(self):
+        """Выполнить переименования плана"""
+        from renamer import apply_renames, READY
+
+        ready = sum(1 for item in self.plan if item.status == READY)
+        if not messagebox.askyesno(
+            "Подтверждение",
+            f"Переименовать файлов: {ready}?\nРеестры затронутых категорий будут пересозданы.",
+            parent=self.window
+        ):
+            return
+
+        result = apply_renames(self.plan, self.workspace)
+        if result["failed"]:
+            errors = "\n".join(f"{item['old']}: {item['error']}" for item in result["failed"][:10])
+            messagebox.showwarning("Переименование", f"Переименовано: {result['renamed']}\n"
+                                   f"Ошибок: {len(result['failed'])}\n\n{errors}", parent=self.window)
+        else:
+            messagebox.showinfo("Переименование", f"Переименовано: {result['renamed']}", parent=self.window)
+        self.load_plan()
+
+    def rollback(self):
+        """Откатить последнее ещё не откаченное массовое переименование"""
+        from renamer import list_rename_logs, rollback_renames
+
+        logs = list_rename_logs(self.workspace)
+        if not logs:
+            messagebox.showinfo("Откат", "Нет переименований для отката", parent=self.window)
+            return
+        if not messagebox.askyesno("Подтверждение", f"Откатить переименования по журналу\n"
+                                   f"{os.path.basename(logs[0])}?", parent=self.window):
+            return
+
+        result = rollback_renames(logs[0], self.workspace)
+        messagebox.showinfo("Откат", f"Возвращено имён: {result['restored']}\n"
+                            f"Пропущено: {len(result['skipped'])}", parent=self.window)
+        self.load_plan()
+
+
+class PerformanceWindow:
+    """Сводка замеров времени (perf.py); открывается по Ctrl+Shift+P"""
+
+    # Период автообновления сводки (мс)
+    REFRESH_MS = 2000
+
+    COLUMNS = (
+        ("Интервал", "name", 320),
+        ("Вызовов", "count", 90),
+        ("Всего, мс", "total_ms", 110),
+        ("Среднее, мс", "mean_ms", 110),
+        ("p50, мс", "p50_ms", 100),
+        ("p95, мс", "p95_ms", 100),
+        ("Макс, мс", "max_ms", 100),
+    )
+
+    def __init__(self, parent):
+        # Окно не модальное - замеры смотрят, пока работают в главном окне
+        self.window = tk.Toplevel(parent)
+        self.window.title("Производительность")
+        self.window.geometry("1000x500")
+        self.window.configure(bg="#2C3E50")
+
+        self.after_id = None
+
+        self.create_widgets()
+        self.refresh()
+
+    def create_widgets(self):
+        """Создание элементов интерфейса"""
+
+        control_frame = tk.Frame(self.window, bg="#455A64", pady=10)
+        control_frame.pack(fill=tk.X, padx=10, pady=(10, 0))
+
+        self.enabled_var = tk.BooleanVar(value=perf.is_enabled())
+        tk.Checkbutton(
+            control_frame, text="Замеры включены", variable=self.enabled_var,
+            command=self.toggle, font=("Arial", 13), bg="#455A64", fg="white",
+            selectcolor="#37474F", activebackground="#455A64"
+        ).pack(side=tk.LEFT, padx=10)
+
+        ttk.Button(
+            control_frame, text="🔄 Обновить", width=14,
+            command=self.refresh, style="TButton"
+        ).pack(side=tk.LEFT, padx=5)
+
+        ttk.Button(
+            control_frame, text="🧹 Очистить", width=14,
+            command=self.clear, style="TButton"
+        ).pack(side=tk.LEFT, padx=5)
+
+        ttk.Button(
+            control_frame, text="📄 Журнал", width=14,
+            command=self.open_log, style="TButton"
+        ).pack(side=tk.LEFT, padx=5)
+
+        ttk.Button(
+            control_frame, text="🩺 Зависания", width=14,
+            command=lambda: DiagnosticsWindow(self.window), style="TButton"
+        ).pack(side=tk.LEFT, padx=5)
+
+        table_frame = tk.Frame(self.window, bg="#2C3E50")
+        table_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+
+        scrollbar = tk.Scrollbar(table_frame, bg="#37474F")
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.tree = ttk.Treeview(
+            table_frame, columns=[title for title, _, _ in self.COLUMNS],
+            show="headings", yscrollcommand=scrollbar.set
+        )
+        scrollbar.config(command=self.tree.yview)
+
+        for title, _, width in self.COLUMNS:
+            self.tree.heading(title, text=title)
+            self.tree.column(title, width=width, anchor="w" if title == "Интервал" else "e")
+
+        self.tree.pack(fill=tk.BOTH, expand=True)
+
+        self.status_label = tk.Label(
+            self.window, text="", anchor="w",
+            bg="#37474F", fg="white", relief=tk.SUNKEN,
+            font=("Arial", 12), height=2
+        )
+        self.status_label.pack(side=tk.BOTTOM, fill=tk.X)
+
+    def refresh(self):
+        """Обновить сводку (и запланировать следующее обновление)"""
+        if not self.window.winfo_exists():
+            return
+        if self.after_id:
+            self.window.after_cancel(self.after_id)
+
+        self.tree.delete(*self.tree.get_children())
+        rows = perf.summary()
+        for row in rows:
+            self.tree.insert("", tk.END, values=[row[key] for _, key, _ in self.COLUMNS])
+
+        state = "включены" if perf.is_enabled() else "выключены"
+        self.status_label.config(
+            text=f"Замеры {state} | Интервалов: {sum(row['count'] for row in rows)} | "
+                 f"Журнал: {perf.get_log_path() or 'не ведётся'}"
+        )
+
+        self.after_id = self.window.after(self.REFRESH_MS, self.refresh)
+
+    def toggle(self):
+        """Включить или выключить замеры"""
+        if self.enabled_var.get():
+            perf.enable()
+        else:
+            perf.disable()
+
+    def clear(self):
+        """Очистить сводку"""
+        perf.clear()
+        self.tree.delete(*self.tree.get_children())
+
+    def open_log(self):
+        """Открыть журнал замеров во внешней программе"""
+        perf.flush()
+        path = perf.get_log_path()
+        if not path or not os.path.exists(path):
+            messagebox.showinfo("Журнал", "Журнал замеров пока пуст", parent=self.window)
+            return
+        try:
+            open_file_external(path)
+        except Exception as e:
+            messagebox.showerror("Ошибка", f"Не удалось открыть журнал:\n{e}", parent=self.window)
+
+
+class DiagnosticsWindow:
+    """Зависания главного цикла (ui_watchdog.py); открывается по Ctrl+Shift+D"""
+
+    REFRESH_MS = 2000
+
+    def __init__(self, parent):
+        from ui_watchdog import get_watchdog
+
+        self.watchdog = get_watchdog()
+        self.stalls = []
+        self.after_id = None
+
+        self.window = tk.Toplevel(parent)
+        self.window.title("Диагностика: зависания интерфейса")
+        self.window.geometry("1000x600")
+        self.window.configure(bg="#2C3E50")
+
+        self.create_widgets()
+        self.refresh()
+
+    def create_widgets(self):
+        """Создание элементов интерфейса"""
+
+        self.summary_label = tk.Label(
+            self.window, text="", anchor="w", font=("Arial", 14, "bold"),
+            bg="#37474F", fg="white", pady=10, padx=10
+        )
+        self.summary_label.pack(fill=tk.X)
+
+        table_frame = tk.Frame(self.window, bg="#2C3E50")
+        table_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+
+        scrollbar = tk.Scrollbar(table_frame, bg="#37474F")
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        columns = ("Время", "Длительность, мс", "Причина")
+        self.tree = ttk.Treeview(
+            table_frame, columns=columns, show="headings", height=10,
+            yscrollcommand=scrollbar.set
+        )
+        scrollbar.config(command=self.tree.yview)
+
+        for column, width in zip(columns, (200, 150, 620)):
+            self.tree.heading(column, text=column)
+            self.tree.column(column, width=width)
+
+        self.tree.pack(fill=tk.BOTH, expand=True)
+        self.tree.bind('<<TreeviewSelect>>', self.show_stack)
+
+        # Стек главного потока для выбранного зависания
+        self.stack_text = tk.Text(
+            self.window, height=12, font=("Courier", 11),
+            bg="#37474F", fg="white", wrap=tk.NONE
+        )
+        self.stack_text.pack(fill=tk.BOTH, padx=10, pady=(0, 10))
+
+    def refresh(self):
+        """Обновить список зависаний (и запланировать следующее обновление)"""
+        if not self.window.winfo_exists():
+            return
+        if self.after_id:
+            self.window.after_cancel(self.after_id)
+
+        if self.watchdog is None:
+            self.summary_label.config(text="Сторож главного цикла не запущен (watchdog_enabled: false)")
+            return
+
+        snapshot = self.watchdog.snapshot()
+        self.summary_label.config(
+            text=f"Зависаний: {snapshot['count']} | Всего: {snapshot['total_ms'] / 1000:.1f} с | "
+                 f"Порог: {self.watchdog.threshold * 1000:.0f} мс"
+        )
+
+        # Таблица перестраивается только при новых зависаниях (выбор строки сохраняется)
+        stalls = list(reversed(snapshot["stalls"]))
+        if len(stalls) != len(self.stalls) or (stalls and stalls[0] is not self.stalls[0]):
+            self.stalls = stalls
+            self.tree.delete(*self.tree.get_children())
+            for index, stall in enumerate(stalls):
+                self.tree.insert("", tk.END, iid=str(index), values=(
+                    stall.started.strftime("%d.%m.%Y %H:%M:%S"),
+                    f"{stall.duration_ms:.0f}",
+                    stall.cause
+                ))
+
+        self.after_id = self.window.after(self.REFRESH_MS, self.refresh)
+
+    def show_stack(self, event=None):
+        """Показать стек выбранного зависания"""
+        selection = self.tree.selection()
+        if not selection:
+            return
+
+        stall = self.stalls[int(selection[0])]
+        self.stack_text.delete(1.0, tk.END)
+        self.stack_text.insert(1.0, "\n".join(stall.stack) or "Стек не снят")
@@ -0,0 +1,202 @@
+"""
+История версий документов
+Индекс по коду документа: все версии из ДЕЙСТВУЮЩИХ и АРХИВА (включая
+упакованный), упорядоченные по (год, версия) как по числам. Строится один
+раз из сканирования и дальше обновляется при публикации без пересканирования
+папок; если папки изменились снаружи (по mtime), индекс строится заново.
+"""
+
+import bisect
+import os
+
+from workspace import resolve_workspace
+
+
+# Состояния версий
+ACTIVE = "active"
+ARCHIVE = "archive"
+
+
+def _number(value):
+    """Число из строки версии или года (нечисловые - в начало истории)"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return -1
+
+
+def version_key(doc):
+    """Ключ сортировки версий: (год, версия) как числа"""
+    return (_number(doc.year), _number(doc.version), doc.filename)
+
+
+class LineageEntry:
+    """Одна версия документа"""
+
+    __slots__ = ("document", "state", "key")
+
+    def __init__(self, document, state):
+        self.document = document
+        self.state = state          # ACTIVE или ARCHIVE
+        self.key = version_key(document)
+
+    def __lt__(self, other):
+        return self.key < other.key
+
+    def __repr__(self):
+        return f"LineageEntry({self.document.filename}, {self.state})"
+
+
+class LineageIndex:
+    """Индекс версий рабочей папки: {код: [LineageEntry] по возрастанию (год, версия)}"""
+
+    def __init__(self, workspace):
+        self.workspace = workspace
+        self._by_kod = {}
+        self._stamp = {}        # {папка: mtime_ns} - состояние папок на момент построения
+
+    def _watched(self):
+        ws = self.workspace
+        return (list(ws.active_categories.values()) + list(ws.archive_categories.values())
+                + list(ws.archive_packed.values()))
+
+    def _stat(self, path):
+        try:
+            return self.workspace.storage.stat(path).mtime_ns
+        except OSError:
+            return None
+
+    def is_fresh(self):
+        """Папки не менялись с построения (или последнего учтённого изменения)"""
+        return all(self._stat(path) == mtime for path, mtime in self._stamp.items())
+
+    def rebuild(self):
+        """Построить индекс из сканирования ДЕЙСТВУЮЩИХ и АРХИВА"""
+        from logic import scan_folder_with_categories
+
+        ws = self.workspace
+        self._stamp = {path: self._stat(path) for path in self._watched()}
+        self._by_kod = {}
+
+        for state, base, categories in ((ACTIVE, ws.active_dir, ws.active_categories),
+                                        (ARCHIVE, ws.archive_dir, ws.archive_categories)):
+            for doc in scan_folder_with_categories(base, categories, ws):
+                if doc.kod:
+                    self._by_kod.setdefault(doc.kod, []).append(LineageEntry(doc, state))
+
+        for entries in self._by_kod.values():
+            entries.sort()
+
+    # Изменения
+
+    def _add(self, doc, state):
+        if doc.kod:
+            bisect.insort(self._by_kod.setdefault(doc.kod, []), LineageEntry(doc, state))
+
+    def _remove(self, doc):
+        entries = self._by_kod.get(doc.kod, [])
+        for index, entry in enumerate(entries):
+            if entry.document.filename == doc.filename and entry.document.folder_path == doc.folder_path:
+                del entries[index]
+                break
+        if not entries:
+            self._by_kod.pop(doc.kod, None)
+
+    def record_publish(self, published, archived):
+        """
+        Учесть публикацию без пересканирования
+
+        Args:
+            published: Document - новый документ в ДЕЙСТВУЮЩИХ
+            archived: list[tuple] - (Document из ДЕЙСТВУЮЩИХ, Document в АРХИВЕ)
+        """
+        self._add(published, ACTIVE)
+        for old, new in archived:
+            self._remove(old)
+            self._add(new, ARCHIVE)
+
+        touched = {published.folder_path}
+        for old, new in archived:
+            touched.update((old.folder_path, new.folder_path))
+
+        # Затронутые папки изменила сама публикация - запоминаем их новое состояние.
+        # Если менялись и другие папки, индекс всё равно будет построен заново
+        untouched = [path for path in self._stamp if path not in touched]
+        if all(self._stat(path) == self._stamp[path] for path in untouched):
+            for path in touched & set(self._stamp):
+                self._stamp[path] = self._stat(path)
+
+    # Запросы
+
+    def history(self, kod):
+        """
+        Все версии документа
+
+        Returns:
+            list[LineageEntry]: От старой к новой
+        """
+        return list(self._by_kod.get(kod.strip(), []))
+
+    def latest(self, kod):
+        """Последняя версия (LineageEntry) или None"""
+        entries = self._by_kod.get(kod.strip())
+        return entries[-1] if entries else None
+
+    def next_version(self, kod):
+        """
+        Номер следующей версии (по наибольшему номеру среди всех версий)
+
+        Returns:
+            str: Например "03" (для нового кода - "01")
+        """
+        versions = [entry.document.version for entry in self._by_kod.get(kod.strip(), [])]
+        width = max([len(version) for version in versions] + [2])
+        return str(max([_number(version) for version in versions] + [0]) + 1).zfill(width)
+
+    def kods(self):
+        return sorted(self._by_kod)
+
+
+def get_lineage_index(workspace=None):
+    """
+    Индекс версий рабочей папки (строится при первом обращении и при изменении папок снаружи)
+
+    Args:
+        workspace: Рабочее пространство (по умолчанию текущее)
+
+    Returns:
+        LineageIndex: Индекс
+    """
+    workspace = resolve_workspace(workspace)
+
+    index = workspace.cache.get("lineage")
+    if index is None:
+        index = LineageIndex(workspace)
+        index.rebuild()
+        workspace.cache["lineage"] = index
+    elif not index.is_fresh():
+        index.rebuild()
+    return index
+
+
+def record_publish(workspace, published, archived):
+    """
+    Учесть публикацию в индексе версий, если он уже построен
+
+    Args:
+        workspace: Рабочее пространство
+        published: Document - новый документ в ДЕЙСТВУЮЩИХ
+        archived: list[tuple] - (Document из ДЕЙСТВУЮЩИХ, Document в АРХИВЕ)
+    """
+    index = workspace.cache.get("lineage")
+    if index is not None:
+        index.record_publish(published, archived)
+
+
+def describe(entry):
+    """Строка истории для показа: версия, год, место и имя файла"""
+    doc = entry.document
+    place = "ДЕЙСТВУЮЩИЕ" if entry.state == ACTIVE else "АРХИВ"
+    if doc.bundle:
+        place += f" 📦 {os.path.basename(doc.bundle)}"
+    return f"{doc.version or '?'}  {doc.year or '????'}  [{place}]  {doc.filename}"
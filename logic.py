@@ -5,14 +5,14 @@
 
 import os
 import re
-import shutil
 from datetime import datetime
-from config import (
-    PROJECTS_DIR, ACTIVE_DIR, ARCHIVE_DIR, REGISTRIES_DIR,
-    ACTIVE_CATEGORIES, ARCHIVE_CATEGORIES, REGISTRIES_CATEGORIES,
-    REGISTRY_ACTUAL_FILES, ALLOWED_EXTENSIONS, YEAR_MIN, YEAR_MAX,
-    REGISTRIES_KEEP_COUNT, CATEGORIES
-)
+import perf
+import archive_pack
+import cas
+import lineage
+from config import ALLOWED_EXTENSIONS, YEAR_MIN, YEAR_MAX, REGISTRIES_KEEP_COUNT, CATEGORIES
+from storage import LocalStorage
+from workspace import get_current_workspace, resolve_workspace
 
 
 class Document:
@@ -23,6 +23,7 @@ class Document:
         self.folder_path = folder_path
         self.full_path = os.path.join(folder_path, filename)
         self.category = category  # Категория документа
+        self.bundle = None        # Путь к ZIP, если документ упакован (archive_pack.py)
 
         # Парсим имя файла
         parsed = parse_filename(filename)
@@ -36,6 +37,21 @@ class Document:
     def __repr__(self):
         return f"Document({self.filename}, category={self.category})"
 
+    def to_dict(self):
+        """Данные документа в виде словаря (для JSON)"""
+        return {
+            "filename": self.filename,
+            "path": self.full_path,
+            "category": self.category,
+            "typ": self.typ,
+            "kod": self.kod,
+            "version": self.version,
+            "year": self.year,
+            "title": self.title,
+            "is_valid": self.is_valid,
+            "bundle": self.bundle,
+        }
+
 
 def parse_filename(filename):
     """
@@ -154,48 +170,84 @@ def build_filename(typ, kod, version, year, title):
     return f"{typ}.{kod}-{version}-{year} {title}"
 
 
-def scan_folder(folder_path, category=None):
+def scan_folder(folder_path, category=None, workspace=None):
     """
     Сканирование папки и парсинг всех документов
 
+    Результат кэшируется в рабочем пространстве и пересчитывается
+    только при изменении mtime папки.
+
     Args:
         folder_path: Путь к папке
         category: Категория документа (опционально)
+        workspace: Рабочее пространство (по умолчанию текущее)
 
     Returns:
         list[Document]: Список документов
     """
+    if workspace is None:
+        workspace = get_current_workspace()
+
+    storage = workspace.storage if workspace is not None else LocalStorage()
+
+    try:
+        mtime = storage.stat(folder_path).mtime_ns
+    except OSError:
+        return []
+
+    cache_key = (folder_path, category)
+    if workspace is not None:
+        cached = workspace.scan_cache.get(cache_key)
+        if cached and cached[0] == mtime:
+            return list(cached[1])
+
     documents = []
 
-    if not os.path.exists(folder_path):
-        return documents
+    with perf.span("scan.listdir", folder=os.path.basename(folder_path)) as span:
+        filenames = storage.listdir(folder_path)
+        span.set(files=len(filenames))
 
-    for filename in os.listdir(folder_path):
-        # Проверяем расширение
-        ext = os.path.splitext(filename)[1].lower()
-        if ext in ALLOWED_EXTENSIONS:
-            doc = Document(filename, folder_path, category)
-            documents.append(doc)
+    with perf.span("scan.parse", files=len(filenames)):
+        for filename in filenames:
+            # Проверяем расширение
+            ext = os.path.splitext(filename)[1].lower()
+            if ext in ALLOWED_EXTENSIONS:
+                doc = Document(filename, folder_path, category)
+                documents.append(doc)
 
-    return documents
+    if workspace is not None:
+        workspace.scan_cache[cache_key] = (mtime, documents)
 
+    return list(documents)
 
-def scan_folder_with_categories(base_folder, categories_dict):
+
+@perf.timed("scan.categories")
+def scan_folder_with_categories(base_folder, categories_dict, workspace=None):
     """
     Сканирование папки с категориями
 
     Args:
-        base_folder: Базовая папка (ACTIVE_DIR или ARCHIVE_DIR)
-        categories_dict: Словарь категорий (ACTIVE_CATEGORIES или ARCHIVE_CATEGORIES)
+        base_folder: Базовая папка (workspace.active_dir или workspace.archive_dir)
+        categories_dict: Словарь категорий (workspace.active_categories или workspace.archive_categories)
+        workspace: Рабочее пространство (по умолчанию текущее)
 
     Returns:
         list[Document]: Список документов из всех категорий
     """
+    if workspace is None:
+        workspace = get_current_workspace()
+
+    # В АРХИВЕ к файлам добавляются упакованные документы (по индексам пакетов)
+    with_packed = workspace is not None and base_folder == workspace.archive_dir
+
     all_documents = []
 
     for category, folder_path in categories_dict.items():
-        docs = scan_folder(folder_path, category)
+        docs = scan_folder(folder_path, category, workspace)
         all_documents.extend(docs)
+        if with_packed:
+            packed = archive_pack.packed_documents(category, workspace)
+            all_documents.extend(archive_pack.without_shadowed(docs, packed))
 
     return all_documents
 
@@ -263,7 +315,9 @@ def compare_documents(doc1, doc2):
     }
 
 
-def publish_document(source_doc, typ, kod, version, year, title, category, archive_list):
+@perf.timed("publish")
+def publish_document(source_doc, typ, kod, version, year, title, category, archive_list, workspace=None,
+                     create_registry=True):
     """
     Публикация документа:
     1. Собрать новое имя
@@ -277,33 +331,61 @@ def publish_document(source_doc, typ, kod, version, year, title, category, archi
         typ, kod, version, year, title: Новые данные документа
         category: Категория документа
         archive_list: Список документов для перемещения в архив
+        workspace: Рабочее пространство (по умолчанию текущее)
+        create_registry: Создать реестр категории (пакетная публикация
+                         создаёт реестры один раз в конце)
 
     Returns:
         bool: True если успешно
     """
     try:
+        workspace = resolve_workspace(workspace)
+        storage = workspace.storage
+
         # 1. Собираем новое имя
         new_filename = build_filename(typ, kod, version, year, title)
         ext = os.path.splitext(source_doc.filename)[1]
         new_filename_full = new_filename + ext
 
         # 2. Копируем в ДЕЙСТВУЮЩИЕ (в категорию)
-        category_folder = ACTIVE_CATEGORIES[category]
+        category_folder = workspace.active_categories[category]
         dest_path = os.path.join(category_folder, new_filename_full)
-        shutil.copy2(source_doc.full_path, dest_path)
+        with perf.span("publish.copy"):
+            storage.copy(source_doc.full_path, dest_path)
+        workspace.invalidate_folder(category_folder)
 
         # 3. Удаляем из ПРОЕКТОВ
-        os.remove(source_doc.full_path)
+        with perf.span("publish.remove"):
+            storage.remove(source_doc.full_path)
+        workspace.invalidate_folder(source_doc.folder_path)
 
         # 4. Перемещаем выбранные в АРХИВ (в соответствующие категории)
-        for doc_to_archive in archive_list:
-            if doc_to_archive.category:
-                archive_category_folder = ARCHIVE_CATEGORIES[doc_to_archive.category]
-                archive_path = os.path.join(archive_category_folder, doc_to_archive.filename)
-                shutil.move(doc_to_archive.full_path, archive_path)
+        archived = []
+        # При хранении АРХИВА по содержимому одинаковые файлы - ссылки на один объект
+        object_store = cas.get_object_store(workspace) if cas.is_enabled() else None
+        with perf.span("publish.archive", documents=len(archive_list)):
+            for doc_to_archive in archive_list:
+                if doc_to_archive.category:
+                    archive_category_folder = workspace.archive_categories[doc_to_archive.category]
+                    archive_path = os.path.join(archive_category_folder, doc_to_archive.filename)
+                    if object_store is not None:
+                        object_store.archive_move(doc_to_archive.full_path, archive_path)
+                    else:
+                        storage.move(doc_to_archive.full_path, archive_path)
+                    workspace.invalidate_folder(doc_to_archive.folder_path)
+                    workspace.invalidate_folder(archive_category_folder)
+                    archived.append((doc_to_archive,
+                                     Document(doc_to_archive.filename, archive_category_folder, doc_to_archive.category)))
+
+            if object_store is not None:
+                object_store.save()
+
+        # История версий обновляется без пересканирования
+        lineage.record_publish(workspace, Document(new_filename_full, category_folder, category), archived)
 
         # 5. Создаём новый реестр для категории
-        create_registry_for_category(category)
+        if create_registry:
+            create_registry_for_category(category, workspace)
 
         return True
 
@@ -312,19 +394,22 @@ def publish_document(source_doc, typ, kod, version, year, title, category, archi
         return False
 
 
-def get_last_registry_number(category):
+def get_last_registry_number(category, workspace=None):
     """
     Получить номер последнего реестра для категории
 
     Args:
         category: Категория документа
+        workspace: Рабочее пространство (по умолчанию текущее)
 
     Returns:
         int: Номер последнего реестра (0 если реестров нет)
     """
-    registry_folder = REGISTRIES_CATEGORIES[category]
+    workspace = resolve_workspace(workspace)
+    storage = workspace.storage
+    registry_folder = workspace.registries_categories[category]
 
-    if not os.path.exists(registry_folder):
+    if not storage.exists(registry_folder):
         return 0
 
     numbers = []
@@ -333,7 +418,7 @@ def get_last_registry_number(category):
     category_clean = category.replace(" ", "_")
     pattern = re.compile(rf'^РЕЕСТР_{category_clean}_(\d{{3}})_\d{{4}}-\d{{2}}-\d{{2}}\.txt$')
 
-    for filename in os.listdir(registry_folder):
+    for filename in storage.listdir(registry_folder):
         match = pattern.match(filename)
         if match:
             numbers.append(int(match.group(1)))
@@ -341,17 +426,21 @@ def get_last_registry_number(category):
     return max(numbers) if numbers else 0
 
 
-def create_registry_for_category(category):
+@perf.timed("registry.create")
+def create_registry_for_category(category, workspace=None):
     """
     Создать новый реестр для конкретной категории
 
     Args:
         category: Категория документа
+        workspace: Рабочее пространство (по умолчанию текущее)
 
     Формат имени: РЕЕСТР_КАТЕГОРИЯ_XXX_ГГГГ-ММ-ДД.txt
     """
+    workspace = resolve_workspace(workspace)
+
     # 1. Номер нового реестра
-    last_number = get_last_registry_number(category)
+    last_number = get_last_registry_number(category, workspace)
     new_number = last_number + 1
 
     # 2. Текущая дата
@@ -362,12 +451,12 @@ def create_registry_for_category(category):
     category_clean = category.replace(" ", "_")
     filename = f"РЕЕСТР_{category_clean}_{new_number:03d}_{today}.txt"
 
-    registry_folder = REGISTRIES_CATEGORIES[category]
+    registry_folder = workspace.registries_categories[category]
     filepath = os.path.join(registry_folder, filename)
 
     # 4. Сканируем действующие документы категории
-    category_folder = ACTIVE_CATEGORIES[category]
-    active_docs = scan_folder(category_folder, category)
+    category_folder = workspace.active_categories[category]
+    active_docs = scan_folder(category_folder, category, workspace)
 
     # Сортируем по имени файла
     active_docs.sort(key=lambda d: d.filename)
@@ -398,29 +487,31 @@ def create_registry_for_category(category):
     content.append("═" * 80)
 
     # 6. Записываем в файл
-    with open(filepath, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(content))
+    workspace.storage.write_text(filepath, '\n'.join(content))
 
     # 7. Копируем в АКТУАЛЬНЫЙ
-    actual_registry_path = REGISTRY_ACTUAL_FILES[category]
-    shutil.copy2(filepath, actual_registry_path)
+    actual_registry_path = workspace.registry_actual_files[category]
+    workspace.storage.copy(filepath, actual_registry_path)
 
     # 8. Очищаем старые реестры
-    cleanup_old_registries_for_category(category)
+    cleanup_old_registries_for_category(category, workspace)
 
     print(f"Создан реестр: {filename}")
 
 
-def cleanup_old_registries_for_category(category):
+def cleanup_old_registries_for_category(category, workspace=None):
     """
     Удалить старые реестры категории, оставить только последние REGISTRIES_KEEP_COUNT
 
     Args:
         category: Категория документа
+        workspace: Рабочее пространство (по умолчанию текущее)
     """
-    registry_folder = REGISTRIES_CATEGORIES[category]
+    workspace = resolve_workspace(workspace)
+    storage = workspace.storage
+    registry_folder = workspace.registries_categories[category]
 
-    if not os.path.exists(registry_folder):
+    if not storage.exists(registry_folder):
         return
 
     # Получаем все файлы реестров категории
@@ -428,7 +519,7 @@ def cleanup_old_registries_for_category(category):
     pattern = re.compile(rf'^РЕЕСТР_{category_clean}_(\d{{3}})_\d{{4}}-\d{{2}}-\d{{2}}\.txt$')
     registries = []
 
-    for filename in os.listdir(registry_folder):
+    for filename in storage.listdir(registry_folder):
         match = pattern.match(filename)
         if match:
             filepath = os.path.join(registry_folder, filename)
@@ -441,5 +532,5 @@ def cleanup_old_registries_for_category(category):
     if len(registries) > REGISTRIES_KEEP_COUNT:
         to_delete = registries[:-REGISTRIES_KEEP_COUNT]
         for number, filepath in to_delete:
-            os.remove(filepath)
+            storage.remove(filepath)
             print(f"Удалён старый реестр: {os.path.basename(filepath)}")
\ No newline at end of file
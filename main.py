@@ -3,10 +3,16 @@ ISO2 - Система управления документацией СМК
 Точка входа в приложение
 """
 
+import threading
 import tkinter as tk
 from tkinter import messagebox, filedialog
 import config
-from gui_main import MainWindow
+
+# gui_main (а через него logic, registry, employees) импортируется только
+# после первой отрисовки окна - см. build_main_window()
+
+# Модули, которые прогреваются в фоне после показа главного окна
+PREWARM_MODULES = ["openpyxl", "openpyxl.styles", "registry", "employees", "sheet_template"]
 
 
 def select_work_folder():
@@ -39,8 +45,9 @@ def select_work_folder():
         messagebox.showerror("Ошибка", "Не выбрана рабочая папка.\nПриложение будет закрыто.")
         return None
 
-    # Устанавливаем рабочую папку
-    if not config.set_work_dir(work_dir):
+    # Устанавливаем рабочую папку и создаём структуру
+    from workspace import switch_work_dir
+    if not switch_work_dir(work_dir):
         messagebox.showerror("Ошибка", "Не удалось сохранить настройки.\nПриложение будет закрыто.")
         return None
 
@@ -53,6 +60,64 @@ def select_work_folder():
     return work_dir
 
 
+def show_startup_window(root):
+    """Сразу показать окно-заглушку, пока загружается интерфейс"""
+    root.title("ISO2 - Управление документацией СМК")
+    root.geometry("1200x700")
+    root.configure(bg="#2C3E50")
+
+    placeholder = tk.Label(
+        root, text="Загрузка...", font=("Arial", 16, "bold"),
+        bg="#2C3E50", fg="white"
+    )
+    placeholder.pack(expand=True)
+
+    # Первая отрисовка
+    root.update_idletasks()
+    return placeholder
+
+
+def build_main_window(root, placeholder):
+    """Импортировать GUI и построить главное окно"""
+    from gui_main import MainWindow
+
+    placeholder.destroy()
+    app = MainWindow(root)
+
+    # После отрисовки главного окна прогреваем тяжёлые модули в фоне
+    root.after_idle(start_prewarm)
+
+    # Сторож главного цикла: зависания интерфейса со стеком - в журнал и окно "Диагностика".
+    # Запускается после построения окна - первая загрузка не считается зависанием
+    from ui_watchdog import start_watchdog
+    start_watchdog(root)
+    return app
+
+
+def prewarm_modules(modules=None):
+    """
+    Импортировать модули заранее, чтобы первое обращение к ним
+    (например, экспорт в Excel) не подвешивало интерфейс
+
+    Args:
+        modules: Список имён модулей (по умолчанию PREWARM_MODULES)
+    """
+    import importlib
+
+    for name in modules or PREWARM_MODULES:
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            print(f"Не удалось прогреть модуль {name}: {e}")
+
+
+def start_prewarm():
+    """Запустить фоновый прогрев модулей"""
+    thread = threading.Thread(target=prewarm_modules, name="iso2-prewarm", daemon=True)
+    thread.start()
+    return thread
+
+
 def main():
     """Запуск приложения"""
 
@@ -62,11 +127,18 @@ def main():
         if not select_work_folder():
             return
 
-    # Запускаем главное окно
+    # Сначала показываем окно, затем загружаем интерфейс
     root = tk.Tk()
-    app = MainWindow(root)
+    placeholder = show_startup_window(root)
+    root.after(0, lambda: build_main_window(root, placeholder))
+
     root.mainloop()
 
+    from ui_watchdog import get_watchdog
+    watchdog = get_watchdog()
+    if watchdog:
+        watchdog.stop()
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,283 @@
+"""
+Замеры времени горячих участков ISO2
+Интервалы (span) через контекстный менеджер или декоратор, журнал JSON Lines
+с ротацией и сводка для окна "Производительность"
+
+Выключено по умолчанию: включается настройкой "perf_enabled" в iso2_settings.json,
+переменной окружения ISO2_PERF=1 или из окна производительности (Ctrl+Shift+P).
+В выключенном состоянии span() возвращает общий пустой объект, а декоратор
+сразу вызывает функцию - накладные расходы близки к нулю.
+"""
+
+import atexit
+import functools
+import json
+import os
+import statistics
+import threading
+import time
+from collections import deque
+
+from config import settings, PERF_LOG_FILE, PERF_LOG_MAX_BYTES, PERF_LOG_BACKUPS, PERF_BUFFER_SIZE
+
+
+# Сколько записей копить перед записью в журнал
+FLUSH_EVERY = 50
+
+
+class _State:
+    enabled = False
+
+
+_state = _State()
+_lock = threading.Lock()
+_local = threading.local()          # Стек вложенных интервалов текущего потока
+
+_records = deque(maxlen=PERF_BUFFER_SIZE)   # Последние интервалы (для сводки)
+_pending = []                               # Ещё не записанные в журнал строки
+_log_path = PERF_LOG_FILE
+
+
+class _NoopSpan:
+    """Пустой интервал (замеры выключены)"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **fields):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class Span:
+    """Замеряемый интервал"""
+
+    __slots__ = ("name", "fields", "start", "parent")
+
+    def __init__(self, name, fields):
+        self.name = name
+        self.fields = fields
+        self.start = 0.0
+        self.parent = None
+
+    def set(self, **fields):
+        """Добавить сведения к интервалу (например, количество файлов)"""
+        self.fields.update(fields)
+
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        self.parent = stack[-1].name if stack else None
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration_ms = (time.perf_counter() - self.start) * 1000
+        _local.stack.pop()
+
+        record = {
+            "ts": round(time.time(), 3),
+            "name": self.name,
+            "ms": round(duration_ms, 3),
+            "thread": threading.current_thread().name,
+        }
+        if self.parent:
+            record["parent"] = self.parent
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        if self.fields:
+            record.update(self.fields)
+
+        _add_record(record)
+        return False
+
+
+def span(name, **fields):
+    """
+    Замерить участок кода
+
+        with perf.span("publish.copy", file=name):
+            ...
+
+    Args:
+        name: Имя интервала (через точку: подсистема.операция)
+        **fields: Дополнительные сведения для журнала
+
+    Returns:
+        Контекстный менеджер
+    """
+    if not _state.enabled:
+        return _NOOP
+    return Span(name, fields)
+
+
+def timed(name=None):
+    """
+    Декоратор: замерить каждый вызов функции
+
+    Args:
+        name: Имя интервала (по умолчанию - модуль.функция)
+    """
+    def decorator(func):
+        span_name = name or f"{func.__module__}.{func.__name__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _state.enabled:
+                return func(*args, **kwargs)
+            with Span(span_name, {}):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+# Журнал
+
+def _add_record(record):
+    with _lock:
+        _records.append(record)
+        _pending.append(record)
+        if len(_pending) >= FLUSH_EVERY:
+            _flush_locked()
+
+
+def rotate_log(path, max_bytes, backups):
+    """
+    Ротация журнала: файл.jsonl -> .1 -> .2 ... (старше backups удаляются)
+
+    Args:
+        path: Путь к журналу
+        max_bytes: Размер, после которого журнал уходит в .1
+        backups: Сколько старых файлов хранить
+    """
+    try:
+        if os.path.getsize(path) < max_bytes:
+            return
+    except OSError:
+        return
+
+    for index in range(backups - 1, 0, -1):
+        older = f"{path}.{index}"
+        if os.path.exists(older):
+            os.replace(older, f"{path}.{index + 1}")
+    if backups > 0:
+        os.replace(path, f"{path}.1")
+    else:
+        os.remove(path)
+
+
+def _flush_locked():
+    if not _pending or not _log_path:
+        _pending.clear()
+        return
+    try:
+        rotate_log(_log_path, PERF_LOG_MAX_BYTES, PERF_LOG_BACKUPS)
+        with open(_log_path, 'a', encoding='utf-8') as f:
+            for record in _pending:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    except OSError as e:
+        print(f"Ошибка записи журнала производительности: {e}")
+    _pending.clear()
+
+
+def flush():
+    """Записать накопленные интервалы в журнал"""
+    with _lock:
+        _flush_locked()
+
+
+atexit.register(flush)
+
+
+# Управление
+
+def enable(log_path=None):
+    """
+    Включить замеры
+
+    Args:
+        log_path: Путь к журналу (по умолчанию PERF_LOG_FILE; "" - без журнала)
+    """
+    global _log_path
+    if log_path is not None:
+        _log_path = log_path
+    _state.enabled = True
+
+
+def disable():
+    """Выключить замеры (накопленное записывается в журнал)"""
+    _state.enabled = False
+    flush()
+
+
+def is_enabled():
+    return _state.enabled
+
+
+def get_log_path():
+    return _log_path
+
+
+def clear():
+    """Очистить сводку (журнал на диске не трогается)"""
+    with _lock:
+        _records.clear()
+
+
+def recent(limit=100):
+    """
+    Последние интервалы
+
+    Returns:
+        list[dict]: Записи, новые в конце
+    """
+    with _lock:
+        return list(_records)[-limit:]
+
+
+def summary():
+    """
+    Сводка по именам интервалов из последних PERF_BUFFER_SIZE записей
+
+    Returns:
+        list[dict]: {name, count, total_ms, mean_ms, p50_ms, p95_ms, max_ms},
+                    по убыванию общего времени
+    """
+    with _lock:
+        records = list(_records)
+
+    by_name = {}
+    for record in records:
+        by_name.setdefault(record["name"], []).append(record["ms"])
+
+    result = []
+    for name, values in by_name.items():
+        values.sort()
+        result.append({
+            "name": name,
+            "count": len(values),
+            "total_ms": round(sum(values), 3),
+            "mean_ms": round(statistics.fmean(values), 3),
+            "p50_ms": round(values[len(values) // 2], 3),
+            "p95_ms": round(values[min(int(len(values) * 0.95), len(values) - 1)], 3),
+            "max_ms": round(values[-1], 3),
+        })
+
+    result.sort(key=lambda item: item["total_ms"], reverse=True)
+    return result
+
+
+# Включение по настройке или переменной окружения
+if os.environ.get("ISO2_PERF") == "1" or settings.get('perf_enabled'):
+    enable()
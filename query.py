@@ -0,0 +1,501 @@
+"""
+Запросы по полям документов: typ=ПП year>=2020 kod~К2
+Документы всех трёх папок (включая упакованный АРХИВ) собираются в индекс
+по колонкам: хэш-индексы для типа, кода, категории и папки, отсортированные
+индексы для года и версии. Условия запроса сначала выбирают строки по
+индексам (от самого узкого), остальные проверяются только на отобранных -
+ответ на 100 тысячах документов занимает миллисекунды. Индекс пересобирается,
+когда меняется любая из папок (по mtime).
+
+Язык запросов: условия через пробел, все должны выполняться.
+    поле=значение           равно (без учёта регистра); несколько значений через запятую
+    поле!=значение          не равно
+    поле~текст              содержит текст
+    поле>N, >=, <, <=       сравнение (только year и version)
+    слово или "фраза"       имя файла содержит текст
+Значения с пробелами берутся в кавычки: category="НД СМК".
+"""
+
+import bisect
+import re
+import threading
+import time
+from collections import OrderedDict
+from itertools import chain
+
+import perf
+from config import QUERY_RESULT_CACHE_SIZE, QUERY_REFRESH_SECONDS
+from workspace import resolve_workspace
+
+
+class QueryError(ValueError):
+    """Ошибка в тексте запроса"""
+
+
+# Поля запроса: {имя или синоним: поле}
+FIELD_ALIASES = {
+    "typ": "typ", "type": "typ", "тип": "typ",
+    "kod": "kod", "code": "kod", "код": "kod",
+    "version": "version", "ver": "version", "версия": "version",
+    "year": "year", "год": "year",
+    "title": "title", "название": "title",
+    "category": "category", "cat": "category", "категория": "category",
+    "folder": "folder", "папка": "folder",
+    "filename": "filename", "file": "filename", "имя": "filename",
+    "valid": "valid", "шаблон": "valid",
+}
+
+# Поля с хэш-индексом (значение без учёта регистра -> строки)
+HASH_FIELDS = ("typ", "kod", "category", "folder", "valid")
+
+# Поля с отсортированным индексом (числа)
+SORTED_FIELDS = ("year", "version")
+
+# Значения поля folder: {синоним: ключ папки}
+FOLDER_ALIASES = {
+    "projects": "projects", "проекты": "projects",
+    "active": "active", "действующие": "active",
+    "archive": "archive", "архив": "archive",
+}
+
+# Значения поля valid
+_TRUE = {"1", "true", "yes", "да"}
+_FALSE = {"0", "false", "no", "нет"}
+
+_TOKEN = re.compile(r'''
+    \s*(?:
+        (?P<field>[^\s=!<>~"]+)\s*(?P<op>>=|<=|!=|=|>|<|~)\s*(?P<value>"[^"]*"|[^\s"]+)
+      | "(?P<phrase>[^"]*)"
+      | (?P<word>[^\s"=!<>~]+)
+    )''', re.VERBOSE)
+
+
+class Term:
+    """Одно условие запроса"""
+
+    def __init__(self, field, op, values):
+        self.field = field      # Поле из FIELD_ALIASES (для слова без поля - "filename")
+        self.op = op            # "=", "!=", "~", ">", ">=", "<", "<="
+        self.values = values    # Значения (приведённые к регистру или числа)
+
+    def __repr__(self):
+        return f"Term({self.field}{self.op}{','.join(map(str, self.values))})"
+
+
+def _parse_value(field, op, raw):
+    """Значения условия: список без учёта регистра или чисел"""
+    if raw.startswith('"'):
+        raw = raw[1:-1]
+    values = [raw] if op in (">", ">=", "<", "<=") else raw.split(",")
+    values = [value.strip().casefold() for value in values if value.strip()]
+    if not values:
+        raise QueryError(f"Не задано значение для {field}")
+
+    if field in SORTED_FIELDS:
+        if op == "~":
+            raise QueryError(f"Для {field} поиск по части (~) не поддерживается, используйте = < >")
+        if not all(value.isdigit() for value in values):
+            raise QueryError(f"{field}: ожидается число, получено {raw}")
+        return [int(value) for value in values]
+
+    if op not in ("=", "!=", "~"):
+        raise QueryError(f"Сравнение {op} поддерживается только для year и version")
+
+    if field == "folder" and op != "~":
+        unknown = [value for value in values if value not in FOLDER_ALIASES]
+        if unknown:
+            raise QueryError(f"Неизвестная папка: {unknown[0]}. Допустимые: projects, active, archive")
+        return [FOLDER_ALIASES[value] for value in values]
+
+    if field == "valid":
+        if op == "~" or not all(value in _TRUE or value in _FALSE for value in values):
+            raise QueryError("valid: ожидается да/нет")
+        return [value in _TRUE for value in values]
+
+    return values
+
+
+def parse_query(text):
+    """
+    Разобрать текст запроса
+
+    Args:
+        text: Запрос, например 'typ=ПП year>=2020 kod~К2'
+
+    Returns:
+        list[Term]: Условия (пустой запрос - пустой список)
+
+    Raises:
+        QueryError: Ошибка в запросе
+    """
+    terms = []
+    position = 0
+    text = text.strip()
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        if not match:
+            rest = text[position:].strip()
+            if rest.startswith('"'):
+                raise QueryError("Не закрыта кавычка")
+            raise QueryError(f"Не удалось разобрать: {rest}")
+        position = match.end()
+
+        if match.group("field"):
+            name = match.group("field").casefold()
+            field = FIELD_ALIASES.get(name)
+            if field is None:
+                raise QueryError(f"Неизвестное поле: {name}. Допустимые: {', '.join(sorted(set(FIELD_ALIASES.values())))}")
+            op = match.group("op")
+            terms.append(Term(field, op, _parse_value(field, op, match.group("value"))))
+        else:
+            word = match.group("word") if match.group("word") is not None else match.group("phrase")
+            if word.strip():
+                terms.append(Term("filename", "~", [word.strip().casefold()]))
+
+        # Оператор без значения: "typ=" и т.п.
+        if position < len(text) and text[position] in "=!<>~":
+            raise QueryError(f"Не задано значение: {text[match.start():].strip()}")
+    return terms
+
+
+class _Substrings:
+    """
+    Поиск части текста в списке строк
+
+    Строки склеиваются в одну, и str.find перебирает только совпадения;
+    если совпадений много, быстрее проверить каждую строку подряд.
+    """
+
+    def __init__(self, strings):
+        self.strings = list(strings)
+        self.blob = "\n".join(strings)
+        self.starts = []
+        offset = 0
+        for value in strings:
+            self.starts.append(offset)
+            offset += len(value) + 1
+
+    def find(self, needle):
+        """Номера строк, содержащих needle"""
+        blob, starts = self.blob, self.starts
+        found = set()
+        position = blob.find(needle)
+        while position != -1:
+            index = bisect.bisect_right(starts, position) - 1
+            found.add(index)
+            # Совпадений по всему тексту будет много - проверяем строки подряд
+            if len(found) == 256 and 256 * len(blob) // (position + 1) > len(starts) // 16:
+                return {index for index, value in enumerate(self.strings) if needle in value}
+            # Дальше ищем со следующей строки
+            if index + 1 == len(starts):
+                break
+            position = blob.find(needle, starts[index + 1])
+        return found
+
+
+class QueryIndex:
+    """
+    Документы рабочей папки в виде колонок с индексами
+
+    Строки упорядочены по папке (ПРОЕКТЫ, ДЕЙСТВУЮЩИЕ, АРХИВ), категории
+    и имени файла; результат запроса возвращается в этом же порядке.
+    """
+
+    def __init__(self, scanned):
+        """
+        Args:
+            scanned: {ключ папки: [Document]} (validation.scan_folders)
+        """
+        from validation import FOLDERS
+
+        rows = []
+        for order, (folder, _) in enumerate(FOLDERS):
+            rows.extend(((order, doc.category or "", doc.filename), folder, doc)
+                        for doc in scanned.get(folder, []))
+        rows.sort(key=lambda row: row[0])
+
+        self.documents = [doc for _, _, doc in rows]
+        self.folders = [folder for _, folder, _ in rows]
+
+        # Колонки для перебора (без учёта регистра)
+        self.text = {
+            "title": [(doc.title or "").casefold() for doc in self.documents],
+            "filename": [doc.filename.casefold() for doc in self.documents],
+        }
+
+        # Колонки индексируемых полей и хэш-индексы: {поле: {значение: [строки]}}
+        self.columns = {
+            "typ": [(doc.typ or "").casefold() for doc in self.documents],
+            "kod": [(doc.kod or "").casefold() for doc in self.documents],
+            "category": [(doc.category or "").casefold() for doc in self.documents],
+            "folder": self.folders,
+            "valid": [bool(doc.is_valid) for doc in self.documents],
+        }
+        self.hashed = {}
+        for field, column in self.columns.items():
+            index = {}
+            for row, value in enumerate(column):
+                index.setdefault(value, []).append(row)
+            self.hashed[field] = index
+
+        # Числовые колонки (None - не число) и отсортированные индексы:
+        # {поле: (значения по возрастанию, строки)}
+        self.numbers = {}
+        self.missing = {}       # {поле: строки без числового значения}
+        self.sorted = {}
+        for field in SORTED_FIELDS:
+            column = []
+            for doc in self.documents:
+                value = getattr(doc, field)
+                column.append(int(value) if value and value.isdigit() else None)
+            pairs = sorted((value, row) for row, value in enumerate(column) if value is not None)
+            self.numbers[field] = column
+            self.missing[field] = [row for row, value in enumerate(column) if value is None]
+            self.sorted[field] = ([value for value, _ in pairs], [row for _, row in pairs])
+
+        self._lock = threading.Lock()   # Запросы сервиса идут из нескольких потоков
+        self._substrings = {}           # {поле или (поле, "keys"): _Substrings} - строятся при первом "~"
+        self._results = OrderedDict()   # {текст запроса: [строки]}
+
+    def __len__(self):
+        return len(self.documents)
+
+    def _substrings_for(self, key, strings):
+        with self._lock:
+            substrings = self._substrings.get(key)
+            if substrings is None:
+                substrings = self._substrings[key] = _Substrings(strings)
+            return substrings
+
+    # Каждое условие превращается в (оценка числа строк, множество строк, проверка строки):
+    # самое узкое условие выбирает строки по индексу, остальные либо тоже берутся
+    # из индекса и пересекаются, либо - если отобрано немного - проверяются построчно
+
+    def _plan_hash(self, term):
+        index = self.hashed[term.field]
+        if term.op == "~":
+            # Часть текста ищется среди различных значений, а не по всем строкам
+            substrings = self._substrings_for((term.field, "keys"), index)
+            keys = substrings.strings
+            found = set()
+            for value in term.values:
+                found.update(substrings.find(value))
+            keys = [keys[i] for i in found]
+        elif term.op == "!=":
+            keys = [key for key in index if key not in term.values]
+        else:
+            keys = [key for key in dict.fromkeys(term.values) if key in index]
+
+        key_set = set(keys)
+        column = self.columns[term.field]
+        return (
+            sum(len(index[key]) for key in keys),
+            lambda: set(chain.from_iterable(index[key] for key in keys)),
+            lambda row: column[row] in key_set,
+        )
+
+    def _plan_sorted(self, term):
+        values, rows = self.sorted[term.field]
+        column = self.numbers[term.field]
+
+        if term.op in ("=", "!="):
+            # Повторы ("2010,2010", "1,01") дали бы пересекающиеся диапазоны
+            value_set = set(term.values)
+            ranges = [(bisect.bisect_left(values, value), bisect.bisect_right(values, value))
+                      for value in sorted(value_set)]
+            size = sum(hi - lo for lo, hi in ranges)
+            equal = lambda: set(chain.from_iterable(rows[lo:hi] for lo, hi in ranges))
+            if term.op == "=":
+                return size, equal, lambda row: column[row] in value_set
+            # Остальные диапазоны индекса и документы без числового значения
+            bounds = [0] + sorted(chain.from_iterable(ranges)) + [len(values)]
+            missing = self.missing[term.field]
+            return (
+                len(column) - size,
+                lambda: set(chain(missing, *(rows[lo:hi] for lo, hi in zip(bounds[::2], bounds[1::2])))),
+                lambda row: column[row] not in value_set,
+            )
+
+        value = term.values[0]
+        if term.op == ">":
+            lo, hi = bisect.bisect_right(values, value), len(values)
+        elif term.op == ">=":
+            lo, hi = bisect.bisect_left(values, value), len(values)
+        elif term.op == "<":
+            lo, hi = 0, bisect.bisect_left(values, value)
+        else:
+            lo, hi = 0, bisect.bisect_right(values, value)
+        if lo >= hi:
+            return 0, set, lambda row: False
+
+        low, high = values[lo], values[hi - 1]
+        return (
+            hi - lo,
+            lambda: set(rows[lo:hi]),
+            lambda row: column[row] is not None and low <= column[row] <= high,
+        )
+
+    def _plan_text(self, term):
+        column = self.text[term.field]
+        values = term.values
+
+        if term.op == "~":
+            def matching():
+                substrings = self._substrings_for(term.field, column)
+                found = set()
+                for value in values:
+                    found.update(substrings.find(value))
+                return found
+            match = lambda row: any(value in column[row] for value in values)
+        else:
+            matching = lambda: {row for row, value in enumerate(column) if value in values}
+            match = lambda row: column[row] in values
+
+        # Размер заранее неизвестен - проверяется последним
+        if term.op == "!=":
+            return len(column), lambda: set(range(len(column))).difference(matching()), lambda row: not match(row)
+        return len(column), matching, match
+
+    def rows(self, terms):
+        """
+        Номера строк, подходящих под все условия (по возрастанию)
+
+        Args:
+            terms: list[Term] из parse_query
+        """
+        if not terms:
+            return range(len(self.documents))
+
+        plans = []
+        for term in terms:
+            if term.field in HASH_FIELDS:
+                plans.append(self._plan_hash(term))
+            elif term.field in SORTED_FIELDS:
+                plans.append(self._plan_sorted(term))
+            else:
+                plans.append(self._plan_text(term))
+        plans.sort(key=lambda plan: plan[0])
+
+        candidates = plans[0][1]()
+        for size, rows, match in plans[1:]:
+            if not candidates:
+                break
+            if len(candidates) * 2 < size:
+                candidates = set(filter(match, candidates))
+            else:
+                candidates.intersection_update(rows())
+        return sorted(candidates)
+
+    @perf.timed("query.run")
+    def query(self, text):
+        """
+        Выполнить запрос
+
+        Args:
+            text: Текст запроса
+
+        Returns:
+            QueryResult: Найденные документы в порядке индекса
+
+        Raises:
+            QueryError: Ошибка в запросе
+        """
+        key = " ".join(text.split())
+        with self._lock:
+            rows = self._results.get(key)
+            if rows is not None:
+                self._results.move_to_end(key)
+                return QueryResult(self, rows)
+
+        rows = self.rows(parse_query(key))
+        with self._lock:
+            self._results[key] = rows
+            while len(self._results) > QUERY_RESULT_CACHE_SIZE:
+                self._results.popitem(last=False)
+        return QueryResult(self, rows)
+
+
+class QueryResult:
+    """
+    Результат запроса: строки индекса
+
+    Пары (ключ папки, Document) создаются при обходе, а не заранее -
+    ответ на запрос, под который подходят все 100 тысяч документов,
+    не создаёт 100 тысяч объектов.
+    """
+
+    def __init__(self, index, rows):
+        self.index = index
+        self.rows = rows
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        folders, documents = self.index.folders, self.index.documents
+        for row in self.rows:
+            yield folders[row], documents[row]
+
+    def __getitem__(self, position):
+        row = self.rows[position]
+        return self.index.folders[row], self.index.documents[row]
+
+    @property
+    def documents(self):
+        """list[Document] без ключей папок"""
+        documents = self.index.documents
+        return [documents[row] for row in self.rows]
+
+
+@perf.timed("query.index")
+def get_query_index(workspace=None, fresh=False):
+    """
+    Индекс документов рабочей папки (пересобирается после изменения папок)
+
+    Папки проверяются не чаще раза в QUERY_REFRESH_SECONDS, чтобы запрос
+    при каждом нажатии клавиши не опрашивал сетевой диск.
+
+    Args:
+        workspace: Рабочее пространство (по умолчанию текущее)
+        fresh: Проверить папки сейчас
+
+    Returns:
+        QueryIndex: Индекс
+    """
+    from validation import folder_tasks, folders_stamp, scan_folders
+
+    workspace = resolve_workspace(workspace)
+    now = time.monotonic()
+
+    # {"query_index": (отметка папок, время проверки, индекс)}
+    cached = workspace.cache.get("query_index")
+    if cached and not fresh and now - cached[1] < QUERY_REFRESH_SECONDS:
+        return cached[2]
+
+    tasks = folder_tasks(workspace)
+    stamp = folders_stamp(workspace, tasks)
+    if cached and cached[0] == stamp:
+        workspace.cache["query_index"] = (stamp, now, cached[2])
+        return cached[2]
+
+    index = QueryIndex(scan_folders(workspace, tasks))
+    workspace.cache["query_index"] = (stamp, now, index)
+    return index
+
+
+def query_documents(text, workspace=None, fresh=False):
+    """
+    Документы рабочей папки, подходящие под запрос
+
+    Args:
+        text: Запрос, например 'typ=ПП year>=2020 kod~К2'
+        workspace: Рабочее пространство (по умолчанию текущее)
+        fresh: Проверить папки на изменения сейчас
+
+    Returns:
+        QueryResult: Пары (ключ папки, Document) при обходе
+
+    Raises:
+        QueryError: Ошибка в запросе
+    """
+    return get_query_index(workspace, fresh).query(text)
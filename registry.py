@@ -3,65 +3,67 @@
 Просмотр, экспорт в CSV и Excel
 """
 
-import os
 import csv
 from datetime import datetime
-from config import (
-    CATEGORIES, REGISTRY_ACTUAL_FILES, ACTIVE_CATEGORIES,
-    REGISTRIES_CATEGORIES
-)
+import perf
+from config import CATEGORIES
 from logic import scan_folder, build_filename, create_registry_for_category
+from workspace import resolve_workspace
 
 
-def read_registry_content(category):
+def read_registry_content(category, workspace=None):
     """
     Прочитать содержимое актуального реестра для категории
 
     Args:
         category: Категория документа
+        workspace: Рабочее пространство (по умолчанию текущее)
 
     Returns:
         str: Содержимое реестра или сообщение об отсутствии
     """
-    if category not in REGISTRY_ACTUAL_FILES:
+    workspace = resolve_workspace(workspace)
+
+    if category not in workspace.registry_actual_files:
         return "Категория не найдена"
 
-    registry_path = REGISTRY_ACTUAL_FILES[category]
+    registry_path = workspace.registry_actual_files[category]
 
-    if not os.path.exists(registry_path):
+    if not workspace.storage.exists(registry_path):
         return f"Реестр для категории '{category}' ещё не создан.\nОпубликуйте первый документ в эту категорию."
 
     try:
-        with open(registry_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        return content
+        return workspace.storage.read_text(registry_path)
     except Exception as e:
         return f"Ошибка чтения реестра: {e}"
 
 
-def get_registry_documents(category):
+@perf.timed("registry.read")
+def get_registry_documents(category, workspace=None):
     """
     Получить список документов из реестра в виде структурированных данных
 
     Args:
         category: Категория документа
+        workspace: Рабочее пространство (по умолчанию текущее)
 
     Returns:
         list[dict]: Список документов [{номер, название}, ...]
     """
-    if category not in REGISTRY_ACTUAL_FILES:
+    workspace = resolve_workspace(workspace)
+
+    if category not in workspace.registry_actual_files:
         return []
 
-    registry_path = REGISTRY_ACTUAL_FILES[category]
+    registry_path = workspace.registry_actual_files[category]
 
-    if not os.path.exists(registry_path):
+    if not workspace.storage.exists(registry_path):
         return []
 
     documents = []
 
     try:
-        with open(registry_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
+        lines = workspace.storage.read_text(registry_path).splitlines()
 
         # Ищем строки с документами (формат: "1. Название документа")
         for line in lines:
@@ -86,19 +88,21 @@ def get_registry_documents(category):
         return []
 
 
-def export_registry_to_csv(category, output_path):
+@perf.timed("export.registry.csv")
+def export_registry_to_csv(category, output_path, workspace=None):
     """
     Экспорт реестра в CSV
 
     Args:
         category: Категория документа
         output_path: Путь для сохранения CSV файла
+        workspace: Рабочее пространство (по умолчанию текущее)
 
     Returns:
         bool: True если успешно
     """
     try:
-        documents = get_registry_documents(category)
+        documents = get_registry_documents(category, workspace)
 
         if not documents:
             return False
@@ -127,13 +131,15 @@ def export_registry_to_csv(category, output_path):
         return False
 
 
-def export_registry_to_excel(category, output_path):
+@perf.timed("export.registry.excel")
+def export_registry_to_excel(category, output_path, workspace=None):
     """
     Экспорт реестра в Excel с форматированием
 
     Args:
         category: Категория документа
         output_path: Путь для сохранения Excel файла
+        workspace: Рабочее пространство (по умолчанию текущее)
 
     Returns:
         bool: True если успешно
@@ -142,7 +148,7 @@ def export_registry_to_excel(category, output_path):
         from openpyxl import Workbook
         from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
 
-        documents = get_registry_documents(category)
+        documents = get_registry_documents(category, workspace)
 
         if not documents:
             return False
@@ -235,12 +241,14 @@ def export_registry_to_excel(category, output_path):
         return False
 
 
-def export_all_registries_to_excel(output_path):
+@perf.timed("export.all_registries.excel")
+def export_all_registries_to_excel(output_path, workspace=None):
     """
     Экспорт всех реестров в один Excel файл (каждая категория = отдельный лист)
 
     Args:
         output_path: Путь для сохранения Excel файла
+        workspace: Рабочее пространство (по умолчанию текущее)
 
     Returns:
         bool: True если успешно
@@ -270,7 +278,7 @@ def export_all_registries_to_excel(output_path):
 
         # Для каждой категории создаём лист
         for category in CATEGORIES:
-            documents = get_registry_documents(category)
+            documents = get_registry_documents(category, workspace)
 
             if not documents:
                 continue  # Пропускаем пустые реестры
@@ -348,19 +356,20 @@ def export_all_registries_to_excel(output_path):
         return False
 
 
-def manual_update_registry(category):
+def manual_update_registry(category, workspace=None):
     """
     Принудительное обновление реестра для категории
     (без публикации документа)
 
     Args:
         category: Категория документа
+        workspace: Рабочее пространство (по умолчанию текущее)
 
     Returns:
         bool: True если успешно
     """
     try:
-        create_registry_for_category(category)
+        create_registry_for_category(category, workspace)
         return True
     except Exception as e:
         print(f"Ошибка обновления реестра: {e}")
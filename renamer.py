@@ -0,0 +1,349 @@
+"""
+Массовое приведение имён файлов к шаблону ТИП.КОД-ВЕРСИЯ-ГОД Название
+Для каждого файла ДЕЙСТВУЮЩИХ имя исправляется правилами (RENAME_RULES и
+"rename_rules" из настроек), разбирается parse_filename и собирается заново
+build_filename. Сначала строится план (показывается как diff), затем
+переименования выполняются параллельно; каждое выполненное записывается
+в журнал, по которому переименования можно откатить. Реестры затронутых
+категорий пересоздаются один раз в конце.
+"""
+
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import perf
+from config import load_settings, DOCUMENT_TYPES, RENAME_RULES, RENAME_WORKERS
+from workspace import resolve_workspace
+
+
+# Состояния строк плана
+READY = "ready"             # Можно переименовать
+EXISTS = "exists"           # Файл с новым именем уже есть
+DUPLICATE = "duplicate"     # Несколько файлов получают одно имя
+
+# Окончание, которое получает журнал после отката (list_rename_logs его не показывает)
+ROLLED_BACK_SUFFIX = ".rolledback"
+
+# Латинские буквы, похожие на кириллические (в ТИПЕ документа)
+_LOOKALIKES = str.maketrans("ABCEHKMOPTXaceopx", "АВСЕНКМОРТХасеорх")
+
+
+class RenameItem:
+    """Одно предлагаемое переименование"""
+
+    def __init__(self, category, folder_path, old_name, new_name, status=READY):
+        self.category = category
+        self.folder_path = folder_path
+        self.old_name = old_name
+        self.new_name = new_name
+        self.status = status
+
+    @property
+    def old_path(self):
+        return os.path.join(self.folder_path, self.old_name)
+
+    @property
+    def new_path(self):
+        return os.path.join(self.folder_path, self.new_name)
+
+    def __repr__(self):
+        return f"RenameItem({self.old_name} -> {self.new_name}, {self.status})"
+
+    def to_dict(self):
+        return {"category": self.category, "old": self.old_name, "new": self.new_name, "status": self.status}
+
+
+def get_rename_rules():
+    """
+    Правила исправления имён: RENAME_RULES и затем "rename_rules" из настроек
+
+    Returns:
+        list[tuple]: (скомпилированный шаблон, замена)
+    """
+    rules = []
+    for pattern, replacement in list(RENAME_RULES) + list(load_settings().get('rename_rules', [])):
+        try:
+            rules.append((re.compile(pattern), replacement))
+        except re.error as e:
+            print(f"Правило переименования пропущено ({pattern}): {e}")
+    return rules
+
+
+def normalize_filename(filename, rules=None):
+    """
+    Имя файла, приведённое к шаблону
+
+    Args:
+        filename: Имя файла
+        rules: Правила (по умолчанию get_rename_rules())
+
+    Returns:
+        str: Новое имя или None, если имя не удаётся привести к шаблону
+    """
+    from logic import parse_filename, build_filename
+
+    if rules is None:
+        rules = get_rename_rules()
+
+    stem, ext = os.path.splitext(filename)
+    stem = stem.strip()
+    for pattern, replacement in rules:
+        stem = pattern.sub(replacement, stem)
+
+    parsed = parse_filename(stem + ext)
+    if not parsed["is_valid"]:
+        return None
+
+    typ = parsed["typ"].upper()
+    if typ not in DOCUMENT_TYPES and typ.translate(_LOOKALIKES) in DOCUMENT_TYPES:
+        typ = typ.translate(_LOOKALIKES)
+
+    version = parsed["version"]
+    if version.isdigit():
+        version = version.zfill(2)
+
+    title = " ".join(parsed["title"].split())
+    return build_filename(typ, parsed["kod"], version, parsed["year"], title) + ext.lower()
+
+
+@perf.timed("rename.plan")
+def plan_renames(categories=None, workspace=None, rules=None):
+    """
+    План переименований в ДЕЙСТВУЮЩИХ (ничего не меняет)
+
+    Args:
+        categories: Категории (по умолчанию все)
+        workspace: Рабочее пространство (по умолчанию текущее)
+        rules: Правила (по умолчанию get_rename_rules())
+
+    Returns:
+        list[RenameItem]: Только файлы, имя которых меняется
+    """
+    from logic import scan_folder
+
+    workspace = resolve_workspace(workspace)
+    if rules is None:
+        rules = get_rename_rules()
+
+    plan = []
+    for category in categories or list(workspace.active_categories):
+        folder_path = workspace.active_categories[category]
+        documents = scan_folder(folder_path, category, workspace)
+        names = {doc.filename for doc in documents}
+
+        items = []
+        for doc in sorted(documents, key=lambda d: d.filename):
+            new_name = normalize_filename(doc.filename, rules)
+            if new_name and new_name != doc.filename:
+                items.append(RenameItem(category, folder_path, doc.filename, new_name))
+
+        # Конфликты: новое имя занято другим файлом или достаётся нескольким
+        targets = {}
+        for item in items:
+            targets.setdefault(item.new_name.casefold(), []).append(item)
+        occupied = {name.casefold(): name for name in names}
+
+        for item in items:
+            owner = occupied.get(item.new_name.casefold())
+            if len(targets[item.new_name.casefold()]) > 1:
+                item.status = DUPLICATE
+            elif owner is not None and owner != item.old_name:
+                # Смена только регистра - тот же файл, не конфликт
+                item.status = EXISTS
+
+        plan.extend(items)
+    return plan
+
+
+def format_diff(plan):
+    """
+    План в виде diff для просмотра
+
+    Returns:
+        str: Строки "- старое" / "+ новое" по категориям, конфликты помечены "!"
+    """
+    lines = []
+    category = None
+    for item in plan:
+        if item.category != category:
+            category = item.category
+            lines.append(f"=== {category}")
+        lines.append(f"- {item.old_name}")
+        if item.status == READY:
+            lines.append(f"+ {item.new_name}")
+        elif item.status == EXISTS:
+            lines.append(f"! {item.new_name}  (файл уже есть - пропущен)")
+        else:
+            lines.append(f"! {item.new_name}  (то же имя у другого файла - пропущен)")
+    return "\n".join(lines)
+
+
+class _RenameLog:
+    """Журнал выполненных переименований (JSON Lines, запись после каждого)"""
+
+    def __init__(self, storage, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = storage.open(path, 'wb')
+
+    def write(self, record):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line.encode("utf-8"))
+            self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def _rebuild_registries(workspace, categories):
+    """Сбросить кэш папок и пересоздать реестры категорий (один раз на категорию)"""
+    from logic import create_registry_for_category
+
+    for category in sorted(categories):
+        workspace.invalidate_folder(workspace.active_categories[category])
+        create_registry_for_category(category, workspace)
+
+
+@perf.timed("rename.apply")
+def apply_renames(plan, workspace=None, max_workers=RENAME_WORKERS, create_registry=True):
+    """
+    Выполнить переименования плана (строки с конфликтами пропускаются)
+
+    Каждое переименование - атомарная замена имени; занятое к этому
+    моменту имя не перезаписывается. Выполненные записываются в журнал
+    в workspace.rename_logs_dir.
+
+    Args:
+        plan: list[RenameItem] из plan_renames
+        workspace: Рабочее пространство (по умолчанию текущее)
+        max_workers: Количество потоков
+        create_registry: Пересоздать реестры затронутых категорий
+
+    Returns:
+        dict: {renamed, failed: [{old, error}], log, registries}
+    """
+    workspace = resolve_workspace(workspace)
+    storage = workspace.storage
+    items = [item for item in plan if item.status == READY]
+
+    result = {"renamed": 0, "failed": [], "log": None, "registries": []}
+    if not items:
+        return result
+
+    storage.makedirs(workspace.rename_logs_dir)
+    log = _RenameLog(storage, os.path.join(
+        workspace.rename_logs_dir, datetime.now().strftime("%Y-%m-%d_%H-%M-%S-%f") + ".jsonl"
+    ))
+    result["log"] = log.path
+
+    def rename_one(item):
+        try:
+            if item.new_name.casefold() != item.old_name.casefold() and storage.exists(item.new_path):
+                raise OSError(f"Файл уже есть: {item.new_name}")
+            storage.replace(item.old_path, item.new_path)
+        except OSError as e:
+            return item, str(e)
+        log.write({"old": item.old_path, "new": item.new_path, "category": item.category})
+        return item, None
+
+    categories = set()
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for item, error in executor.map(rename_one, items):
+                if error:
+                    result["failed"].append({"old": item.old_name, "error": error})
+                else:
+                    result["renamed"] += 1
+                    categories.add(item.category)
+    finally:
+        log.close()
+
+    if create_registry:
+        _rebuild_registries(workspace, categories)
+        result["registries"] = sorted(categories)
+    else:
+        for category in categories:
+            workspace.invalidate_folder(workspace.active_categories[category])
+
+    print(f"Переименовано файлов: {result['renamed']}, ошибок: {len(result['failed'])}")
+    return result
+
+
+def list_rename_logs(workspace=None):
+    """Журналы переименований, от новых к старым (полные пути)"""
+    workspace = resolve_workspace(workspace)
+    try:
+        names = workspace.storage.listdir(workspace.rename_logs_dir)
+    except OSError:
+        return []
+    return [os.path.join(workspace.rename_logs_dir, name)
+            for name in sorted(names, reverse=True) if name.endswith(".jsonl")]
+
+
+@perf.timed("rename.rollback")
+def rollback_renames(log_path, workspace=None, create_registry=True):
+    """
+    Откатить переименования по журналу (в обратном порядке)
+
+    Файл возвращается к старому имени, только если новое имя ещё на месте,
+    а старое свободно. После отката журнал помечается окончанием
+    ROLLED_BACK_SUFFIX: следующий откат без указания журнала берёт более
+    ранний. Помеченный журнал можно откатить снова, указав его явно.
+
+    Args:
+        log_path: Журнал из apply_renames
+        workspace: Рабочее пространство (по умолчанию текущее)
+        create_registry: Пересоздать реестры затронутых категорий
+
+    Returns:
+        dict: {restored, skipped: [имя], registries, log: путь к журналу}
+    """
+    workspace = resolve_workspace(workspace)
+    storage = workspace.storage
+
+    records = []
+    for line in storage.read_text(log_path).splitlines():
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            # Строка, оборванная сбоем при записи
+            continue
+
+    result = {"restored": 0, "skipped": [], "registries": [], "log": log_path}
+    categories = set()
+    for record in reversed(records):
+        old_path, new_path = record["old"], record["new"]
+        case_only = old_path.casefold() == new_path.casefold()
+        if not storage.exists(new_path) or (not case_only and storage.exists(old_path)):
+            result["skipped"].append(os.path.basename(new_path))
+            continue
+        try:
+            storage.replace(new_path, old_path)
+        except OSError as e:
+            print(f"Не удалось вернуть {os.path.basename(old_path)}: {e}")
+            result["skipped"].append(os.path.basename(new_path))
+            continue
+        result["restored"] += 1
+        categories.add(record["category"])
+
+    if not log_path.endswith(ROLLED_BACK_SUFFIX):
+        marked = log_path + ROLLED_BACK_SUFFIX
+        try:
+            storage.replace(log_path, marked)
+            result["log"] = marked
+        except OSError as e:
+            print(f"Не удалось пометить журнал {os.path.basename(log_path)} как откаченный: {e}")
+
+    if create_registry:
+        _rebuild_registries(workspace, categories)
+        result["registries"] = sorted(categories)
+    else:
+        for category in categories:
+            workspace.invalidate_folder(workspace.active_categories[category])
+
+    return result
@@ -0,0 +1,141 @@
+"""
+Поисковый индекс справочника сотрудников
+Поиск подстроки по ФИО, должности, подразделению и email без учёта регистра и ё/е
+"""
+
+from bisect import bisect_right
+from collections import OrderedDict
+
+
+# Поля сотрудника, по которым идёт поиск
+SEARCH_FIELDS = ("fio", "position", "department", "email")
+
+# Разделитель полей в тексте записи: символ, которого нет в запросах, -
+# поэтому совпадение не может захватить соседние поля или сам разделитель
+FIELD_SEPARATOR = "\x00"
+
+# Сколько последних запросов держать в кэше (набор и стирание символов)
+QUERY_CACHE_SIZE = 64
+
+# Если вхождений больше, чем 1/DENSE_MATCH_RATIO записей, проверяем записи подряд
+DENSE_MATCH_RATIO = 8
+
+
+def normalize(text):
+    """Нормализация для поиска: регистр и ё -> е"""
+    return str(text or "").casefold().replace("ё", "е")
+
+
+class EmployeeSearchIndex:
+    """
+    Индекс для поиска по мере ввода
+
+    Тексты всех сотрудников склеены в одну строку, поэтому поиск самого
+    длинного слова запроса - это str.find на C-скорости по одной строке,
+    а не обход списка. Остальные слова проверяются только у найденных.
+    Если новый запрос продолжает предыдущий, ищем среди его результатов.
+    """
+
+    def __init__(self, employees=()):
+        self.build(employees)
+
+    def build(self, employees):
+        """
+        Построить индекс
+
+        Args:
+            employees: Список сотрудников (list[dict])
+        """
+        self.ids = []
+        texts = []
+        for emp in employees:
+            self.ids.append(emp['id'])
+            texts.append(FIELD_SEPARATOR.join(
+                normalize(emp.get(field, "")).replace(FIELD_SEPARATOR, "") for field in SEARCH_FIELDS
+            ))
+
+        self.texts = texts
+
+        # Начало каждой записи в общей строке (разделитель - перевод строки)
+        self.starts = []
+        offset = 0
+        for text in texts:
+            self.starts.append(offset)
+            offset += len(text) + 1
+        self.blob = "\n".join(texts)
+
+        self._cache = OrderedDict()  # {нормализованный запрос: [позиции]}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _find_positions(self, token):
+        """Позиции записей, содержащих подстроку (поиск по общей строке)"""
+        blob = self.blob
+        starts = self.starts
+        count = len(starts)
+
+        # Частая подстрока (одна-две буквы): прыжки по find дороже простого прохода
+        if blob.count(token) * DENSE_MATCH_RATIO > count:
+            return [i for i, text in enumerate(self.texts) if token in text]
+
+        positions = []
+
+        pos = blob.find(token)
+        while pos != -1:
+            index = bisect_right(starts, pos) - 1
+            positions.append(index)
+            # Переходим сразу к следующей записи
+            if index + 1 >= count:
+                break
+            pos = blob.find(token, starts[index + 1])
+
+        return positions
+
+    def _search_positions(self, query):
+        tokens = query.split()
+        if not tokens:
+            return list(range(len(self.ids)))
+
+        cached = self._cache.get(query)
+        if cached is not None:
+            self._cache.move_to_end(query)
+            return cached
+
+        # Продолжение одного из недавних запросов - сужаем его результат
+        base = None
+        for previous in reversed(self._cache):
+            if query.startswith(previous) and previous.split():
+                base = self._cache[previous]
+                break
+
+        texts = self.texts
+        if base is None:
+            longest = max(tokens, key=len)
+            positions = self._find_positions(longest)
+            rest = [t for t in tokens if t is not longest]
+        else:
+            positions = base
+            rest = tokens
+
+        for token in rest:
+            positions = [p for p in positions if token in texts[p]]
+
+        self._cache[query] = positions
+        if len(self._cache) > QUERY_CACHE_SIZE:
+            self._cache.popitem(last=False)
+
+        return positions
+
+    def search(self, query):
+        """
+        Найти сотрудников: все слова запроса должны встречаться как подстроки
+
+        Args:
+            query: Строка поиска
+
+        Returns:
+            list: ID сотрудников в порядке справочника
+        """
+        positions = self._search_positions(normalize(query).replace(FIELD_SEPARATOR, "").strip())
+        return [self.ids[p] for p in positions]
@@ -0,0 +1,391 @@
+"""
+Локальный HTTP/JSON сервис ISO2 на asyncio (только стандартная библиотека)
+Держит индекс документов и разобранные реестры рабочей папки в памяти,
+чтобы рабочие места не сканировали общую папку каждое по отдельности
+
+Запуск: python -m server --work-dir ПАПКА [--host 127.0.0.1] [--port 8765]
+
+Запросы (GET):
+    /health                                     состояние сервиса
+    /documents?folder=active&category=&q=       список документов (folder: projects/active/archive/all)
+    /search?q=&folder=&category=                то же, q обязателен
+    /query?q=typ=ПП year>=2020                  документы по условиям на поля (язык запросов query.py)
+    /similar?file=ИМЯ                           похожие в ДЕЙСТВУЮЩИХ для файла из ПРОЕКТОВ
+    /registry?category=                         документы актуальных реестров
+    /export/registry?category=&format=csv|excel файл реестра
+Ответы помечаются ETag; при совпадении If-None-Match возвращается 304.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+
+from config import CATEGORIES, API_HOST, API_PORT, API_REFRESH_SECONDS
+from workspace import get_workspace
+
+
+# Папки документов для /documents
+FOLDERS = ("projects", "active", "archive")
+
+STATUS_TEXT = {
+    200: "OK",
+    304: "Not Modified",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    500: "Internal Server Error",
+}
+
+# Предельный размер заголовков запроса
+MAX_HEADER_BYTES = 64 * 1024
+
+# Сколько готовых ответов держать в памяти (разные поисковые запросы)
+RESPONSE_CACHE_SIZE = 256
+
+
+class ApiError(Exception):
+    """Ошибка запроса с HTTP-кодом"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class DocumentIndex:
+    """
+    Индекс документов и реестров рабочей папки в памяти
+
+    Состояние папок (mtime) проверяется не чаще раза в refresh_seconds;
+    пока оно не изменилось, готовые ответы отдаются из кэша без сканирования
+    и повторной сериализации.
+    """
+
+    def __init__(self, workspace, refresh_seconds=API_REFRESH_SECONDS):
+        self.workspace = workspace
+        self.refresh_seconds = refresh_seconds
+
+        self._stamp = None
+        self._stamp_time = 0.0
+        self._responses = {}    # {(путь, запрос): (отметка, etag, тип, тело)}
+
+    def _watched_paths(self):
+        ws = self.workspace
+        paths = [ws.projects_dir]
+        paths += list(ws.active_categories.values())
+        paths += list(ws.archive_categories.values())
+        paths += list(ws.archive_packed.values())
+        paths += list(ws.registry_actual_files.values())
+        return paths
+
+    def stamp(self, force=False):
+        """
+        Отметка состояния рабочей папки (mtime папок и актуальных реестров)
+
+        Args:
+            force: Проверить папки сейчас, не дожидаясь периода обновления
+        """
+        now = time.monotonic()
+        if force or self._stamp is None or now - self._stamp_time >= self.refresh_seconds:
+            stamp = []
+            for path in self._watched_paths():
+                try:
+                    stamp.append(self.workspace.storage.stat(path).mtime_ns)
+                except OSError:
+                    stamp.append(None)
+            self._stamp = tuple(stamp)
+            self._stamp_time = now
+        return self._stamp
+
+    # Данные
+
+    def documents(self, folder="all", category=None, query=None):
+        from logic import scan_folder, scan_folder_with_categories
+
+        ws = self.workspace
+        folders = FOLDERS if folder == "all" else (folder,)
+        result = []
+
+        for name in folders:
+            if name == "projects":
+                docs = scan_folder(ws.projects_dir, None, ws)
+            elif name == "active":
+                docs = scan_folder_with_categories(ws.active_dir, ws.active_categories, ws)
+            elif name == "archive":
+                docs = scan_folder_with_categories(ws.archive_dir, ws.archive_categories, ws)
+            else:
+                raise ApiError(400, f"Неизвестная папка: {name}")
+
+            for doc in docs:
+                if category and doc.category != category:
+                    continue
+                item = doc.to_dict()
+                item["folder"] = name
+                result.append(item)
+
+        if query:
+            needle = query.casefold()
+            result = [item for item in result if needle in item["filename"].casefold()]
+
+        result.sort(key=lambda d: (d["folder"], d["category"] or "", d["filename"]))
+        return result
+
+    def query(self, text):
+        from query import query_documents, QueryError
+
+        try:
+            # Ответ строится, только когда папки изменились - индекс проверяет их сразу
+            result = query_documents(text, self.workspace, fresh=True)
+        except QueryError as e:
+            raise ApiError(400, f"Ошибка в запросе: {e}")
+
+        documents = []
+        for folder, doc in result:
+            item = doc.to_dict()
+            item["folder"] = folder
+            documents.append(item)
+        return documents
+
+    def similar(self, filename):
+        from logic import Document, scan_folder_with_categories, find_similar_documents
+
+        ws = self.workspace
+        source = Document(os.path.basename(filename), ws.projects_dir)
+        active = scan_folder_with_categories(ws.active_dir, ws.active_categories, ws)
+        return {
+            "document": source.to_dict(),
+            "similar": [doc.to_dict() for doc in find_similar_documents(source, active)],
+        }
+
+    def registry(self, category=None):
+        from registry import get_registry_documents
+
+        categories = [category] if category else list(CATEGORIES)
+        return {c: get_registry_documents(c, self.workspace) for c in categories}
+
+    def export_registry(self, category=None, fmt="excel"):
+        """Файл реестра в байтах: (content-type, данные)"""
+        from registry import export_registry_to_csv, export_registry_to_excel, export_all_registries_to_excel
+
+        suffix = ".csv" if fmt == "csv" else ".xlsx"
+        fd, path = tempfile.mkstemp(suffix=suffix)
+        os.close(fd)
+        try:
+            if fmt == "csv":
+                if not category:
+                    raise ApiError(400, "CSV экспортируется по одной категории")
+                ok = export_registry_to_csv(category, path, self.workspace)
+                content_type = "text/csv; charset=utf-8"
+            else:
+                if category:
+                    ok = export_registry_to_excel(category, path, self.workspace)
+                else:
+                    ok = export_all_registries_to_excel(path, self.workspace)
+                content_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+            if not ok:
+                raise ApiError(500, "Не удалось экспортировать реестр")
+
+            with open(path, 'rb') as f:
+                return content_type, f.read()
+        finally:
+            os.remove(path)
+
+    # Ответы
+
+    def _build(self, path, params):
+        """Ответ на запрос: (content-type, тело)"""
+        get = lambda name: (params.get(name) or [""])[0].strip()
+
+        category = get("category") or None
+        if category and category not in CATEGORIES:
+            raise ApiError(400, f"Неизвестная категория: {category}")
+
+        if path == "/health":
+            data = {"docs_dir": self.workspace.docs_dir}
+        elif path in ("/documents", "/search"):
+            query = get("q")
+            if path == "/search" and not query:
+                raise ApiError(400, "Не задан параметр q")
+            docs = self.documents(get("folder") or "all", category, query)
+            data = {"docs_dir": self.workspace.docs_dir, "count": len(docs), "documents": docs}
+        elif path == "/query":
+            query = get("q")
+            docs = self.query(query)
+            data = {"docs_dir": self.workspace.docs_dir, "query": query, "count": len(docs), "documents": docs}
+        elif path == "/similar":
+            if not get("file"):
+                raise ApiError(400, "Не задан параметр file")
+            data = self.similar(get("file"))
+        elif path == "/registry":
+            data = {"registries": self.registry(category)}
+        elif path == "/export/registry":
+            return self.export_registry(category, get("format") or "excel")
+        else:
+            raise ApiError(404, f"Неизвестный адрес: {path}")
+
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        return "application/json; charset=utf-8", body
+
+    def respond(self, path, query_string, fresh=False):
+        """
+        Ответ с ETag (из кэша, если рабочая папка не менялась)
+
+        Args:
+            fresh: Проверить папки сейчас (запрос с Cache-Control: no-cache)
+
+        Returns:
+            tuple: (etag, content-type, тело)
+        """
+        stamp = self.stamp(force=fresh)
+        key = (path, query_string)
+
+        cached = self._responses.get(key)
+        if cached and cached[0] == stamp:
+            return cached[1:]
+
+        content_type, body = self._build(path, parse_qs(query_string))
+        etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+
+        if len(self._responses) >= RESPONSE_CACHE_SIZE:
+            self._responses.clear()
+        self._responses[key] = (stamp, etag, content_type, body)
+        return etag, content_type, body
+
+
+class ApiServer:
+    """HTTP-сервер на asyncio.start_server поверх DocumentIndex"""
+
+    def __init__(self, index, host=API_HOST, port=API_PORT):
+        self.index = index
+        self.host = host
+        self.port = port
+        self.server = None
+        # Сканирование и сериализация - в одном рабочем потоке, цикл событий не блокируется
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, self.host, self.port)
+        # Порт 0 - свободный порт, назначенный системой
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.server
+
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    def close(self):
+        if self.server is not None:
+            self.server.close()
+        self.executor.shutdown(wait=False)
+
+    async def handle(self, reader, writer):
+        """Один запрос на соединение (Connection: close)"""
+        try:
+            try:
+                head = await reader.readuntil(b"\r\n\r\n")
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                return
+            if len(head) > MAX_HEADER_BYTES:
+                await self._send(writer, 400, {"error": "Слишком большой запрос"})
+                return
+
+            lines = head.decode("latin-1").split("\r\n")
+            try:
+                method, target, _ = lines[0].split(" ", 2)
+            except ValueError:
+                await self._send(writer, 400, {"error": "Неверная строка запроса"})
+                return
+
+            headers = {}
+            for line in lines[1:]:
+                if ":" in line:
+                    name, value = line.split(":", 1)
+                    headers[name.strip().lower()] = value.strip()
+
+            if method not in ("GET", "HEAD"):
+                await self._send(writer, 405, {"error": "Поддерживаются только GET и HEAD"})
+                return
+
+            url = urlsplit(target)
+            loop = asyncio.get_running_loop()
+            try:
+                etag, content_type, body = await loop.run_in_executor(
+                    self.executor, self.index.respond, url.path, url.query,
+                    headers.get("cache-control") == "no-cache"
+                )
+            except ApiError as e:
+                await self._send(writer, e.status, {"error": str(e)})
+                return
+            except Exception as e:
+                await self._send(writer, 500, {"error": f"{type(e).__name__}: {e}"})
+                return
+
+            if headers.get("if-none-match") == etag:
+                await self._write(writer, 304, {"ETag": etag}, b"")
+                return
+
+            extra = {"ETag": etag, "Content-Type": content_type, "Cache-Control": "no-cache"}
+            await self._write(writer, 200, extra, b"" if method == "HEAD" else body, len(body))
+        finally:
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+
+    async def _send(self, writer, status, data):
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        await self._write(writer, status, {"Content-Type": "application/json; charset=utf-8"}, body)
+
+    async def _write(self, writer, status, headers, body, length=None):
+        lines = [f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}"]
+        headers = dict(headers)
+        headers["Content-Length"] = str(len(body) if length is None else length)
+        headers["Connection"] = "close"
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+
+def main(argv=None):
+    """Запуск сервиса из командной строки"""
+    import config
+
+    parser = argparse.ArgumentParser(prog="python -m server", description="Локальный HTTP/JSON сервис ISO2")
+    parser.add_argument("--work-dir", help="Рабочая папка (по умолчанию - из настроек)")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    args = parser.parse_args(argv)
+
+    work_dir = args.work_dir or config.DOCS_DIR
+    if not work_dir or not os.path.isdir(work_dir):
+        print("Рабочая папка не задана или не найдена: укажите --work-dir", file=sys.stderr)
+        return 1
+
+    server = ApiServer(DocumentIndex(get_workspace(work_dir)), args.host, args.port)
+
+    async def run():
+        await server.start()
+        print(f"ISO2 API: http://{server.host}:{server.port} ({work_dir})", file=sys.stderr)
+        await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
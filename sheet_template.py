@@ -0,0 +1,363 @@
+"""
+Шаблон листа ознакомления
+Статичная разметка строится один раз и хранится в памяти в виде байтов,
+при генерации заполняются только шапка документа и строки сотрудников
+"""
+
+import os
+from copy import copy
+from datetime import datetime
+from io import BytesIO
+
+from config import FAMILIARIZATION_TEMPLATE_FILE
+from workspace import get_current_workspace
+
+
+# Разметка шаблона (номера строк)
+TITLE_ROW = 1           # Заголовок листа
+HEADER_ROW = 7          # Заголовки таблицы
+FIRST_ROW = 8           # Образец строки сотрудника (стили берутся из неё)
+TOTAL_ROW = 10          # Образец строки "Итого" (для одного сотрудника)
+LAST_COLUMN = 6         # Колонки A..F
+DATE_COLUMN = 5         # "Дата ознакомления"
+SIGNATURE_COLUMN = 6    # "Подпись"
+
+# Скрытая служебная колонка G: ID сотрудника в строках, код и версия документа в шапке.
+# По ним заполненный лист загружается обратно в учёт ознакомлений (acknowledgements)
+ID_COLUMN = 7
+ID_COLUMN_LETTER = "G"
+DOC_KOD_CELL = "G3"
+DOC_VERSION_CELL = "G4"
+
+# Ячейки шапки документа с подстановками {document}, {category}, {date}
+HEADER_CELLS = ["A3", "A4", "A5"]
+
+# Кэш шаблона: {"key": (путь, mtime) или None, "data": bytes}
+_template_cache = {"key": None, "data": None}
+
+
+def build_default_template():
+    """
+    Построить стандартный шаблон листа ознакомления
+
+    Returns:
+        bytes: Книга Excel в сериализованном виде
+    """
+    from openpyxl import Workbook
+    from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Лист ознакомления"
+
+    # Стили
+    header_font = Font(name='Arial', size=12, bold=True, color="FFFFFF")
+    header_fill = PatternFill(start_color="4A5568", end_color="4A5568", fill_type="solid")
+    header_alignment = Alignment(horizontal='center', vertical='center')
+
+    normal_font = Font(name='Arial', size=11)
+    center_alignment = Alignment(horizontal='center', vertical='center')
+    left_alignment = Alignment(horizontal='left', vertical='center')
+    border = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+
+    # Заголовок
+    ws.merge_cells('A1:F1')
+    ws['A1'] = 'ЛИСТ ОЗНАКОМЛЕНИЯ С ДОКУМЕНТОМ СМК'
+    ws['A1'].font = Font(name='Arial', size=16, bold=True)
+    ws['A1'].alignment = Alignment(horizontal='center', vertical='center')
+
+    # Информация о документе (подстановки)
+    ws.merge_cells('A3:F3')
+    ws['A3'] = 'Документ: {document}'
+    ws['A3'].font = Font(name='Arial', size=12, bold=True)
+    ws['A3'].alignment = Alignment(horizontal='left')
+
+    ws.merge_cells('A4:F4')
+    ws['A4'] = 'Категория: {category}'
+    ws['A4'].font = normal_font
+    ws['A4'].alignment = Alignment(horizontal='left')
+
+    ws.merge_cells('A5:F5')
+    ws['A5'] = 'Дата формирования листа: {date}'
+    ws['A5'].font = normal_font
+    ws['A5'].alignment = Alignment(horizontal='left')
+
+    # Заголовки таблицы
+    headers = ['№', 'ФИО', 'Должность', 'Подразделение', 'Дата ознакомления', 'Подпись']
+    for col, header in enumerate(headers, start=1):
+        cell = ws.cell(row=HEADER_ROW, column=col)
+        cell.value = header
+        cell.font = header_font
+        cell.fill = header_fill
+        cell.alignment = header_alignment
+        cell.border = border
+
+    # Ширина колонок
+    ws.column_dimensions['A'].width = 5
+    ws.column_dimensions['B'].width = 35
+    ws.column_dimensions['C'].width = 30
+    ws.column_dimensions['D'].width = 15
+    ws.column_dimensions['E'].width = 20
+    ws.column_dimensions['F'].width = 20
+
+    # Образец строки сотрудника
+    for col in range(1, LAST_COLUMN + 1):
+        cell = ws.cell(row=FIRST_ROW, column=col)
+        cell.font = normal_font
+        cell.border = border
+        if col == 1 or col == 4:
+            cell.alignment = center_alignment
+        else:
+            cell.alignment = left_alignment
+
+    # Образец строки "Итого"
+    ws.merge_cells(f'A{TOTAL_ROW}:F{TOTAL_ROW}')
+    ws[f'A{TOTAL_ROW}'] = 'Всего для ознакомления: {count} человек(а)'
+    ws[f'A{TOTAL_ROW}'].font = Font(name='Arial', size=11, bold=True)
+    ws[f'A{TOTAL_ROW}'].alignment = Alignment(horizontal='center')
+
+    buffer = BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+def get_user_template_path(workspace=None):
+    """
+    Путь к пользовательскому шаблону в рабочей папке
+
+    Args:
+        workspace: Рабочее пространство (по умолчанию текущее)
+
+    Returns:
+        str: Путь к файлу или None, если шаблон не положен в папку
+    """
+    if workspace is None:
+        workspace = get_current_workspace()
+    if workspace is None:
+        return None
+
+    path = os.path.join(workspace.docs_dir, FAMILIARIZATION_TEMPLATE_FILE)
+    return path if os.path.exists(path) else None
+
+
+def get_template_bytes(workspace=None):
+    """
+    Получить шаблон листа ознакомления (из кэша, если он не устарел)
+
+    Пользовательский шаблон перечитывается только при изменении файла.
+
+    Args:
+        workspace: Рабочее пространство (по умолчанию текущее)
+
+    Returns:
+        bytes: Книга Excel в сериализованном виде
+    """
+    user_path = get_user_template_path(workspace)
+
+    if user_path:
+        key = (user_path, os.path.getmtime(user_path))
+    else:
+        key = None
+
+    if _template_cache["data"] is None or _template_cache["key"] != key:
+        if user_path:
+            with open(user_path, 'rb') as f:
+                _template_cache["data"] = f.read()
+        else:
+            _template_cache["data"] = build_default_template()
+        _template_cache["key"] = key
+
+    return _template_cache["data"]
+
+
+def clear_template_cache():
+    """Сбросить кэш шаблона (например, после смены рабочей папки)"""
+    _template_cache["key"] = None
+    _template_cache["data"] = None
+
+
+def substitute(text, values):
+    """
+    Подставить значения вместо {имя} из values
+
+    Другие фигурные скобки в тексте пользовательского шаблона остаются как есть.
+    """
+    for name, value in values.items():
+        text = text.replace("{" + name + "}", str(value))
+    return text
+
+
+class FamiliarizationTemplate:
+    """Загруженный шаблон листа ознакомления, готовый к заполнению"""
+
+    def __init__(self, template_bytes=None, workspace=None):
+        from openpyxl import load_workbook
+
+        if template_bytes is None:
+            template_bytes = get_template_bytes(workspace)
+
+        self.wb = load_workbook(BytesIO(template_bytes))
+        self.ws = self.wb.active
+
+        # Тексты шапки с подстановками (для повторного заполнения)
+        self.header_texts = {ref: self.ws[ref].value for ref in HEADER_CELLS}
+
+        # Служебная колонка скрыта (в том числе в пользовательском шаблоне)
+        self.ws.column_dimensions[ID_COLUMN_LETTER].hidden = True
+        self.ws.cell(row=HEADER_ROW, column=ID_COLUMN).value = "ID"
+
+        # Стили образца строки сотрудника
+        self.row_styles = [
+            copy(self.ws.cell(row=FIRST_ROW, column=col)._style)
+            for col in range(1, LAST_COLUMN + 1)
+        ]
+
+        # Образец строки "Итого" снимаем с шаблона, чтобы переставить ниже
+        total_cell = self.ws.cell(row=TOTAL_ROW, column=1)
+        self.total_text = total_cell.value or 'Всего для ознакомления: {count} человек(а)'
+        self.total_style = copy(total_cell._style)
+        self._unmerge_row(TOTAL_ROW)
+        total_cell.value = None
+
+        self.rows_count = 0
+
+    def _unmerge_row(self, row):
+        """Снять объединение ячеек в строке"""
+        for merged in list(self.ws.merged_cells.ranges):
+            if merged.min_row == row:
+                self.ws.unmerge_cells(str(merged))
+
+    def fill_header(self, document):
+        """
+        Заполнить шапку листа данными документа
+
+        Args:
+            document: Объект документа (Document)
+        """
+        from logic import build_filename
+
+        if document.is_valid:
+            doc_name = build_filename(document.typ, document.kod, document.version, document.year, document.title)
+        else:
+            doc_name = document.filename
+
+        category = getattr(document, 'category', None)
+        values = {
+            "document": doc_name,
+            "category": category or "",
+            "date": datetime.now().strftime("%d.%m.%Y"),
+        }
+
+        self.ws[DOC_KOD_CELL].value = document.kod if document.is_valid else None
+        self.ws[DOC_VERSION_CELL].value = document.version if document.is_valid else None
+
+        for ref, text in self.header_texts.items():
+            if not isinstance(text, str):
+                continue
+            # Строку категории не показываем, если категории нет
+            if "{category}" in text and not category:
+                self.ws[ref].value = None
+            else:
+                self.ws[ref].value = substitute(text, values)
+
+    def fill_rows(self, selected_employees):
+        """
+        Заполнить таблицу сотрудников и строку "Итого"
+
+        Args:
+            selected_employees: Список сотрудников (list[dict])
+        """
+        ws = self.ws
+        row_styles = self.row_styles
+
+        for idx, emp in enumerate(selected_employees, start=1):
+            row = idx + HEADER_ROW
+            values = (idx, emp['fio'], emp['position'], emp['department'], "", "")
+
+            for col, value in enumerate(values, start=1):
+                cell = ws.cell(row=row, column=col)
+                cell.value = value
+                cell._style = copy(row_styles[col - 1])
+
+            ws.cell(row=row, column=ID_COLUMN).value = emp['id']
+
+        self.rows_count = len(selected_employees)
+
+        # Итого
+        row = self.rows_count + HEADER_ROW + 2
+        ws.merge_cells(start_row=row, start_column=1, end_row=row, end_column=LAST_COLUMN)
+        total_cell = ws.cell(row=row, column=1)
+        total_cell.value = substitute(self.total_text, {"count": self.rows_count})
+        total_cell._style = copy(self.total_style)
+
+    def save(self, output_path):
+        """Сохранить заполненный лист"""
+        self.wb.save(output_path)
+
+
+def fill_familiarization_sheet(document, selected_employees, output_path, workspace=None):
+    """
+    Создать лист ознакомления по шаблону
+
+    Args:
+        document: Объект документа (Document)
+        selected_employees: Список выбранных сотрудников (list[dict])
+        output_path: Путь для сохранения Excel файла
+        workspace: Рабочее пространство (по умолчанию текущее)
+    """
+    template = FamiliarizationTemplate(workspace=workspace)
+    template.fill_header(document)
+    template.fill_rows(selected_employees)
+    template.save(output_path)
+
+
+def fill_familiarization_sheets(documents, selected_employees, output_dir, workspace=None):
+    """
+    Пакетное создание листов ознакомления: один список сотрудников
+    для нескольких документов
+
+    Строки сотрудников заполняются один раз, для каждого документа
+    меняется только шапка. Документы с одинаковым обозначением (тот же
+    код и версия в разных категориях) получают файлы с номером: _2, _3...
+
+    Args:
+        documents: Список документов (list[Document])
+        selected_employees: Список выбранных сотрудников (list[dict])
+        output_dir: Папка для сохранения файлов
+        workspace: Рабочее пространство (по умолчанию текущее)
+
+    Returns:
+        list[str]: Пути к созданным файлам
+    """
+    template = FamiliarizationTemplate(workspace=workspace)
+    template.fill_rows(selected_employees)
+
+    today = datetime.now().strftime('%Y-%m-%d')
+    created = []
+    used_names = set()
+
+    for document in documents:
+        if document.is_valid:
+            doc_short = f"{document.typ}.{document.kod}-{document.version}"
+        else:
+            doc_short = os.path.splitext(document.filename)[0]
+
+        name = f"Лист_ознакомления_{doc_short}_{today}"
+        number = 1
+        while name.casefold() in used_names:
+            number += 1
+            name = f"Лист_ознакомления_{doc_short}_{today}_{number}"
+        used_names.add(name.casefold())
+
+        output_path = os.path.join(output_dir, name + ".xlsx")
+
+        template.fill_header(document)
+        template.save(output_path)
+        created.append(output_path)
+
+    return created
@@ -0,0 +1,385 @@
+"""
+Хранилище файлов рабочей папки
+Все операции с файлами документов и реестров идут через этот интерфейс:
+локальная файловая система, память (для проверок) и обёртка с задержкой
+(имитация сетевого диска SMB)
+"""
+
+import io
+import os
+import posixpath
+import shutil
+import threading
+import time
+from collections import Counter
+
+
+class StatResult:
+    """Сведения о файле или папке"""
+
+    __slots__ = ("mtime_ns", "size", "is_dir")
+
+    def __init__(self, mtime_ns, size, is_dir):
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.is_dir = is_dir
+
+    def __repr__(self):
+        return f"StatResult(mtime_ns={self.mtime_ns}, size={self.size}, is_dir={self.is_dir})"
+
+
+class Storage:
+    """
+    Интерфейс хранилища
+
+    Пути - обычные строки (как os.path.join). Отсутствующий путь -
+    FileNotFoundError, как у os.
+    """
+
+    def listdir(self, path):
+        """Имена файлов и папок в папке"""
+        raise NotImplementedError
+
+    def stat(self, path):
+        """Сведения о пути (StatResult)"""
+        raise NotImplementedError
+
+    def exists(self, path):
+        try:
+            self.stat(path)
+            return True
+        except OSError:
+            return False
+
+    def makedirs(self, path):
+        """Создать папку со всеми родительскими (существующая - не ошибка)"""
+        raise NotImplementedError
+
+    def copy(self, src, dst):
+        """Скопировать файл (с сохранением времени изменения)"""
+        raise NotImplementedError
+
+    def move(self, src, dst):
+        """Переместить или переименовать файл"""
+        raise NotImplementedError
+
+    def replace(self, src, dst):
+        """Атомарно заменить dst файлом src (в пределах одной папки или диска)"""
+        self.move(src, dst)
+
+    def remove(self, path):
+        """Удалить файл"""
+        raise NotImplementedError
+
+    def link(self, src, dst):
+        """
+        Жёсткая ссылка dst на файл src (общее содержимое, без копирования)
+
+        Хранилища и файловые системы без жёстких ссылок - OSError
+        """
+        raise OSError("Жёсткие ссылки не поддерживаются")
+
+    def read_bytes(self, path):
+        raise NotImplementedError
+
+    def write_bytes(self, path, data):
+        raise NotImplementedError
+
+    def read_text(self, path, encoding='utf-8'):
+        return self.read_bytes(path).decode(encoding)
+
+    def write_text(self, path, text, encoding='utf-8'):
+        self.write_bytes(path, text.encode(encoding))
+
+    def open(self, path, mode='rb'):
+        """
+        Открыть файл как двоичный поток с произвольным доступом (для zipfile)
+
+        Args:
+            mode: 'rb', 'wb' или 'r+b'
+        """
+        raise NotImplementedError
+
+
+class LocalStorage(Storage):
+    """Локальная (или смонтированная сетевая) файловая система"""
+
+    def listdir(self, path):
+        return os.listdir(path)
+
+    def stat(self, path):
+        st = os.stat(path)
+        return StatResult(st.st_mtime_ns, st.st_size, os.path.isdir(path))
+
+    def exists(self, path):
+        return os.path.exists(path)
+
+    def makedirs(self, path):
+        os.makedirs(path, exist_ok=True)
+
+    def copy(self, src, dst):
+        shutil.copy2(src, dst)
+
+    def move(self, src, dst):
+        shutil.move(src, dst)
+
+    def replace(self, src, dst):
+        os.replace(src, dst)
+
+    def remove(self, path):
+        os.remove(path)
+
+    def link(self, src, dst):
+        os.link(src, dst)
+
+    def read_bytes(self, path):
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def write_bytes(self, path, data):
+        with open(path, 'wb') as f:
+            f.write(data)
+
+    def read_text(self, path, encoding='utf-8'):
+        with open(path, 'r', encoding=encoding) as f:
+            return f.read()
+
+    def write_text(self, path, text, encoding='utf-8'):
+        with open(path, 'w', encoding=encoding) as f:
+            f.write(text)
+
+    def open(self, path, mode='rb'):
+        return open(path, mode)
+
+
+class _MemoryFile(io.BytesIO):
+    """Файл MemoryStorage: содержимое записывается в хранилище при закрытии"""
+
+    def __init__(self, storage, path, data, writable):
+        super().__init__(data)
+        self._storage = storage
+        self._path = path
+        self._writable = writable
+
+    def close(self):
+        if self._writable and not self.closed:
+            self._storage.write_bytes(self._path, self.getvalue())
+        super().close()
+
+
+class MemoryStorage(Storage):
+    """
+    Хранилище в памяти (для проверок и замеров без диска)
+
+    Время изменения - счётчик, который растёт на каждую операцию записи,
+    поэтому результаты детерминированы.
+    """
+
+    def __init__(self):
+        self._files = {}        # {путь: [данные, mtime]}
+        self._dirs = {}         # {путь: mtime}
+        self._children = {}     # {папка: set(имён)} - listdir без перебора всех путей
+        self._clock = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(path):
+        return posixpath.normpath(str(path).replace("\\", "/"))
+
+    def _tick(self):
+        self._clock += 1
+        return self._clock
+
+    def _link(self, key, mtime):
+        """Добавить имя в родительскую папку (она должна существовать)"""
+        parent, name = posixpath.split(key)
+        if parent not in self._dirs:
+            raise FileNotFoundError(f"Нет папки: {parent}")
+        self._children[parent].add(name)
+        self._dirs[parent] = mtime
+
+    def _unlink(self, key, mtime):
+        parent, name = posixpath.split(key)
+        self._children[parent].discard(name)
+        self._dirs[parent] = mtime
+
+    def listdir(self, path):
+        key = self._key(path)
+        with self._lock:
+            if key not in self._dirs:
+                raise FileNotFoundError(path)
+            return sorted(self._children[key])
+
+    def stat(self, path):
+        key = self._key(path)
+        with self._lock:
+            if key in self._dirs:
+                return StatResult(self._dirs[key], 0, True)
+            if key in self._files:
+                data, mtime = self._files[key]
+                return StatResult(mtime, len(data), False)
+        raise FileNotFoundError(path)
+
+    def makedirs(self, path):
+        key = self._key(path)
+        with self._lock:
+            missing = []
+            while key not in self._dirs and posixpath.dirname(key) != key:
+                missing.append(key)
+                key = posixpath.dirname(key)
+            if key not in self._dirs:
+                # Корень
+                self._dirs[key] = self._tick()
+                self._children[key] = set()
+            for key in reversed(missing):
+                mtime = self._tick()
+                self._dirs[key] = mtime
+                self._children[key] = set()
+                self._link(key, mtime)
+
+    def copy(self, src, dst):
+        src_key, dst_key = self._key(src), self._key(dst)
+        with self._lock:
+            if src_key not in self._files:
+                raise FileNotFoundError(src)
+            data, mtime = self._files[src_key]
+            self._link(dst_key, self._tick())
+            self._files[dst_key] = [data, mtime]
+
+    def move(self, src, dst):
+        src_key, dst_key = self._key(src), self._key(dst)
+        with self._lock:
+            if src_key not in self._files:
+                raise FileNotFoundError(src)
+            if src_key == dst_key:
+                # Перемещение в себя - ничего не меняется (как os.replace)
+                return
+            now = self._tick()
+            self._link(dst_key, now)
+            self._files[dst_key] = self._files.pop(src_key)
+            self._unlink(src_key, now)
+
+    def remove(self, path):
+        key = self._key(path)
+        with self._lock:
+            if key not in self._files:
+                raise FileNotFoundError(path)
+            del self._files[key]
+            self._unlink(key, self._tick())
+
+    def link(self, src, dst):
+        src_key, dst_key = self._key(src), self._key(dst)
+        with self._lock:
+            if src_key not in self._files:
+                raise FileNotFoundError(src)
+            if dst_key in self._files:
+                raise FileExistsError(dst)
+            self._link(dst_key, self._tick())
+            # Один и тот же список [данные, mtime] - как общий inode
+            self._files[dst_key] = self._files[src_key]
+
+    def read_bytes(self, path):
+        key = self._key(path)
+        with self._lock:
+            if key not in self._files:
+                raise FileNotFoundError(path)
+            return self._files[key][0]
+
+    def write_bytes(self, path, data):
+        key = self._key(path)
+        with self._lock:
+            now = self._tick()
+            if key not in self._files:
+                self._link(key, now)
+            self._files[key] = [bytes(data), now]
+
+    def open(self, path, mode='rb'):
+        if mode == 'wb':
+            return _MemoryFile(self, path, b"", True)
+        data = self.read_bytes(path)
+        if mode == 'r+b':
+            return _MemoryFile(self, path, data, True)
+        return _MemoryFile(self, path, data, False)
+
+
+class LatencyStorage(Storage):
+    """
+    Обёртка, добавляющая задержку к каждой операции (имитация SMB)
+
+    Считает вызовы по операциям (calls) - удобно проверять, сколько
+    обращений к диску делает сканирование или публикация.
+    """
+
+    def __init__(self, inner, latency=0.002, latencies=None):
+        """
+        Args:
+            inner: Хранилище, к которому идут вызовы
+            latency: Задержка одной операции (секунды)
+            latencies: Задержки для отдельных операций {имя: секунды}
+        """
+        self.inner = inner
+        self.latency = latency
+        self.latencies = dict(latencies or {})
+        self.calls = Counter()
+
+    def _wait(self, operation):
+        self.calls[operation] += 1
+        delay = self.latencies.get(operation, self.latency)
+        if delay > 0:
+            time.sleep(delay)
+
+    def listdir(self, path):
+        self._wait("listdir")
+        return self.inner.listdir(path)
+
+    def stat(self, path):
+        self._wait("stat")
+        return self.inner.stat(path)
+
+    def exists(self, path):
+        self._wait("stat")
+        return self.inner.exists(path)
+
+    def makedirs(self, path):
+        self._wait("makedirs")
+        self.inner.makedirs(path)
+
+    def copy(self, src, dst):
+        self._wait("copy")
+        self.inner.copy(src, dst)
+
+    def move(self, src, dst):
+        self._wait("move")
+        self.inner.move(src, dst)
+
+    def replace(self, src, dst):
+        self._wait("move")
+        self.inner.replace(src, dst)
+
+    def remove(self, path):
+        self._wait("remove")
+        self.inner.remove(path)
+
+    def link(self, src, dst):
+        self._wait("link")
+        self.inner.link(src, dst)
+
+    def read_bytes(self, path):
+        self._wait("read")
+        return self.inner.read_bytes(path)
+
+    def write_bytes(self, path, data):
+        self._wait("write")
+        self.inner.write_bytes(path, data)
+
+    def read_text(self, path, encoding='utf-8'):
+        self._wait("read")
+        return self.inner.read_text(path, encoding)
+
+    def write_text(self, path, text, encoding='utf-8'):
+        self._wait("write")
+        self.inner.write_text(path, text, encoding)
+
+    def open(self, path, mode='rb'):
+        self._wait("write" if mode != 'rb' else "read")
+        return self.inner.open(path, mode)
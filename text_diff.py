@@ -0,0 +1,255 @@
+"""
+Сравнение текста двух документов по строкам (абзацам)
+Алгоритм Майерса O((N+M)D) с поиском "среднего отрезка" (линейная память):
+для версий одного документа, где различий D немного, время почти линейно
+от длины текста - 200-страничная процедура сравнивается за доли секунды.
+Текст берётся из кэша text_extract, результат сравнения кэшируется в
+рабочем пространстве по путям и mtime обоих файлов.
+"""
+
+from collections import OrderedDict
+
+import perf
+from config import TEXT_DIFF_MAX_EDITS, TEXT_DIFF_CACHE_SIZE, TEXT_DIFF_CONTEXT
+from workspace import resolve_workspace
+
+
+class DiffTooLarge(Exception):
+    """Тексты различаются сильнее, чем TEXT_DIFF_MAX_EDITS строк (сравнение прервано)"""
+
+
+def _middle_snake(a, alo, ahi, b, blo, bhi, max_edits):
+    """
+    Средний отрезок кратчайшего пути правок между a[alo:ahi] и b[blo:bhi]
+
+    Поиск идёт одновременно с начала и с конца до встречи.
+
+    Returns:
+        tuple: (D, x, y, u, v) - число правок и отрезок совпадения
+               от (x, y) до (u, v) в координатах относительно alo/blo
+    """
+    n = ahi - alo
+    m = bhi - blo
+    delta = n - m
+    odd = delta & 1
+    offset = n + m + 1
+    forward = [0] * (2 * offset + 1)
+    backward = [0] * (2 * offset + 1)
+
+    for d in range((n + m + 1) // 2 + 1):
+        if 2 * d > max_edits:
+            raise DiffTooLarge(f"Различий больше {max_edits} строк")
+
+        # Вперёд: forward[k] - самый дальний x на диагонали k = x - y
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and forward[offset + k - 1] < forward[offset + k + 1]):
+                x = forward[offset + k + 1]
+            else:
+                x = forward[offset + k - 1] + 1
+            y = x - k
+            start_x, start_y = x, y
+            while x < n and y < m and a[alo + x] == b[blo + y]:
+                x += 1
+                y += 1
+            forward[offset + k] = x
+            # Встреча с обратным поиском на диагонали delta - k (шаг d - 1)
+            if odd and -(d - 1) <= delta - k <= d - 1 and x + backward[offset + delta - k] >= n:
+                return 2 * d - 1, start_x, start_y, x, y
+
+        # Назад: backward[k] - самый дальний x в перевёрнутых последовательностях
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and backward[offset + k - 1] < backward[offset + k + 1]):
+                x = backward[offset + k + 1]
+            else:
+                x = backward[offset + k - 1] + 1
+            y = x - k
+            start_x, start_y = x, y
+            while x < n and y < m and a[ahi - 1 - x] == b[bhi - 1 - y]:
+                x += 1
+                y += 1
+            backward[offset + k] = x
+            if not odd and -d <= delta - k <= d and x + forward[offset + delta - k] >= n:
+                return 2 * d, n - x, m - y, n - start_x, m - start_y
+
+    # Сюда не доходит: пути всегда встречаются при d <= (n + m + 1) // 2
+    raise AssertionError("Средний отрезок не найден")
+
+
+def _matching_blocks(a, alo, ahi, b, blo, bhi, max_edits, blocks):
+    """Совпадающие блоки (i, j, длина) в порядке следования"""
+    # Общие начало и конец не участвуют в поиске
+    start = alo
+    while alo < ahi and blo < bhi and a[alo] == b[blo]:
+        alo += 1
+        blo += 1
+    if alo > start:
+        blocks.append((start, blo - (alo - start), alo - start))
+
+    end_a = ahi
+    while alo < ahi and blo < bhi and a[ahi - 1] == b[bhi - 1]:
+        ahi -= 1
+        bhi -= 1
+
+    if alo < ahi and blo < bhi:
+        d, x, y, u, v = _middle_snake(a, alo, ahi, b, blo, bhi, max_edits)
+        if d > 1:
+            _matching_blocks(a, alo, alo + x, b, blo, blo + y, max_edits, blocks)
+            if u > x:
+                blocks.append((alo + x, blo + y, u - x))
+            _matching_blocks(a, alo + u, ahi, b, blo + v, bhi, max_edits, blocks)
+        elif u > x:
+            # Одна правка: совпадает всё, кроме одной строки (общее начало уже снято)
+            blocks.append((alo + x, blo + y, u - x))
+
+    if ahi < end_a:
+        blocks.append((ahi, bhi, end_a - ahi))
+
+
+def diff_lines(a, b, max_edits=TEXT_DIFF_MAX_EDITS):
+    """
+    Правки, превращающие строки a в строки b
+
+    Args:
+        a, b: Списки строк
+        max_edits: Предел числа правок (защита от сравнения совсем разных текстов)
+
+    Returns:
+        list[tuple]: Операции как у difflib: (тег, i1, i2, j1, j2),
+                     тег - "equal", "delete", "insert" или "replace"
+
+    Raises:
+        DiffTooLarge: Правок больше max_edits
+    """
+    # Строки заменяются номерами - сравнение чисел быстрее сравнения строк
+    ids = {}
+    a_ids = [ids.setdefault(line, len(ids)) for line in a]
+    b_ids = [ids.setdefault(line, len(ids)) for line in b]
+
+    blocks = []
+    _matching_blocks(a_ids, 0, len(a_ids), b_ids, 0, len(b_ids), max_edits, blocks)
+    blocks.append((len(a), len(b), 0))
+
+    opcodes = []
+    i = j = 0
+    for block_i, block_j, size in blocks:
+        if i < block_i and j < block_j:
+            opcodes.append(("replace", i, block_i, j, block_j))
+        elif i < block_i:
+            opcodes.append(("delete", i, block_i, j, j))
+        elif j < block_j:
+            opcodes.append(("insert", i, i, j, block_j))
+        if size:
+            opcodes.append(("equal", block_i, block_i + size, block_j, block_j + size))
+        i, j = block_i + size, block_j + size
+    return opcodes
+
+
+def text_lines(text):
+    """Строки текста для сравнения: абзацы без пустых строк и крайних пробелов"""
+    from text_extract import PAGE_BREAK
+
+    lines = (line.strip() for line in text.replace(PAGE_BREAK, "\n").splitlines())
+    return [line for line in lines if line]
+
+
+class TextDiff:
+    """Результат сравнения: строки обоих текстов и операции"""
+
+    def __init__(self, old_lines, new_lines, opcodes):
+        self.old_lines = old_lines
+        self.new_lines = new_lines
+        self.opcodes = opcodes
+
+    @property
+    def removed(self):
+        return sum(i2 - i1 for tag, i1, i2, _, _ in self.opcodes if tag in ("delete", "replace"))
+
+    @property
+    def added(self):
+        return sum(j2 - j1 for tag, _, _, j1, j2 in self.opcodes if tag in ("insert", "replace"))
+
+    @property
+    def identical(self):
+        return all(tag == "equal" for tag, _, _, _, _ in self.opcodes)
+
+    def lines(self, context=TEXT_DIFF_CONTEXT):
+        """
+        Строки для показа с context строками вокруг изменений
+
+        Returns:
+            list[tuple]: (тег, текст), тег: " " - без изменений, "-" - удалено,
+                         "+" - добавлено, "@" - заголовок фрагмента
+        """
+        result = []
+        last = len(self.opcodes) - 1
+        for index, (tag, i1, i2, j1, j2) in enumerate(self.opcodes):
+            if tag == "equal":
+                lines = self.old_lines[i1:i2]
+                head = lines[:context] if index > 0 else []
+                tail = lines[-context:] if index < last and context else []
+                if len(lines) <= len(head) + len(tail):
+                    result.extend((" ", line) for line in lines)
+                else:
+                    result.extend((" ", line) for line in head)
+                    if index < last:
+                        result.append(("@", f"@@ строка {i2 - len(tail) + 1} -> {j2 - len(tail) + 1} @@"))
+                    result.extend((" ", line) for line in tail)
+                continue
+            if index == 0:
+                result.append(("@", f"@@ строка {i1 + 1} -> {j1 + 1} @@"))
+            result.extend(("-", line) for line in self.old_lines[i1:i2])
+            result.extend(("+", line) for line in self.new_lines[j1:j2])
+        return result
+
+
+@perf.timed("text.diff")
+def diff_documents(old_doc, new_doc, workspace=None):
+    """
+    Сравнить текст двух документов
+
+    Args:
+        old_doc: Document - прежняя версия (например, из ДЕЙСТВУЮЩИХ)
+        new_doc: Document - новая версия (например, из ПРОЕКТОВ)
+        workspace: Рабочее пространство (по умолчанию текущее)
+
+    Returns:
+        TextDiff: Результат
+
+    Raises:
+        TextUnavailable: Текст одного из документов не извлекается
+        DiffTooLarge: Тексты различаются слишком сильно
+    """
+    from text_extract import document_stamp, get_document_text, TextUnavailable
+
+    workspace = resolve_workspace(workspace)
+    try:
+        key = (document_stamp(old_doc, workspace), document_stamp(new_doc, workspace))
+    except OSError as e:
+        raise TextUnavailable(f"Файл недоступен: {e}")
+
+    # Последние сравнения: {(отметка старого, отметка нового): TextDiff}
+    cache = workspace.cache.setdefault("text_diff", OrderedDict())
+    if key in cache:
+        cache.move_to_end(key)
+        return cache[key]
+
+    old_lines = text_lines(get_document_text(old_doc, workspace))
+    new_lines = text_lines(get_document_text(new_doc, workspace))
+    result = TextDiff(old_lines, new_lines, diff_lines(old_lines, new_lines))
+
+    cache[key] = result
+    while len(cache) > TEXT_DIFF_CACHE_SIZE:
+        cache.popitem(last=False)
+    return result
+
+
+def diff_async(old_doc, new_doc, workspace=None):
+    """
+    Сравнить в фоновом потоке
+
+    Returns:
+        concurrent.futures.Future: Результат - TextDiff
+    """
+    from text_extract import submit
+
+    return submit(diff_documents, old_doc, new_doc, resolve_workspace(workspace))
@@ -0,0 +1,334 @@
+"""
+Текст документов для предпросмотра и сравнения
+.docx читается без сторонних библиотек (zipfile + XML), .pdf - через pypdf,
+если она установлена. Извлечённый текст хранится в дисковом кэше
+(TEXT_CACHE_DIR) с ключом путь + mtime + размер: повторный показ того же
+документа не разбирает файл. Кэш ограничен по размеру, вытесняются давно
+не использованные записи. Извлечение идёт в фоновых потоках (extract_async).
+"""
+
+import hashlib
+import io
+import os
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from xml.etree import ElementTree
+
+import perf
+from config import TEXT_CACHE_DIR, TEXT_CACHE_MAX_BYTES, TEXT_PREVIEW_CHARS, TEXT_EXTRACT_WORKERS
+from workspace import resolve_workspace
+
+
+# Разрыв страницы в извлечённом тексте
+PAGE_BREAK = "\f"
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+class TextUnavailable(Exception):
+    """Текст документа не извлекается (формат не поддерживается, нет библиотеки, файл повреждён)"""
+
+
+def _docx_text(data, first_page=False):
+    """
+    Текст .docx: абзацы - строками, разрывы страниц - PAGE_BREAK
+
+    Args:
+        data: Содержимое файла
+        first_page: Остановиться на первом разрыве страницы (или TEXT_PREVIEW_CHARS)
+    """
+    try:
+        archive = zipfile.ZipFile(io.BytesIO(data))
+        xml = archive.open("word/document.xml")
+    except (zipfile.BadZipFile, KeyError) as e:
+        raise TextUnavailable(f"Не удалось прочитать .docx: {e}")
+
+    parts = []
+    size = 0
+    with xml:
+        try:
+            for event, element in ElementTree.iterparse(xml, events=("start", "end")):
+                tag = element.tag
+                if event == "start":
+                    if tag == _W + "lastRenderedPageBreak" or (
+                            tag == _W + "br" and element.get(_W + "type") == "page"):
+                        parts.append(PAGE_BREAK)
+                        if first_page and size:
+                            break
+                    continue
+
+                if tag == _W + "t" and element.text:
+                    parts.append(element.text)
+                    size += len(element.text)
+                elif tag == _W + "tab":
+                    parts.append("\t")
+                elif tag == _W + "p":
+                    parts.append("\n")
+                    # Разобранные абзацы больше не нужны
+                    element.clear()
+                    if first_page and size >= TEXT_PREVIEW_CHARS:
+                        break
+        except ElementTree.ParseError as e:
+            raise TextUnavailable(f"Не удалось разобрать .docx: {e}")
+
+    return "".join(parts)
+
+
+def _pdf_text(data, first_page=False):
+    """Текст .pdf по страницам (PAGE_BREAK между страницами)"""
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        raise TextUnavailable("Для просмотра PDF установите библиотеку pypdf: pip install pypdf")
+
+    try:
+        reader = PdfReader(io.BytesIO(data))
+        pages = reader.pages[:1] if first_page else reader.pages
+        return PAGE_BREAK.join(page.extract_text() or "" for page in pages)
+    except Exception as e:
+        raise TextUnavailable(f"Не удалось прочитать PDF: {e}")
+
+
+def extract_text(data, filename, first_page=False):
+    """
+    Текст документа из содержимого файла
+
+    Args:
+        data: Содержимое файла (bytes)
+        filename: Имя файла (формат - по расширению)
+        first_page: Только первая страница
+
+    Returns:
+        str: Текст
+
+    Raises:
+        TextUnavailable: Формат не поддерживается или файл не читается
+    """
+    ext = os.path.splitext(filename)[1].lower()
+    if ext == ".docx":
+        return _docx_text(data, first_page)
+    if ext == ".pdf":
+        return _pdf_text(data, first_page)
+    raise TextUnavailable(f"Просмотр текста {ext or 'файлов без расширения'} не поддерживается")
+
+
+def first_page(text):
+    """Первая непустая страница текста (не длиннее TEXT_PREVIEW_CHARS)"""
+    for page in text.split(PAGE_BREAK):
+        if page.strip():
+            return page[:TEXT_PREVIEW_CHARS].strip()
+    return ""
+
+
+class TextCache:
+    """
+    Дисковый кэш текста с вытеснением давно не использованных записей
+
+    Запись - файл <ключ>.txt; время изменения файла обновляется при каждом
+    попадании, при превышении max_bytes удаляются самые старые.
+    """
+
+    def __init__(self, directory=TEXT_CACHE_DIR, max_bytes=TEXT_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._sizes = None      # {имя файла: размер} - читается с диска при первом обращении
+
+    def _load(self):
+        if self._sizes is None:
+            self._sizes = {}
+            try:
+                with os.scandir(self.directory) as entries:
+                    for entry in entries:
+                        if entry.name.endswith(".txt"):
+                            self._sizes[entry.name] = entry.stat().st_size
+            except OSError:
+                pass
+
+    @staticmethod
+    def make_key(*parts):
+        return hashlib.sha1("\0".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """Текст по ключу или None"""
+        path = os.path.join(self.directory, key + ".txt")
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                text = f.read()
+            os.utime(path)
+        except OSError:
+            return None
+        return text
+
+    def put(self, key, text):
+        """Сохранить текст и вытеснить старые записи сверх max_bytes"""
+        name = key + ".txt"
+        data = text.encode("utf-8")
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            self._load()
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                tmp = os.path.join(self.directory, f"{name}.{threading.get_ident()}.tmp")
+                with open(tmp, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp, os.path.join(self.directory, name))
+            except OSError as e:
+                print(f"Не удалось сохранить текст в кэш: {e}")
+                return
+            self._sizes[name] = len(data)
+            self._evict()
+
+    def _evict(self):
+        total = sum(self._sizes.values())
+        if total <= self.max_bytes:
+            return
+
+        def last_used(name):
+            try:
+                return os.stat(os.path.join(self.directory, name)).st_mtime_ns
+            except OSError:
+                return 0
+
+        for name in sorted(self._sizes, key=last_used):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+            total -= self._sizes.pop(name)
+
+    def clear(self):
+        with self._lock:
+            self._load()
+            for name in list(self._sizes):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+            self._sizes = {}
+
+
+_cache = None
+_executor = None
+_init_lock = threading.Lock()
+
+
+def get_text_cache():
+    """Общий дисковый кэш текста"""
+    global _cache
+    with _init_lock:
+        if _cache is None:
+            _cache = TextCache()
+        return _cache
+
+
+def document_stamp(doc, workspace):
+    """
+    Отметка версии файла документа для ключей кэша
+
+    Returns:
+        tuple: (путь, mtime_ns, размер); для упакованного - путь внутри ZIP и stat пакета
+
+    Raises:
+        OSError: Файл недоступен
+    """
+    st = workspace.storage.stat(doc.bundle or doc.full_path)
+    path = f"{doc.bundle}!{doc.filename}" if doc.bundle else doc.full_path
+    return path, st.mtime_ns, st.size
+
+
+@perf.timed("text.extract")
+def get_document_text(doc, workspace=None, first_page_only=False):
+    """
+    Текст документа (из кэша или с разбором файла)
+
+    Args:
+        doc: Document (в том числе упакованный в ZIP)
+        workspace: Рабочее пространство (по умолчанию текущее)
+        first_page_only: Только первая страница (для предпросмотра)
+
+    Returns:
+        str: Текст (страницы разделены PAGE_BREAK)
+
+    Raises:
+        TextUnavailable: Текст не извлекается
+    """
+    workspace = resolve_workspace(workspace)
+    try:
+        stamp = document_stamp(doc, workspace)
+    except OSError as e:
+        raise TextUnavailable(f"Файл недоступен: {e}")
+
+    cache = get_text_cache()
+    full_key = TextCache.make_key(*stamp, "full")
+    text = cache.get(full_key)
+    if text is not None:
+        return first_page(text) if first_page_only else text
+
+    page_key = TextCache.make_key(*stamp, "page")
+    if first_page_only:
+        text = cache.get(page_key)
+        if text is not None:
+            return text
+
+    try:
+        if doc.bundle:
+            from archive_pack import read_packed
+            data = read_packed(doc, workspace)
+        else:
+            data = workspace.storage.read_bytes(doc.full_path)
+    except (OSError, KeyError, zipfile.BadZipFile) as e:
+        raise TextUnavailable(f"Не удалось прочитать файл: {e}")
+
+    text = extract_text(data, doc.filename, first_page_only)
+    if first_page_only:
+        text = first_page(text)
+        cache.put(page_key, text)
+    else:
+        cache.put(full_key, text)
+    return text
+
+
+def get_cached_text(doc, workspace=None, first_page_only=False):
+    """Текст из кэша без разбора файла (None, если в кэше нет) - для мгновенного показа"""
+    workspace = resolve_workspace(workspace)
+    try:
+        stamp = document_stamp(doc, workspace)
+    except OSError:
+        return None
+
+    cache = get_text_cache()
+    text = cache.get(TextCache.make_key(*stamp, "full"))
+    if text is not None:
+        return first_page(text) if first_page_only else text
+    if first_page_only:
+        return cache.get(TextCache.make_key(*stamp, "page"))
+    return None
+
+
+def submit(function, *args):
+    """
+    Выполнить функцию в фоновых потоках извлечения текста
+
+    Returns:
+        concurrent.futures.Future: Результат функции
+    """
+    global _executor
+    with _init_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=TEXT_EXTRACT_WORKERS, thread_name_prefix="iso2-text")
+    return _executor.submit(function, *args)
+
+
+def extract_async(doc, workspace=None, first_page_only=False):
+    """
+    Извлечь текст в фоновом потоке
+
+    Returns:
+        concurrent.futures.Future: Результат - текст; исключение - TextUnavailable
+    """
+    return submit(get_document_text, doc, resolve_workspace(workspace), first_page_only)
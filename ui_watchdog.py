@@ -0,0 +1,217 @@
+"""
+Сторож главного цикла Tk
+Главный поток ставит отметки через root.after(); фоновый поток замечает, что
+отметок нет дольше порога, и снимает стек главного потока (sys._current_frames).
+Так в журнале видно не только "интерфейс завис на 3 с", но и где именно:
+filter_documents, find_similar, экспорт и т.п.
+
+Зависания пишутся в журнал JSON Lines (WATCHDOG_LOG_FILE) и показываются
+в окне "Диагностика" (Ctrl+Shift+D в главном окне).
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime, timedelta
+
+from config import (
+    BASE_DIR, settings, WATCHDOG_INTERVAL_MS, WATCHDOG_STALL_MS, WATCHDOG_KEEP, WATCHDOG_LOG_FILE,
+    PERF_LOG_MAX_BYTES, PERF_LOG_BACKUPS
+)
+
+
+# Сколько кадров стека сохранять (самые внутренние)
+STACK_DEPTH = 30
+
+# Модальные диалоги tkinter: пока открыт такой диалог, главный цикл ждёт
+# пользователя - это не зависание
+MODAL_DIALOG_FILES = ("messagebox.py", "filedialog.py", "commondialog.py", "simpledialog.py")
+
+
+class Stall:
+    """Одно зависание главного цикла"""
+
+    __slots__ = ("started", "duration_ms", "stack", "cause")
+
+    def __init__(self, started, duration_ms, stack, cause):
+        self.started = started          # datetime начала
+        self.duration_ms = duration_ms
+        self.stack = stack              # list[str] - строки стека (внутренние в конце)
+        self.cause = cause              # "файл.py:строка функция" - ближайший кадр проекта
+
+    def to_dict(self):
+        return {
+            "ts": self.started.isoformat(timespec="milliseconds"),
+            "duration_ms": round(self.duration_ms, 1),
+            "cause": self.cause,
+            "stack": self.stack,
+        }
+
+
+def _describe_stack(frame):
+    """
+    Стек кадра в виде строк и причина зависания
+
+    Returns:
+        tuple: (list[str] строк стека, str причина или "", bool модальный диалог)
+    """
+    summary = traceback.extract_stack(frame)[-STACK_DEPTH:]
+    lines = [f"{os.path.basename(item.filename)}:{item.lineno} {item.name}" for item in summary]
+
+    modal = any(os.path.basename(item.filename) in MODAL_DIALOG_FILES
+                and "tkinter" in item.filename for item in summary)
+
+    # Причина - самый внутренний кадр из файлов проекта
+    cause = ""
+    for item in reversed(summary):
+        if os.path.abspath(item.filename).startswith(BASE_DIR + os.sep):
+            cause = f"{os.path.basename(item.filename)}:{item.lineno} {item.name}"
+            break
+
+    return lines, cause or (lines[-1] if lines else ""), modal
+
+
+class MainLoopWatchdog:
+    """
+    Сторож главного цикла
+
+    Использование:
+        watchdog = MainLoopWatchdog(root)
+        watchdog.start()
+        root.mainloop()
+    """
+
+    def __init__(self, root, interval_ms=WATCHDOG_INTERVAL_MS, stall_ms=WATCHDOG_STALL_MS,
+                 log_path=WATCHDOG_LOG_FILE):
+        """
+        Args:
+            root: Корневое окно Tk
+            interval_ms: Период отметок главного цикла
+            stall_ms: Задержка отметки, начиная с которой это зависание
+            log_path: Журнал зависаний (None - не вести)
+        """
+        self.root = root
+        self.interval = interval_ms / 1000
+        self.threshold = stall_ms / 1000
+        self.log_path = log_path
+
+        self.stalls = deque(maxlen=WATCHDOG_KEEP)
+        self.count = 0                  # Всего зависаний с запуска
+        self.total_ms = 0.0
+
+        self._lock = threading.Lock()
+        self._last_beat = time.monotonic()
+        self._captured = None           # (стек, причина, модальный) текущего зависания
+        self._main_ident = threading.main_thread().ident
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        """Запустить отметки и фоновый поток"""
+        if self._running:
+            return
+        self._running = True
+        self._last_beat = time.monotonic()
+        self.root.after(int(self.interval * 1000), self._beat)
+        self._thread = threading.Thread(target=self._watch, name="iso2-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+
+    # Главный поток
+
+    def _beat(self):
+        """Отметка главного цикла: если она опоздала больше порога - зависание"""
+        if not self._running:
+            return
+
+        now = time.monotonic()
+        with self._lock:
+            delay = now - self._last_beat - self.interval
+            captured = self._captured
+            self._captured = None
+            self._last_beat = now
+
+        if delay >= self.threshold:
+            self._record(delay, captured)
+
+        self.root.after(int(self.interval * 1000), self._beat)
+
+    def _record(self, delay, captured):
+        stack, cause, modal = captured or ([], "", False)
+        if modal:
+            return
+
+        started = datetime.now() - timedelta(seconds=delay + self.interval)
+        stall = Stall(started, delay * 1000, stack, cause or "стек не снят (зависание короче периода проверки)")
+        self.stalls.append(stall)
+        self.count += 1
+        self.total_ms += stall.duration_ms
+
+        print(f"Интерфейс не отвечал {stall.duration_ms:.0f} мс: {stall.cause}")
+        self._write_log(stall)
+
+    def _write_log(self, stall):
+        if not self.log_path:
+            return
+        from perf import rotate_log
+
+        try:
+            rotate_log(self.log_path, PERF_LOG_MAX_BYTES, PERF_LOG_BACKUPS)
+            with open(self.log_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(stall.to_dict(), ensure_ascii=False) + "\n")
+        except OSError as e:
+            print(f"Ошибка записи журнала зависаний: {e}")
+
+    # Фоновый поток
+
+    def _watch(self):
+        """Проверять отметки; при зависании один раз снять стек главного потока"""
+        poll = min(self.interval, self.threshold) / 2
+        while self._running:
+            time.sleep(poll)
+            with self._lock:
+                late = time.monotonic() - self._last_beat - self.interval
+                if late < self.threshold or self._captured is not None:
+                    continue
+                frame = sys._current_frames().get(self._main_ident)
+                if frame is None:
+                    continue
+                self._captured = _describe_stack(frame)
+
+    def snapshot(self):
+        """
+        Сведения для окна "Диагностика"
+
+        Returns:
+            dict: {count, total_ms, stalls: list[Stall] (новые в конце)}
+        """
+        return {"count": self.count, "total_ms": self.total_ms, "stalls": list(self.stalls)}
+
+
+_watchdog = None
+
+
+def start_watchdog(root):
+    """
+    Запустить сторож главного цикла (если не отключён настройкой "watchdog_enabled")
+
+    Returns:
+        MainLoopWatchdog или None
+    """
+    global _watchdog
+    if settings.get('watchdog_enabled', True) is False:
+        return None
+    _watchdog = MainLoopWatchdog(root)
+    _watchdog.start()
+    return _watchdog
+
+
+def get_watchdog():
+    """Запущенный сторож (None - не запущен)"""
+    return _watchdog
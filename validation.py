@@ -0,0 +1,277 @@
+"""
+Проверка рабочей папки
+Имена файлов не по шаблону, год вне YEAR_MIN..YEAR_MAX, один код у нескольких
+ДЕЙСТВУЮЩИХ документов и версии, идущие назад. Папки сканируются параллельно,
+результат кэшируется до изменения любой из папок (по mtime), поэтому повторная
+проверка неизменившейся рабочей папки мгновенна.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import perf
+from config import YEAR_MIN, YEAR_MAX, VALIDATION_WORKERS
+from workspace import resolve_workspace
+
+
+# Виды проблем: (ключ, описание для показа)
+INVALID_NAME = "invalid_name"
+YEAR_RANGE = "year_range"
+DUPLICATE_KOD = "duplicate_kod"
+VERSION_BACKWARDS = "version_backwards"
+
+ISSUE_KINDS = [
+    (INVALID_NAME, "Имя не по шаблону ТИП.КОД-ВЕРСИЯ-ГОД Название"),
+    (YEAR_RANGE, f"Год вне диапазона {YEAR_MIN}-{YEAR_MAX}"),
+    (DUPLICATE_KOD, "Один код у нескольких ДЕЙСТВУЮЩИХ документов"),
+    (VERSION_BACKWARDS, "Версия идёт назад"),
+]
+
+# Папки рабочей папки: (ключ, название)
+FOLDERS = [
+    ("projects", "ПРОЕКТЫ"),
+    ("active", "ДЕЙСТВУЮЩИЕ"),
+    ("archive", "АРХИВ"),
+]
+
+
+class ValidationIssue:
+    """Одна проблема: вид, документы и пояснение"""
+
+    def __init__(self, kind, folder, documents, message):
+        self.kind = kind                # Ключ из ISSUE_KINDS
+        self.folder = folder            # "ПРОЕКТЫ" / "ДЕЙСТВУЮЩИЕ" / "АРХИВ"
+        self.documents = documents      # list[Document] (первый - основной)
+        self.message = message
+
+    @property
+    def category(self):
+        return self.documents[0].category
+
+    def __repr__(self):
+        return f"ValidationIssue({self.kind}, {self.documents[0].filename})"
+
+    def to_dict(self):
+        return {
+            "kind": self.kind,
+            "folder": self.folder,
+            "category": self.category,
+            "files": [doc.full_path for doc in self.documents],
+            "message": self.message,
+        }
+
+
+class ValidationReport:
+    """Результат проверки рабочей папки"""
+
+    def __init__(self, issues, files):
+        self.issues = issues
+        self.files = files      # Сколько файлов проверено
+
+    @property
+    def ok(self):
+        return not self.issues
+
+    def by_kind(self, kind):
+        return [issue for issue in self.issues if issue.kind == kind]
+
+    def counts(self):
+        """
+        Количество проблем по видам и категориям
+
+        Returns:
+            dict: {вид: {категория: количество}} (без категории - "ПРОЕКТЫ")
+        """
+        counts = {}
+        for issue in self.issues:
+            per_category = counts.setdefault(issue.kind, {})
+            category = issue.category or issue.folder
+            per_category[category] = per_category.get(category, 0) + 1
+        return counts
+
+    def to_dict(self):
+        return {
+            "files": self.files,
+            "problems": len(self.issues),
+            "counts": self.counts(),
+            "issues": [issue.to_dict() for issue in self.issues],
+        }
+
+
+def year_out_of_range(filename):
+    """Имя по шаблону, но год - число вне YEAR_MIN..YEAR_MAX (parse_filename такие имена отклоняет)"""
+    name_parts = os.path.splitext(filename)[0].split(maxsplit=1)
+    if len(name_parts) < 2:
+        return False
+    parts = name_parts[0].split('-')
+    if len(parts) < 3 or not parts[-1].isdigit():
+        return False
+    return not (YEAR_MIN <= int(parts[-1]) <= YEAR_MAX)
+
+
+def folder_tasks(workspace):
+    """Папки для сканирования: (ключ папки, категория, путь, упакованный архив)"""
+    tasks = [("projects", None, workspace.projects_dir, False)]
+    for category, path in workspace.active_categories.items():
+        tasks.append(("active", category, path, False))
+    for category, path in workspace.archive_categories.items():
+        tasks.append(("archive", category, path, False))
+        tasks.append(("archive", category, workspace.archive_packed[category], True))
+    return tasks
+
+
+def folders_stamp(workspace, tasks):
+    """Состояние папок (mtime_ns) - ключ кэша результата"""
+    def stat(task):
+        try:
+            return workspace.storage.stat(task[2]).mtime_ns
+        except OSError:
+            return None
+
+    with ThreadPoolExecutor(max_workers=VALIDATION_WORKERS) as executor:
+        return tuple(executor.map(stat, tasks))
+
+
+def scan_folders(workspace, tasks, max_workers=VALIDATION_WORKERS):
+    """
+    Параллельное сканирование папок
+
+    Args:
+        workspace: Рабочее пространство
+        tasks: Папки из folder_tasks
+        max_workers: Количество потоков
+
+    Returns:
+        dict: {ключ папки: [Document]}
+    """
+    from logic import scan_folder
+    from archive_pack import packed_documents, without_shadowed
+
+    def scan_one(task):
+        key, category, path, packed = task
+        if packed:
+            return packed_documents(category, workspace)
+        return scan_folder(path, category, workspace)
+
+    scanned = {key: [] for key, _ in FOLDERS}
+    loose = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for task, documents in zip(tasks, executor.map(scan_one, tasks)):
+            key, category, _, packed = task
+            if packed:
+                # Файл, оставшийся рядом с пакетом, показывается один раз
+                documents = without_shadowed(loose.get(category, []), documents)
+            elif key == "archive":
+                loose[category] = documents
+            scanned[key].extend(documents)
+    return scanned
+
+
+def _check_names(folder, documents):
+    """Имена не по шаблону и годы вне диапазона"""
+    issues = []
+    for doc in documents:
+        if doc.is_valid:
+            continue
+        if year_out_of_range(doc.filename):
+            issues.append(ValidationIssue(YEAR_RANGE, folder, [doc], f"Год вне {YEAR_MIN}-{YEAR_MAX}"))
+        else:
+            issues.append(ValidationIssue(INVALID_NAME, folder, [doc], "Имя не разбирается по шаблону"))
+    return issues
+
+
+def _check_duplicates(active):
+    """Несколько ДЕЙСТВУЮЩИХ документов с одним кодом"""
+    by_kod = {}
+    for doc in active:
+        if doc.is_valid:
+            by_kod.setdefault(doc.kod, []).append(doc)
+
+    issues = []
+    for kod, docs in sorted(by_kod.items()):
+        if len(docs) > 1:
+            docs.sort(key=lambda d: d.filename)
+            issues.append(ValidationIssue(
+                DUPLICATE_KOD, "ДЕЙСТВУЮЩИЕ", docs, f"КОД {kod}: {len(docs)} документа(ов)"
+            ))
+    return issues
+
+
+def _check_versions(active, archived):
+    """
+    Версии, идущие назад:
+    - более поздний год с меньшим номером версии;
+    - в АРХИВЕ версия новее, чем в ДЕЙСТВУЮЩИХ
+    """
+    from lineage import version_key
+
+    by_kod = {}
+    for folder, documents in (("ДЕЙСТВУЮЩИЕ", active), ("АРХИВ", archived)):
+        for doc in documents:
+            if doc.is_valid:
+                by_kod.setdefault(doc.kod, []).append((version_key(doc), folder, doc))
+
+    issues = []
+    for kod, entries in sorted(by_kod.items()):
+        entries.sort(key=lambda entry: entry[0])
+
+        # Номер версии должен расти вместе с годом
+        highest = None
+        for key, folder, doc in entries:
+            if highest is not None and key[1] < highest[0][1] and key[0] > highest[0][0]:
+                issues.append(ValidationIssue(
+                    VERSION_BACKWARDS, folder, [doc, highest[2]],
+                    f"КОД {kod}: версия {doc.version} ({doc.year}) меньше версии "
+                    f"{highest[2].version} ({highest[2].year})"
+                ))
+            if highest is None or key[1] > highest[0][1]:
+                highest = (key, folder, doc)
+
+        # Действующая версия не старше архивных
+        newest_archived = max((entry for entry in entries if entry[1] == "АРХИВ"),
+                              key=lambda entry: entry[0][:2], default=None)
+        if newest_archived is None:
+            continue
+        for key, folder, doc in entries:
+            if folder == "ДЕЙСТВУЮЩИЕ" and key[:2] < newest_archived[0][:2]:
+                archived_doc = newest_archived[2]
+                issues.append(ValidationIssue(
+                    VERSION_BACKWARDS, folder, [doc, archived_doc],
+                    f"КОД {kod}: в АРХИВЕ более новая версия {archived_doc.version} ({archived_doc.year})"
+                ))
+    return issues
+
+
+@perf.timed("validation.run")
+def validate_workspace(workspace=None, max_workers=VALIDATION_WORKERS):
+    """
+    Проверить рабочую папку (ПРОЕКТЫ, ДЕЙСТВУЮЩИЕ и АРХИВ, включая упакованный)
+
+    Папки категорий сканируются параллельно; пока ни одна папка не менялась,
+    возвращается прежний результат.
+
+    Args:
+        workspace: Рабочее пространство (по умолчанию текущее)
+        max_workers: Количество потоков сканирования
+
+    Returns:
+        ValidationReport: Результат проверки
+    """
+    workspace = resolve_workspace(workspace)
+    tasks = folder_tasks(workspace)
+    stamp = folders_stamp(workspace, tasks)
+
+    cached = workspace.cache.get("validation")
+    if cached and cached[0] == stamp:
+        return cached[1]
+
+    scanned = scan_folders(workspace, tasks, max_workers)
+    issues = []
+    for key, folder in FOLDERS:
+        issues.extend(_check_names(folder, scanned[key]))
+    issues.extend(_check_duplicates(scanned["active"]))
+    issues.extend(_check_versions(scanned["active"], scanned["archive"]))
+
+    report = ValidationReport(issues, sum(len(documents) for documents in scanned.values()))
+    workspace.cache["validation"] = (stamp, report)
+    return report
@@ -0,0 +1,238 @@
+"""
+Общие виджеты интерфейса ISO2
+Виртуализированный список с галочками: рисуются только видимые строки
+"""
+
+import tkinter as tk
+
+
+class VirtualChecklist(tk.Frame):
+    """
+    Список с галочками на Canvas
+
+    Вместо Frame + BooleanVar + Checkbutton на каждую строку рисуются только
+    строки, попадающие в видимую область. Отмеченные ключи хранятся в обычном set.
+
+    Элемент списка: (ключ, строки), где строки - str или список
+    кортежей (текст, цвет, шрифт); первая строка используется для фильтра.
+    """
+
+    CHECK_ON = "☑"
+    CHECK_OFF = "☐"
+
+    def __init__(self, parent, row_height=32, show_filter=True, filter_func=None,
+                 empty_text="Список пуст", bg="#37474F", row_bg="#4A5568",
+                 fg="white", font=("Arial", 11), on_change=None):
+        super().__init__(parent, bg=bg)
+
+        self.row_height = row_height
+        self.row_bg = row_bg
+        self.fg = fg
+        self.font = font
+        self.empty_text = empty_text
+        self.filter_func = filter_func  # query -> set(ключей) или None (встроенный фильтр)
+        self.on_change = on_change      # вызывается после изменения отметок
+
+        self.items = []                 # [(ключ, [(текст, цвет, шрифт), ...])]
+        self.search_texts = []          # Текст для фильтра (в нижнем регистре)
+        self.visible = []               # Индексы элементов после фильтра
+        self.checked = set()            # Отмеченные ключи
+
+        self._redraw_pending = False
+
+        # Строка фильтра
+        self.filter_var = tk.StringVar()
+        if show_filter:
+            filter_frame = tk.Frame(self, bg=bg)
+            filter_frame.pack(fill=tk.X, pady=(0, 5))
+
+            tk.Label(
+                filter_frame, text="🔍", font=font, bg=bg, fg=fg
+            ).pack(side=tk.LEFT)
+
+            self.filter_entry = tk.Entry(
+                filter_frame, textvariable=self.filter_var,
+                font=font, bg=row_bg, fg=fg, insertbackground=fg
+            )
+            self.filter_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+            self.filter_var.trace('w', lambda *args: self.apply_filter())
+
+        # Canvas со скроллбаром
+        self.canvas = tk.Canvas(self, bg=bg, highlightthickness=0)
+        self.scrollbar = tk.Scrollbar(self, orient="vertical", command=self._yview, bg=row_bg)
+        self.canvas.configure(yscrollcommand=self._on_scroll)
+
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.canvas.bind("<Configure>", lambda e: self._update_scrollregion())
+        self.canvas.bind("<Button-1>", self._on_click)
+        self.canvas.bind("<MouseWheel>", self._on_mousewheel)
+        self.canvas.bind("<Button-4>", lambda e: self._yview("scroll", -1, "units"))
+        self.canvas.bind("<Button-5>", lambda e: self._yview("scroll", 1, "units"))
+
+    # Данные
+
+    def set_items(self, items, checked=None):
+        """
+        Заполнить список
+
+        Args:
+            items: Список (ключ, строки)
+            checked: Отмеченные ключи (по умолчанию - ничего)
+        """
+        self.items = [(key, self._normalize_lines(lines)) for key, lines in items]
+        self.search_texts = [" ".join(line[0] for line in lines).casefold() for _, lines in self.items]
+        self.checked = set(checked or [])
+        self.apply_filter()
+
+    def _normalize_lines(self, lines):
+        if isinstance(lines, str):
+            lines = [lines]
+        result = []
+        for line in lines:
+            if isinstance(line, str):
+                result.append((line, self.fg, self.font))
+            else:
+                text, color, font = (tuple(line) + (None, None))[:3]
+                result.append((text, color or self.fg, font or self.font))
+        return result
+
+    def apply_filter(self, query=None):
+        """
+        Применить фильтр (по умолчанию - текст из строки фильтра)
+
+        Args:
+            query: Строка поиска
+        """
+        if query is None:
+            query = self.filter_var.get()
+        query = query.strip()
+
+        if not query:
+            self.visible = list(range(len(self.items)))
+        elif self.filter_func is not None:
+            keys = self.filter_func(query)
+            self.visible = [i for i, (key, _) in enumerate(self.items) if key in keys]
+        else:
+            needle = query.casefold()
+            self.visible = [i for i, text in enumerate(self.search_texts) if needle in text]
+
+        self.canvas.yview_moveto(0)
+        self._update_scrollregion()
+
+    # Отметки
+
+    def is_checked(self, key):
+        return key in self.checked
+
+    def set_checked(self, keys, value=True):
+        """Отметить (или снять отметку) у набора ключей"""
+        if value:
+            self.checked.update(keys)
+        else:
+            self.checked.difference_update(keys)
+        self._changed()
+
+    def check_visible(self):
+        """Отметить все элементы, прошедшие фильтр"""
+        self.checked.update(self.items[i][0] for i in self.visible)
+        self._changed()
+
+    def clear_checked(self):
+        """Снять все отметки"""
+        self.checked.clear()
+        self._changed()
+
+    def get_checked(self):
+        """
+        Отмеченные ключи в порядке списка
+
+        Returns:
+            list: Ключи
+        """
+        return [key for key, _ in self.items if key in self.checked]
+
+    def _changed(self):
+        self._schedule_redraw()
+        if self.on_change:
+            self.on_change()
+
+    # Отрисовка
+
+    def _yview(self, *args):
+        self.canvas.yview(*args)
+        self._schedule_redraw()
+
+    def _on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self._schedule_redraw()
+
+    def _on_mousewheel(self, event):
+        step = -1 if event.delta > 0 else 1
+        self._yview("scroll", step, "units")
+
+    def _update_scrollregion(self):
+        height = max(len(self.visible) * self.row_height, 1)
+        self.canvas.configure(
+            scrollregion=(0, 0, self.canvas.winfo_width(), height),
+            yscrollincrement=self.row_height
+        )
+        self._schedule_redraw()
+
+    def _schedule_redraw(self):
+        """Перерисовать один раз на ближайшем проходе цикла событий"""
+        if not self._redraw_pending:
+            self._redraw_pending = True
+            self.after_idle(self._redraw)
+
+    def _redraw(self):
+        """Нарисовать только строки в видимой области"""
+        self._redraw_pending = False
+        canvas = self.canvas
+        canvas.delete("row")
+
+        width = canvas.winfo_width()
+
+        if not self.visible:
+            canvas.create_text(
+                width // 2, 30, text=self.empty_text, tags="row",
+                fill="#B0BEC5", font=(self.font[0], self.font[1], "italic")
+            )
+            return
+
+        top = canvas.canvasy(0)
+        first = max(int(top // self.row_height), 0)
+        last = min(int((top + canvas.winfo_height()) // self.row_height) + 1, len(self.visible))
+
+        for position in range(first, last):
+            key, lines = self.items[self.visible[position]]
+            y = position * self.row_height
+
+            canvas.create_rectangle(
+                2, y + 2, width - 2, y + self.row_height - 2,
+                fill=self.row_bg, outline="", tags="row"
+            )
+            canvas.create_text(
+                12, y + self.row_height // 2, anchor="w", tags="row",
+                text=self.CHECK_ON if key in self.checked else self.CHECK_OFF,
+                fill=self.fg, font=(self.font[0], self.font[1] + 4)
+            )
+
+            line_height = (self.row_height - 8) / max(len(lines), 1)
+            for n, (text, color, font) in enumerate(lines):
+                canvas.create_text(
+                    40, y + 4 + line_height * (n + 0.5), anchor="w", tags="row",
+                    text=text, fill=color, font=font
+                )
+
+    def _on_click(self, event):
+        """Переключить отметку строки под курсором"""
+        position = int(self.canvas.canvasy(event.y) // self.row_height)
+        if 0 <= position < len(self.visible):
+            key = self.items[self.visible[position]][0]
+            if key in self.checked:
+                self.checked.discard(key)
+            else:
+                self.checked.add(key)
+            self._changed()
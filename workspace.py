@@ -0,0 +1,212 @@
+"""
+Рабочее пространство ISO2
+Все пути, словари категорий и кэши одной рабочей папки
+"""
+
+import os
+from collections import OrderedDict
+
+import config
+from config import CATEGORIES, WORKSPACE_CACHE_SIZE, ARCHIVE_PACK_DIR, RENAME_LOG_DIR
+from storage import LocalStorage
+
+
+class Workspace:
+    """Рабочая папка со всеми производными путями и кэшами"""
+
+    def __init__(self, docs_dir, storage=None):
+        self.docs_dir = os.path.abspath(docs_dir)
+
+        # Хранилище файлов документов и реестров (storage.Storage)
+        self.storage = storage if storage is not None else LocalStorage()
+
+        # Основные папки
+        self.projects_dir = os.path.join(self.docs_dir, "ПРОЕКТЫ")
+        self.active_dir = os.path.join(self.docs_dir, "ДЕЙСТВУЮЩИЕ")
+        self.archive_dir = os.path.join(self.docs_dir, "АРХИВ")
+        self.registries_dir = os.path.join(self.docs_dir, "РЕЕСТРЫ")
+
+        # Пути к категориям
+        self.active_categories = {c: os.path.join(self.active_dir, c) for c in CATEGORIES}
+        self.archive_categories = {c: os.path.join(self.archive_dir, c) for c in CATEGORIES}
+        self.registries_categories = {c: os.path.join(self.registries_dir, c) for c in CATEGORIES}
+
+        # Упакованный архив: ZIP по годам и их индексы (archive_pack.py)
+        self.archive_packed = {c: os.path.join(self.archive_categories[c], ARCHIVE_PACK_DIR) for c in CATEGORIES}
+
+        # Актуальные реестры: РЕЕСТР_<категория>_АКТУАЛЬНЫЙ.txt
+        self.registry_actual_files = {
+            c: os.path.join(self.registries_categories[c], f"РЕЕСТР_{c.replace(' ', '_')}_АКТУАЛЬНЫЙ.txt")
+            for c in CATEGORIES
+        }
+
+        # Журналы массовых переименований (renamer.py) - для отката
+        self.rename_logs_dir = os.path.join(self.docs_dir, RENAME_LOG_DIR)
+
+        # Справочник сотрудников (база SQLite и JSON для совместимости)
+        self.employees_db = os.path.join(self.docs_dir, "employees.db")
+        self.employees_file = os.path.join(self.docs_dir, "employees.json")
+
+        # Учёт ознакомления с документами
+        self.acknowledgements_db = os.path.join(self.docs_dir, "acknowledgements.db")
+
+        # Кэш сканирования: {(папка, категория): (mtime_ns, [Document])}
+        self.scan_cache = {}
+
+        # Кэши подсистем: {имя: данные}
+        self.cache = {}
+
+    def __repr__(self):
+        return f"Workspace({self.docs_dir})"
+
+    @property
+    def name(self):
+        """Короткое имя рабочей папки (для отображения)"""
+        return os.path.basename(self.docs_dir.rstrip(os.sep)) or self.docs_dir
+
+    def categories_for(self, base_folder):
+        """
+        Словарь категорий для основной папки
+
+        Args:
+            base_folder: active_dir или archive_dir
+
+        Returns:
+            dict: {категория: путь} или пустой словарь
+        """
+        if base_folder == self.active_dir:
+            return self.active_categories
+        if base_folder == self.archive_dir:
+            return self.archive_categories
+        return {}
+
+    def create_folders(self):
+        """Создать структуру папок, если их нет"""
+        folders = [self.docs_dir, self.projects_dir, self.active_dir, self.archive_dir, self.registries_dir]
+        folders += list(self.active_categories.values())
+        folders += list(self.archive_categories.values())
+        folders += list(self.registries_categories.values())
+
+        for folder in folders:
+            if not self.storage.exists(folder):
+                self.storage.makedirs(folder)
+                print(f"Создана папка: {folder}")
+
+    def invalidate_folder(self, folder_path):
+        """
+        Сбросить кэш сканирования папки (после изменений в ней)
+
+        Нужен, когда mtime папки может не успеть измениться
+        (грубая точность времени на сетевых дисках).
+
+        Args:
+            folder_path: Путь к папке
+        """
+        for key in [k for k in self.scan_cache if k[0] == folder_path]:
+            del self.scan_cache[key]
+
+    def clear_caches(self):
+        """Сбросить все кэши рабочего пространства"""
+        self.scan_cache.clear()
+        self.cache.clear()
+
+
+# Недавно использованные рабочие пространства (кэши остаются тёплыми)
+_recent_workspaces = OrderedDict()
+
+# Текущее рабочее пространство
+_current_workspace = None
+
+# Значение config.DOCS_DIR, с которым последний раз синхронизировались
+_synced_docs_dir = None
+
+
+def get_workspace(docs_dir):
+    """
+    Получить рабочее пространство для папки (из списка недавних или новое)
+
+    Args:
+        docs_dir: Путь к рабочей папке
+
+    Returns:
+        Workspace: Рабочее пространство
+    """
+    key = os.path.abspath(docs_dir)
+
+    workspace = _recent_workspaces.pop(key, None)
+    if workspace is None:
+        workspace = Workspace(key)
+    _recent_workspaces[key] = workspace
+
+    # Вытесняем самые старые
+    while len(_recent_workspaces) > WORKSPACE_CACHE_SIZE:
+        _recent_workspaces.popitem(last=False)
+
+    return workspace
+
+
+def activate_workspace(docs_dir):
+    """
+    Сделать рабочую папку текущей (без сохранения в настройки)
+
+    Args:
+        docs_dir: Путь к рабочей папке
+
+    Returns:
+        Workspace: Текущее рабочее пространство
+    """
+    global _current_workspace
+
+    _current_workspace = get_workspace(docs_dir)
+    return _current_workspace
+
+
+def get_current_workspace():
+    """
+    Текущее рабочее пространство
+
+    Returns:
+        Workspace: Рабочее пространство или None, если папка не выбрана
+    """
+    global _synced_docs_dir
+
+    # Рабочая папка могла быть изменена через config.set_work_dir
+    if config.DOCS_DIR and config.DOCS_DIR != _synced_docs_dir:
+        _synced_docs_dir = config.DOCS_DIR
+        activate_workspace(config.DOCS_DIR)
+    return _current_workspace
+
+
+def resolve_workspace(workspace=None):
+    """
+    Вернуть переданное рабочее пространство или текущее
+
+    Raises:
+        RuntimeError: Если рабочая папка не выбрана
+    """
+    if workspace is not None:
+        return workspace
+
+    current = get_current_workspace()
+    if current is None:
+        raise RuntimeError("Рабочая папка не выбрана")
+    return current
+
+
+def switch_work_dir(docs_dir):
+    """
+    Сменить рабочую папку: сохранить в настройки, создать структуру
+    и сделать текущей
+
+    Args:
+        docs_dir: Путь к новой рабочей папке
+
+    Returns:
+        Workspace: Новое текущее рабочее пространство или None при ошибке
+    """
+    if not config.set_work_dir(docs_dir):
+        return None
+
+    workspace = activate_workspace(docs_dir)
+    workspace.create_folders()
+    return workspace